@@ -26,7 +26,7 @@ def setup_periodic_tasks(sender, **kwargs):
         },
         'aqua_voting_tracker.voting.tasks.task_update_claim_back_time': {
             'task': 'aqua_voting_tracker.voting.tasks.task_update_claim_back_time',
-            'schedule': crontab(minute='1-59/3'),  # 3n+1
+            'schedule': crontab(minute='*'),
             'args': (),
         },
         'aqua_voting_tracker.voting.tasks.task_create_voting_snapshot': {
@@ -34,9 +34,21 @@ def setup_periodic_tasks(sender, **kwargs):
             'schedule': crontab(minute='*/5'),
             'args': (),
         },
+        'aqua_voting_tracker.voting.tasks.task_export_parquet': {
+            'task': 'aqua_voting_tracker.voting.tasks.task_export_parquet',
+            'schedule': crontab(minute=15),
+            'args': (),
+        },
         'aqua_voting_tracker.voting_rewards.tasks.task_update_rewards': {
             'task': 'aqua_voting_tracker.voting_rewards.tasks.task_update_rewards',
             'schedule': crontab(minute=2),
             'args': (),
         },
     })
+
+
+@app.on_after_finalize.connect
+def setup_metrics(sender, **kwargs):
+    # Metrics read django settings on import, so they are loaded once the app is set up.
+    from aqua_voting_tracker.taskapp.metrics import connect_signals
+    connect_signals()
@@ -0,0 +1,132 @@
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+
+from celery import signals
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, multiprocess, start_http_server
+
+
+logger = logging.getLogger(__name__)
+
+
+PUBLISHED_AT_HEADER = 'published_at'
+
+metrics_namespace = f'{settings.PROMETHEUS_METRICS_NAMESPACE}_celery'
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800, 3600, float('inf'))
+
+task_queue_latency_histogram = Histogram(
+    f'{metrics_namespace}_task_queue_latency_seconds',
+    'Time between task publishing (or its eta) and start of execution.',
+    ['task'],
+    buckets=LATENCY_BUCKETS,
+)
+task_runtime_histogram = Histogram(
+    f'{metrics_namespace}_task_runtime_seconds',
+    'Duration of task execution.',
+    ['task', 'state'],
+    buckets=LATENCY_BUCKETS,
+)
+task_failures_counter = Counter(
+    f'{metrics_namespace}_task_failures',
+    'Count of failed tasks.',
+    ['task', 'exception'],
+)
+task_retries_counter = Counter(
+    f'{metrics_namespace}_task_retries',
+    'Count of retried tasks.',
+    ['task'],
+)
+task_in_progress_gauge = Gauge(
+    f'{metrics_namespace}_tasks_in_progress',
+    'Count of tasks being executed.',
+    ['task'],
+    multiprocess_mode='livesum',
+)
+
+_task_started_at = {}
+
+
+def get_due_time(request) -> Optional[float]:
+    published_at = request.get(PUBLISHED_AT_HEADER)
+    if published_at is None:
+        # Message was published without the header (e.g. eager or foreign producer).
+        return None
+
+    if request.eta:
+        eta = request.eta if isinstance(request.eta, datetime) else datetime.fromisoformat(request.eta)
+        return max(published_at, eta.timestamp())
+
+    return published_at
+
+
+def set_published_at(headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+
+def observe_task_start(task_id=None, task=None, **kwargs):
+    _task_started_at[task_id] = time.perf_counter()
+    task_in_progress_gauge.labels(task.name).inc()
+
+    due_time = get_due_time(task.request)
+    if due_time is not None:
+        task_queue_latency_histogram.labels(task.name).observe(max(0, time.time() - due_time))
+
+
+def observe_task_finish(task_id=None, task=None, state=None, **kwargs):
+    started_at = _task_started_at.pop(task_id, None)
+    if started_at is None:
+        return
+
+    task_in_progress_gauge.labels(task.name).dec()
+    task_runtime_histogram.labels(task.name, state or 'UNKNOWN').observe(time.perf_counter() - started_at)
+
+
+def observe_task_failure(sender=None, exception=None, **kwargs):
+    task_failures_counter.labels(sender.name, type(exception).__name__).inc()
+
+
+def observe_task_retry(sender=None, **kwargs):
+    task_retries_counter.labels(sender.name).inc()
+
+
+def is_multiprocess_mode() -> bool:
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+def start_metrics_server(**kwargs):
+    """
+    Serve metrics from the main worker process.
+    With prefork pool tasks are executed in child processes, so metrics are collected
+    through shared directory given by PROMETHEUS_MULTIPROC_DIR environment variable.
+    """
+    if not settings.CELERY_METRICS_PORT:
+        return
+
+    if is_multiprocess_mode():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(settings.CELERY_METRICS_PORT, registry=registry)
+    else:
+        logger.warning('PROMETHEUS_MULTIPROC_DIR is not set, metrics of prefork pool processes will be lost.')
+        start_http_server(settings.CELERY_METRICS_PORT)
+
+
+def mark_process_dead(pid=None, **kwargs):
+    if is_multiprocess_mode():
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def connect_signals():
+    signals.before_task_publish.connect(set_published_at)
+    signals.task_prerun.connect(observe_task_start)
+    signals.task_postrun.connect(observe_task_finish)
+    signals.task_failure.connect(observe_task_failure)
+    signals.task_retry.connect(observe_task_retry)
+    signals.worker_ready.connect(start_metrics_server)
+    signals.worker_process_shutdown.connect(mark_process_dead)
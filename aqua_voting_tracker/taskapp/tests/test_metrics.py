@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from prometheus_client import REGISTRY
+
+from aqua_voting_tracker.taskapp import app
+from aqua_voting_tracker.taskapp.metrics import connect_signals
+
+
+@app.task(bind=True, max_retries=1, default_retry_delay=0)
+def flaky_task(self, failures: int):
+    if self.request.retries < failures:
+        raise self.retry(exc=ValueError('flaky'))
+
+
+def get_metric(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(f'{settings.PROMETHEUS_METRICS_NAMESPACE}_celery_{name}', labels) or 0
+
+
+class TaskMetricsTestCase(SimpleTestCase):
+    def setUp(self):
+        connect_signals()
+        self.task_name = flaky_task.name
+
+    def get_runtime_count(self, state: str) -> float:
+        return get_metric('task_runtime_seconds_count', {'task': self.task_name, 'state': state})
+
+    def test_success(self):
+        success_before = self.get_runtime_count('SUCCESS')
+
+        flaky_task.apply(args=(0, ))
+
+        self.assertEqual(self.get_runtime_count('SUCCESS'), success_before + 1)
+        self.assertEqual(get_metric('tasks_in_progress', {'task': self.task_name}), 0)
+
+    def test_retry(self):
+        retries_before = get_metric('task_retries_total', {'task': self.task_name})
+        success_before = self.get_runtime_count('SUCCESS')
+
+        flaky_task.apply(args=(1, ))
+
+        self.assertEqual(get_metric('task_retries_total', {'task': self.task_name}), retries_before + 1)
+        self.assertEqual(self.get_runtime_count('SUCCESS'), success_before + 1)
+
+    def test_failure(self):
+        failures_before = get_metric('task_failures_total', {'task': self.task_name, 'exception': 'ValueError'})
+        failure_runtime_before = self.get_runtime_count('FAILURE')
+
+        with self.assertLogs('celery.app.trace', 'ERROR'):
+            result = flaky_task.apply(args=(2, ))
+
+        self.assertTrue(result.failed())
+        self.assertEqual(
+            get_metric('task_failures_total', {'task': self.task_name, 'exception': 'ValueError'}),
+            failures_before + 1,
+        )
+        self.assertEqual(self.get_runtime_count('FAILURE'), failure_runtime_before + 1)
+        self.assertEqual(get_metric('tasks_in_progress', {'task': self.task_name}), 0)
@@ -0,0 +1,39 @@
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+_read_database = contextvars.ContextVar('read_database', default=None)
+
+
+@contextmanager
+def use_replica():
+    """
+    Route reads within the block to a replica. Replica is picked once,
+    so all queries of the block see the same replication state.
+    """
+    replicas = settings.DATABASE_REPLICAS
+    token = _read_database.set(random.choice(replicas) if replicas else None)  # noqa: S311
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Send reads to replica only when explicitly requested by use_replica. Everything else goes to default database.
+    """
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
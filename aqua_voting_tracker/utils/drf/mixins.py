@@ -0,0 +1,10 @@
+from aqua_voting_tracker.utils.db_routers import use_replica
+
+
+class ReplicaReadMixin:
+    """
+    Serve read-only view from database replica.
+    """
+    def dispatch(self, request, *args, **kwargs):
+        with use_replica():
+            return super(ReplicaReadMixin, self).dispatch(request, *args, **kwargs)
@@ -0,0 +1,292 @@
+import dataclasses
+import random
+import string
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+
+from more_itertools import chunked
+from stellar_sdk import Asset, Keypair
+
+from aqua_voting_tracker.utils.stellar.asset import get_asset_string
+from aqua_voting_tracker.voting.constants import PUBLISHED_SNAPSHOT_CACHE_KEY
+from aqua_voting_tracker.voting.models import Vote, VotingSnapshot, VotingSnapshotAsset
+from aqua_voting_tracker.voting_rewards.constants import REWARD_CACHE_KEY
+from aqua_voting_tracker.voting_rewards.models import MarketRewardRun
+
+
+LOADTEST_USERNAME = 'loadtest'
+
+AMOUNT_PRECISION = Decimal('0.0000001')
+
+ProgressCallback = Callable[[str, int, int], None]
+
+
+@dataclasses.dataclass
+class LoadTestDatasetConfig:
+    voting_assets: List[str]
+
+    votes_count: int = 1000000
+    markets_count: int = 500
+    accounts_count: int = 50000
+    claimed_share: float = 0.6
+
+    snapshot_days: int = 90
+    # Production snapshots are taken every VOTING_SNAPSHOT_INTERVAL, coarser default keeps seeding fast.
+    snapshot_interval: timedelta = timedelta(hours=1)
+    reward_interval: timedelta = timedelta(days=1)
+
+    chunk_size: int = 10000
+    seed: Optional[int] = None
+
+
+def _to_amount(value: float) -> Decimal:
+    return Decimal(value).quantize(AMOUNT_PRECISION)
+
+
+class LoadTestDataset:
+    """
+    Synthetic votes, snapshots and reward runs shaped like production: a few markets hold most of the votes,
+    most votes are claimed back after unlock and market values drift between snapshots.
+    Snapshots are generated directly instead of replaying votes, so seeding months of them stays cheap.
+    Instances are built without test factories, so seeding works in production installs.
+    """
+
+    def __init__(self, config: LoadTestDatasetConfig, on_progress: ProgressCallback = None):
+        self.config = config
+        self.on_progress = on_progress
+        self.random = random.Random(config.seed)  # noqa: S311
+
+        interval = config.snapshot_interval.total_seconds()
+        self.last_timestamp = datetime.fromtimestamp(
+            timezone.now().timestamp() // interval * interval, tz=timezone.utc,
+        )
+        self.first_timestamp = self.last_timestamp - timedelta(days=config.snapshot_days)
+
+        self.market_keys = [self.generate_public_key() for _ in range(config.markets_count)]
+        weights = [self.random.paretovariate(1.2) for _ in self.market_keys]
+        self.market_weights = [weight / sum(weights) for weight in weights]
+        self.market_boosts = [
+            1 + self.random.uniform(0, 0.5) if self.random.random() < 0.2 else 1 for _ in self.market_keys
+        ]
+        self.market_pairs = {
+            market_key: (self.generate_asset_string(), self.generate_asset_string())
+            for market_key in self.market_keys
+        }
+        self.accounts = [self.generate_public_key() for _ in range(config.accounts_count)]
+
+    def generate_public_key(self) -> str:
+        return Keypair.from_raw_ed25519_seed(self.random.randbytes(32)).public_key
+
+    def generate_asset_string(self) -> str:
+        code = ''.join(self.random.choices(string.ascii_uppercase, k=4))
+        return get_asset_string(Asset(code, self.generate_public_key()))
+
+    def generate_balance_id(self) -> str:
+        return '00000000' + self.random.randbytes(32).hex()
+
+    def report_progress(self, name: str, done: int, total: int):
+        if self.on_progress:
+            self.on_progress(name, done, total)
+
+    def generate_votes(self) -> Iterator[Vote]:
+        now = timezone.now()
+        market_keys = self.random.choices(self.market_keys, weights=self.market_weights, k=self.config.votes_count)
+        for market_key in market_keys:
+            locked_at = self.first_timestamp + timedelta(
+                seconds=self.random.uniform(0, (now - self.first_timestamp).total_seconds()),
+            )
+            locked_until = locked_at + timedelta(days=self.random.randint(1, 90))
+
+            claimed_back_at = None
+            if locked_until < now and self.random.random() < self.config.claimed_share:
+                claimed_back_at = min(locked_until + timedelta(hours=self.random.expovariate(1 / 24)), now)
+
+            yield Vote(
+                balance_id=self.generate_balance_id(),
+                voting_account=self.random.choice(self.accounts),
+                market_key=market_key,
+                asset=self.random.choice(self.config.voting_assets),
+                amount=_to_amount(self.random.lognormvariate(7, 2)),
+                locked_at=locked_at,
+                locked_until=locked_until,
+                claimed_back_at=claimed_back_at,
+            )
+
+    def seed_votes(self) -> int:
+        created = 0
+        for chunk in chunked(self.generate_votes(), self.config.chunk_size):
+            Vote.objects.bulk_create(chunk)
+            created += len(chunk)
+            self.report_progress('votes', created, self.config.votes_count)
+        return created
+
+    def get_timestamps(self) -> List[datetime]:
+        timestamps = []
+        timestamp = self.first_timestamp
+        while timestamp <= self.last_timestamp:
+            timestamps.append(timestamp)
+            timestamp += self.config.snapshot_interval
+        return timestamps
+
+    def generate_slot(self, timestamp: datetime, values: List[float]) -> List[VotingSnapshot]:
+        total_value = sum(values)
+        markets = []
+        for index, market_key in enumerate(self.market_keys):
+            values[index] *= self.random.lognormvariate(0, 0.02)
+            upvote_value = values[index]
+            downvote_value = upvote_value * self.random.uniform(0, 0.1) if self.random.random() < 0.1 else 0
+            votes_value = upvote_value - downvote_value
+            voting_amount = max(1, int(self.config.accounts_count * upvote_value / total_value))
+            markets.append((
+                market_key, upvote_value, downvote_value, votes_value, votes_value * self.market_boosts[index],
+                voting_amount,
+            ))
+
+        markets.sort(key=lambda market: (market[4], market[3]), reverse=True)
+        return [
+            VotingSnapshot(
+                market_key=market_key,
+                rank=rank,
+                upvote_value=_to_amount(upvote_value),
+                downvote_value=_to_amount(downvote_value),
+                votes_value=_to_amount(votes_value),
+                adjusted_votes_value=_to_amount(adjusted_votes_value),
+                voting_amount=voting_amount,
+                timestamp=timestamp,
+                extra={},
+            )
+            for rank, (market_key, upvote_value, downvote_value, votes_value, adjusted_votes_value, voting_amount)
+            in enumerate(markets, start=1)
+        ]
+
+    def get_snapshot_assets(self, snapshot: VotingSnapshot) -> List[VotingSnapshotAsset]:
+        assets = []
+        for direction, value in (
+            (VotingSnapshotAsset.Direction.UP, snapshot.upvote_value),
+            (VotingSnapshotAsset.Direction.DOWN, snapshot.downvote_value),
+        ):
+            if not value:
+                continue
+
+            asset_count = len(self.config.voting_assets)
+            assets.extend(
+                VotingSnapshotAsset(
+                    snapshot=snapshot,
+                    asset=asset,
+                    direction=direction,
+                    votes_sum=_to_amount(value / asset_count),
+                    votes_count=max(1, snapshot.voting_amount // asset_count),
+                )
+                for asset in self.config.voting_assets
+            )
+        return assets
+
+    def get_reward_runs(self, snapshots: List[VotingSnapshot]) -> List[MarketRewardRun]:
+        min_share = settings.MIN_SHARE_FOR_REWARD_ZONE
+        total_value = sum(snapshot.adjusted_votes_value for snapshot in snapshots)
+        reward_zone = [
+            snapshot for snapshot in snapshots[:int(1 / min_share)]
+            if snapshot.adjusted_votes_value / total_value >= min_share
+        ]
+        reward_zone_value = sum(snapshot.adjusted_votes_value for snapshot in reward_zone)
+
+        reward_runs = []
+        for snapshot in reward_zone:
+            share = snapshot.adjusted_votes_value / reward_zone_value
+            asset1, asset2 = self.market_pairs[snapshot.market_key]
+            reward_value = int(share * settings.TOTAL_REWARD_VALUE)
+            reward_runs.append(MarketRewardRun(
+                market_key=snapshot.market_key,
+                asset1=asset1,
+                asset2=asset2,
+                votes_value=snapshot.adjusted_votes_value,
+                share=share.quantize(AMOUNT_PRECISION),
+                reward_value=reward_value,
+                sdex_share=Decimal('0.5'),
+                amm_share=Decimal('0.5'),
+                sdex_reward_value=reward_value // 2,
+                amm_reward_value=reward_value - reward_value // 2,
+                timestamp=snapshot.timestamp,
+            ))
+        return reward_runs
+
+    def seed_snapshots(self) -> Tuple[int, int]:
+        timestamps = self.get_timestamps()
+        # Average vote amount is about a thousand.
+        values = [weight * self.config.votes_count * 1000 for weight in self.market_weights]
+        slots_per_chunk = max(1, self.config.chunk_size // max(1, self.config.markets_count))
+
+        snapshots_count = reward_runs_count = 0
+        for done, chunk in enumerate(chunked(timestamps, slots_per_chunk), start=1):
+            snapshots, reward_runs = [], []
+            for timestamp in chunk:
+                slot = self.generate_slot(timestamp, values)
+                snapshots.extend(slot)
+                if (timestamp - self.first_timestamp) % self.config.reward_interval == timedelta(0):
+                    reward_runs.extend(self.get_reward_runs(slot))
+
+            VotingSnapshot.objects.bulk_create(snapshots)
+            VotingSnapshotAsset.objects.bulk_create(
+                asset for snapshot in snapshots for asset in self.get_snapshot_assets(snapshot)
+            )
+            MarketRewardRun.objects.bulk_create(reward_runs)
+
+            snapshots_count += len(snapshots)
+            reward_runs_count += len(reward_runs)
+            self.report_progress('snapshots', min(done * slots_per_chunk, len(timestamps)), len(timestamps))
+
+        return snapshots_count, reward_runs_count
+
+    def seed(self) -> Dict[str, int]:
+        votes_count = self.seed_votes()
+        snapshots_count, reward_runs_count = self.seed_snapshots()
+
+        cache.set(PUBLISHED_SNAPSHOT_CACHE_KEY, self.last_timestamp, None)
+        cache.delete(REWARD_CACHE_KEY)
+
+        return {
+            'votes': votes_count,
+            'snapshots': snapshots_count,
+            'reward_runs': reward_runs_count,
+        }
+
+
+def create_loadtest_token() -> str:
+    """
+    Token of the load test user for authenticated endpoints, user is created with the dataset.
+    """
+    user, _ = get_user_model().objects.get_or_create(username=LOADTEST_USERNAME)
+    token, _ = Token.objects.get_or_create(user=user)
+    return token.key
+
+
+def get_loadtest_token() -> Optional[str]:
+    """
+    Token of the load test user if database is seeded by seedloadtest.
+    """
+    return Token.objects.filter(user__username=LOADTEST_USERNAME).values_list('key', flat=True).first()
+
+
+def is_dataset_empty() -> bool:
+    return not any(model.objects.exists() for model in (Vote, VotingSnapshot, MarketRewardRun))
+
+
+def flush_dataset():
+    tables = ', '.join(
+        connection.ops.quote_name(model._meta.db_table)
+        for model in (Vote, VotingSnapshotAsset, VotingSnapshot, MarketRewardRun)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'TRUNCATE {tables}')  # noqa: S608
+
+    cache.delete(PUBLISHED_SNAPSHOT_CACHE_KEY)
+    cache.delete(REWARD_CACHE_KEY)
@@ -0,0 +1,291 @@
+import dataclasses
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from django.core.cache import cache
+from django.utils import timezone
+
+import numpy as np
+import requests
+
+from aqua_voting_tracker.voting.constants import PUBLISHED_SNAPSHOT_CACHE_KEY
+from aqua_voting_tracker.voting.models import Vote, VotingSnapshot
+from aqua_voting_tracker.voting_rewards.models import MarketRewardRun
+
+
+API_PREFIX = '/api/'
+
+
+@dataclasses.dataclass
+class LoadTestRequest:
+    method: str
+    path: str
+    params: Optional[dict] = None
+    data: Any = None
+    headers: Optional[dict] = None
+
+
+@dataclasses.dataclass
+class LoadTestEndpoint:
+    name: str
+    # Url pattern of the endpoint as it is declared in urls.py.
+    route: str
+    make_request: Callable[[random.Random], LoadTestRequest]
+
+
+def _unix(value: datetime) -> int:
+    return int(value.timestamp())
+
+
+class LoadTestScenario:
+    """
+    Requests to every public endpoint with parameters sampled from the seeded dataset.
+    """
+
+    def __init__(self, market_keys: List[str], assets: List[str], first_timestamp: datetime,
+                 last_timestamp: datetime, token: Optional[str] = None):
+        self.market_keys = market_keys
+        self.assets = assets
+        self.first_timestamp = first_timestamp
+        self.last_timestamp = last_timestamp
+        self.token = token
+
+    @classmethod
+    def load(cls, token: Optional[str] = None) -> 'LoadTestScenario':
+        last_timestamp = cache.get(PUBLISHED_SNAPSHOT_CACHE_KEY) or VotingSnapshot.objects.latest('timestamp').timestamp
+        first_timestamp = VotingSnapshot.objects.earliest('timestamp').timestamp
+        market_keys = list(
+            VotingSnapshot.objects.filter(timestamp=last_timestamp).values_list('market_key', flat=True),
+        )
+        assets = list(MarketRewardRun.objects.filter_last_run().values_list('asset1', flat=True))
+
+        return cls(market_keys, assets, first_timestamp, last_timestamp, token=token)
+
+    def get_market_keys(self, rnd: random.Random, count: int) -> List[str]:
+        return rnd.sample(self.market_keys, min(count, len(self.market_keys)))
+
+    def get_page_params(self, rnd: random.Random, page_size: int = 20) -> dict:
+        # Clients mostly look through the first pages of the top.
+        pages = max(1, min(5, len(self.market_keys) // page_size))
+        return {'limit': page_size, 'page': rnd.randint(1, pages)}
+
+    def get_timestamp(self, rnd: random.Random) -> datetime:
+        seconds = (self.last_timestamp - self.first_timestamp).total_seconds()
+        return self.first_timestamp + timedelta(seconds=rnd.uniform(0, seconds))
+
+    def get_endpoints(self) -> List[LoadTestEndpoint]:
+        endpoints = [
+            LoadTestEndpoint('market-votes', 'market-keys/<str:market_key>/votes/', lambda rnd: LoadTestRequest(
+                'GET', f'market-keys/{rnd.choice(self.market_keys)}/votes/',
+                params={'timestamp': _unix(self.get_timestamp(rnd))},
+            )),
+            LoadTestEndpoint('snapshot-get', 'voting-snapshot/', lambda rnd: LoadTestRequest(
+                'GET', 'voting-snapshot/', params={'market_key': self.get_market_keys(rnd, 20)},
+            )),
+            LoadTestEndpoint('snapshot-post', 'voting-snapshot/', lambda rnd: LoadTestRequest(
+                'POST', 'voting-snapshot/', data={'market_key': self.get_market_keys(rnd, 500)},
+            )),
+            LoadTestEndpoint('top-volume', 'voting-snapshot/top-volume/', lambda rnd: LoadTestRequest(
+                'GET', 'voting-snapshot/top-volume/', params=self.get_page_params(rnd),
+            )),
+            LoadTestEndpoint('top-voted', 'voting-snapshot/top-voted/', lambda rnd: LoadTestRequest(
+                'GET', 'voting-snapshot/top-voted/', params=self.get_page_params(rnd),
+            )),
+            LoadTestEndpoint('stats', 'voting-snapshot/stats/', lambda rnd: LoadTestRequest(
+                'GET', 'voting-snapshot/stats/',
+            )),
+            LoadTestEndpoint('snapshot-at', 'voting-snapshot/at/<int:timestamp>/', lambda rnd: LoadTestRequest(
+                'GET', f'voting-snapshot/at/{_unix(self.get_timestamp(rnd))}/',
+                params={'market_key': self.get_market_keys(rnd, 20)},
+            )),
+            LoadTestEndpoint(
+                'top-volume-at', 'voting-snapshot/at/<int:timestamp>/top-volume/', lambda rnd: LoadTestRequest(
+                    'GET', f'voting-snapshot/at/{_unix(self.get_timestamp(rnd))}/top-volume/',
+                ),
+            ),
+            LoadTestEndpoint(
+                'top-voted-at', 'voting-snapshot/at/<int:timestamp>/top-voted/', lambda rnd: LoadTestRequest(
+                    'GET', f'voting-snapshot/at/{_unix(self.get_timestamp(rnd))}/top-voted/',
+                ),
+            ),
+            LoadTestEndpoint('rewards', 'voting-rewards/', lambda rnd: LoadTestRequest(
+                'GET', 'voting-rewards/',
+            )),
+            LoadTestEndpoint('rewards-market', 'voting-rewards/', lambda rnd: LoadTestRequest(
+                'GET', 'voting-rewards/', params={'market_key': self.get_market_keys(rnd, 20)},
+            )),
+            LoadTestEndpoint('simulate', 'voting-rewards/simulate/', lambda rnd: LoadTestRequest(
+                'GET', 'voting-rewards/simulate/', params={
+                    'market_key': rnd.choice(self.market_keys),
+                    'upvote_value': rnd.randint(0, 1000000),
+                    'target_rank': rnd.randint(1, 50),
+                },
+            )),
+        ]
+
+        if self.assets:
+            endpoints.append(LoadTestEndpoint('rewards-asset', 'voting-rewards/', lambda rnd: LoadTestRequest(
+                'GET', 'voting-rewards/', params={'asset1': rnd.choice(self.assets)},
+            )))
+
+        if self.token:
+            endpoints.append(LoadTestEndpoint('export', 'voting-snapshot/export/', self.make_export_request))
+
+        return endpoints
+
+    def make_export_request(self, rnd: random.Random) -> LoadTestRequest:
+        since = self.get_timestamp(rnd)
+        return LoadTestRequest(
+            'GET', 'voting-snapshot/export/',
+            params={
+                'since': _unix(since),
+                'until': _unix(since + timedelta(hours=1)),
+                'output': rnd.choice(['ndjson', 'csv']),
+            },
+            headers={'Authorization': f'Token {self.token}'},
+        )
+
+
+@dataclasses.dataclass
+class EndpointResult:
+    name: str
+    latencies: List[float]
+    errors: int
+    duration: float
+
+    def get_summary(self) -> Dict[str, float]:
+        latencies = np.array(self.latencies) * 1000
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0, 0, 0)
+        return {
+            'requests': len(self.latencies),
+            'errors': self.errors,
+            'p50_ms': round(float(p50), 2),
+            'p95_ms': round(float(p95), 2),
+            'p99_ms': round(float(p99), 2),
+            'mean_ms': round(float(latencies.mean()), 2) if len(latencies) else 0,
+            'throughput_rps': round(len(self.latencies) / self.duration, 2) if self.duration else 0,
+        }
+
+
+class LoadTestRunner:
+    """
+    Drive endpoints one after another, each with a fixed count of requests sent by concurrent workers.
+    Workers are threads, so a single runner saturates at a few hundred requests per second;
+    run several runners against the same server to go beyond that.
+    """
+
+    def __init__(self, base_url: str, concurrency: int = 10, requests_count: int = 500, warmup: int = 10,
+                 timeout: float = 60, seed: Optional[int] = None):
+        self.base_url = base_url.rstrip('/') + API_PREFIX
+        self.concurrency = concurrency
+        self.requests_count = requests_count
+        self.warmup = warmup
+        self.timeout = timeout
+        self.seed = seed
+
+    def send(self, session: requests.Session, request: LoadTestRequest) -> bool:
+        try:
+            response = session.request(
+                request.method, self.base_url + request.path,
+                params=request.params, json=request.data, headers=request.headers, timeout=self.timeout,
+            )
+            # Read the whole body, streaming responses are not finished until then.
+            response.content  # noqa: B018
+        except requests.RequestException:
+            return False
+
+        return response.ok
+
+    def run_worker(self, endpoint: LoadTestEndpoint, requests_count: int, worker: int) -> EndpointResult:
+        rnd = random.Random(None if self.seed is None else self.seed + worker)  # noqa: S311
+        latencies = []
+        errors = 0
+        with requests.Session() as session:
+            for _ in range(requests_count):
+                request = endpoint.make_request(rnd)
+                started_at = time.perf_counter()
+                if not self.send(session, request):
+                    errors += 1
+                latencies.append(time.perf_counter() - started_at)
+
+        return EndpointResult(endpoint.name, latencies, errors, 0)
+
+    def run_endpoint(self, endpoint: LoadTestEndpoint) -> EndpointResult:
+        self.run_worker(endpoint, self.warmup, -1)
+
+        counts = [
+            self.requests_count // self.concurrency + (worker < self.requests_count % self.concurrency)
+            for worker in range(self.concurrency)
+        ]
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            worker_results = list(executor.map(
+                self.run_worker, [endpoint] * self.concurrency, counts, range(self.concurrency),
+            ))
+        duration = time.perf_counter() - started_at
+
+        return EndpointResult(
+            name=endpoint.name,
+            latencies=[latency for result in worker_results for latency in result.latencies],
+            errors=sum(result.errors for result in worker_results),
+            duration=duration,
+        )
+
+    def run(self, endpoints: List[LoadTestEndpoint],
+            on_result: Callable[[EndpointResult], None] = None) -> List[EndpointResult]:
+        results = []
+        for endpoint in endpoints:
+            result = self.run_endpoint(endpoint)
+            if on_result:
+                on_result(result)
+            results.append(result)
+        return results
+
+    def get_report(self, results: List[EndpointResult]) -> dict:
+        return {
+            'created_at': timezone.now().isoformat(),
+            'base_url': self.base_url,
+            'concurrency': self.concurrency,
+            'requests': self.requests_count,
+            'dataset': get_dataset_stats(),
+            'endpoints': {result.name: result.get_summary() for result in results},
+        }
+
+
+def get_dataset_stats() -> Dict[str, int]:
+    return {
+        'votes': Vote.objects.count(),
+        'snapshots': VotingSnapshot.objects.count(),
+        'reward_runs': MarketRewardRun.objects.count(),
+    }
+
+
+def save_report(report: dict, path: str):
+    with open(path, 'w') as report_file:
+        json.dump(report, report_file, indent=2, sort_keys=True)
+
+
+def load_report(path: str) -> dict:
+    with open(path) as report_file:
+        return json.load(report_file)
+
+
+def compare_reports(baseline: dict, report: dict, metrics=('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps')) -> dict:
+    """
+    Relative change of every metric against the baseline, per endpoint present in both reports.
+    """
+    changes = {}
+    for name, summary in report['endpoints'].items():
+        baseline_summary = baseline['endpoints'].get(name)
+        if not baseline_summary:
+            continue
+
+        changes[name] = {
+            metric: summary[metric] / baseline_summary[metric] - 1 if baseline_summary[metric] else None
+            for metric in metrics
+        }
+    return changes
@@ -0,0 +1,20 @@
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
+from django.core.cache import cache
+
+
+@contextmanager
+def cache_lock(key: str, timeout: float) -> Iterator[bool]:
+    """
+    Non-blocking lock shared by all processes using the same cache. Yield whether the lock is acquired.
+    Lock expires after timeout in case its holder died.
+    """
+    token = uuid.uuid4().hex
+    acquired = cache.add(key, token, timeout)
+    try:
+        yield acquired
+    finally:
+        if acquired and cache.get(key) == token:
+            cache.delete(key)
@@ -0,0 +1,425 @@
+import asyncio
+import dataclasses
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+from faker import Faker
+from stellar_sdk import Asset
+
+from aqua_voting_tracker.utils.stellar.asset import get_asset_string, parse_asset_string
+from aqua_voting_tracker.utils.stellar.fake import StellarProvider
+
+
+LOCKED_PREDICATE = {'not': {'unconditional': True}}
+
+
+@dataclasses.dataclass
+class FakeHorizonConfig:
+    voting_assets: List[str]
+
+    votes_count: int = 1000
+    markets_count: int = 100
+    claimed_share: float = 0.2
+
+    market_pairs_count: int = 20
+    offers_per_order_book: int = 100
+
+    # Count of irrelevant effects per each vote related effect.
+    noise_ratio: int = 10
+    # New operations per second generated for the live effects stream.
+    stream_rate: float = 10
+
+    latency: float = 0
+    latency_jitter: float = 0
+    error_rate: float = 0
+    error_status: int = 503
+
+    seed: Optional[int] = None
+
+
+def _asset_fields(asset: Asset, prefix: str = '') -> dict:
+    if asset.is_native():
+        return {f'{prefix}asset_type': 'native'}
+
+    return {
+        f'{prefix}asset_type': asset.type,
+        f'{prefix}asset_code': asset.code,
+        f'{prefix}asset_issuer': asset.issuer,
+    }
+
+
+def _format_time(value: datetime) -> str:
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class PagedCollection:
+    """
+    Records ordered by paging token position with horizon-like cursor paging.
+    """
+    def __init__(self):
+        self.records: List[dict] = []
+        self.positions: Dict[str, int] = {}
+
+    def append(self, record: dict):
+        self.positions[record['paging_token']] = len(self.records)
+        self.records.append(record)
+
+    def remove(self, record: dict):
+        # Keep the position, so paging from the removed record's token still works.
+        self.records[self.positions[record['paging_token']]] = None
+
+    def page(self, cursor: Optional[str], limit: int, desc: bool = False) -> List[dict]:
+        if cursor == 'now':
+            return []
+
+        if desc:
+            end = self.positions.get(cursor, len(self.records)) if cursor else len(self.records)
+            indexes = range(end - 1, -1, -1)
+        else:
+            start = self.positions[cursor] + 1 if cursor in self.positions else 0
+            indexes = range(start, len(self.records))
+
+        return list(islice(filter(None, (self.records[index] for index in indexes)), limit))
+
+    def after(self, cursor: Optional[str]) -> int:
+        if cursor == 'now':
+            return len(self.records)
+
+        return self.positions[cursor] + 1 if cursor in self.positions else 0
+
+
+class FakeHorizonData:
+    def __init__(self, config: FakeHorizonConfig):
+        self.config = config
+        self.random = random.Random(config.seed)  # noqa: S311
+        self.faker = Faker()
+        self.faker.add_provider(StellarProvider)
+        if config.seed is not None:
+            random.seed(config.seed)
+
+        self.now = datetime.now(timezone.utc)
+        self.ledger = 40000000
+        self.operation_index = 0
+
+        self.claimable_balances = PagedCollection()
+        self.operations = PagedCollection()
+        self.balance_operations: Dict[str, List[dict]] = {}
+        self.effects = PagedCollection()
+        self.offers: Dict[Tuple[str, str], PagedCollection] = {}
+        self.liquidity_pools: Dict[frozenset, dict] = {}
+
+        self.market_keys = [self.faker.stellar_public_key() for _ in range(config.markets_count)]
+        self.accounts = [self.faker.stellar_public_key() for _ in range(max(1, config.votes_count // 5))]
+        self.open_balances: List[dict] = []
+
+        self.generate_votes(config.votes_count, self.now - timedelta(days=30))
+        self.generate_markets()
+
+    def next_operation_id(self) -> str:
+        self.operation_index += 1
+        if self.operation_index % 50 == 0:
+            self.ledger += 1
+
+        return str((self.ledger << 32) + self.operation_index)
+
+    def add_operation(self, operation: dict, effects: List[dict]):
+        self.operations.append(operation)
+        if 'balance_id' in operation:
+            self.balance_operations.setdefault(operation['balance_id'], []).append(operation)
+
+        for index, effect in enumerate(effects, start=1):
+            effect_id = f'{operation["id"]}-{index:010d}'
+            effect.update({
+                'id': effect_id,
+                'paging_token': effect_id,
+                'created_at': operation['created_at'],
+            })
+            self.effects.append(effect)
+
+    def add_noise(self, created_at: datetime):
+        for _ in range(self.config.noise_ratio):
+            operation_id = self.next_operation_id()
+            account = self.random.choice(self.accounts)
+            self.add_operation({
+                'id': operation_id,
+                'paging_token': operation_id,
+                'type': 'payment',
+                'created_at': _format_time(created_at),
+                'source_account': account,
+                'transaction_successful': True,
+            }, [
+                {'type': 'account_debited', 'account': account, 'amount': '1.0000000', 'asset_type': 'native'},
+                {'type': 'account_credited', 'account': self.random.choice(self.accounts),
+                 'amount': '1.0000000', 'asset_type': 'native'},
+            ])
+
+    def create_vote(self, created_at: datetime):
+        operation_id = self.next_operation_id()
+        balance_id = self.faker.stellar_claimable_balance_id()
+        account = self.random.choice(self.accounts)
+        asset_string = self.random.choice(self.config.voting_assets)
+        amount = f'{Decimal(self.random.randint(1, 10 ** 11)) / 10 ** 7:.7f}'
+        locked_until = created_at + timedelta(days=self.random.randint(1, 60))
+        claimants = [
+            {'destination': self.random.choice(self.market_keys), 'predicate': LOCKED_PREDICATE},
+            {'destination': account, 'predicate': {'not': {'abs_before': _format_time(locked_until)}}},
+        ]
+
+        balance = {
+            'id': balance_id,
+            'asset': asset_string,
+            'amount': amount,
+            'sponsor': account,
+            'last_modified_ledger': self.ledger,
+            'last_modified_time': _format_time(created_at),
+            'claimants': claimants,
+            'flags': {'clawback_enabled': False},
+            'paging_token': f'{self.ledger}-{balance_id}',
+        }
+        self.claimable_balances.append(balance)
+        self.open_balances.append(balance)
+
+        asset_fields = _asset_fields(parse_asset_string(asset_string))
+        self.add_operation({
+            'id': operation_id,
+            'paging_token': operation_id,
+            'type': 'create_claimable_balance',
+            'created_at': _format_time(created_at),
+            'source_account': account,
+            'transaction_successful': True,
+            'asset': asset_string,
+            'amount': amount,
+            'claimants': claimants,
+        }, [
+            {'type': 'claimable_balance_created', 'account': account, 'balance_id': balance_id,
+             'asset': asset_string, 'amount': amount},
+            *[
+                {'type': 'claimable_balance_claimant_created', 'account': claimant['destination'],
+                 'balance_id': balance_id, 'asset': asset_string, 'amount': amount,
+                 'predicate': claimant['predicate']}
+                for claimant in claimants
+            ],
+            {'type': 'account_debited', 'account': account, 'amount': amount, **asset_fields},
+        ])
+
+    def claim_vote(self, created_at: datetime):
+        if not self.open_balances:
+            return
+
+        balance = self.open_balances.pop(self.random.randrange(len(self.open_balances)))
+        self.claimable_balances.remove(balance)
+        operation_id = self.next_operation_id()
+        account = balance['sponsor']
+        asset_fields = _asset_fields(parse_asset_string(balance['asset']))
+        self.add_operation({
+            'id': operation_id,
+            'paging_token': operation_id,
+            'type': 'claim_claimable_balance',
+            'created_at': _format_time(created_at),
+            'source_account': account,
+            'transaction_successful': True,
+            'balance_id': balance['id'],
+            'claimant': account,
+        }, [
+            {'type': 'claimable_balance_claimed', 'account': account, 'balance_id': balance['id'],
+             'asset': balance['asset'], 'amount': balance['amount']},
+            {'type': 'account_credited', 'account': account, 'amount': balance['amount'], **asset_fields},
+        ])
+
+    def generate_step(self, created_at: datetime):
+        if self.random.random() < self.config.claimed_share:
+            self.claim_vote(created_at)
+        else:
+            self.create_vote(created_at)
+
+        self.add_noise(created_at)
+
+    def generate_votes(self, count: int, since: datetime):
+        step = (self.now - since) / max(count, 1)
+        for index in range(count):
+            self.generate_step(since + step * index)
+
+    def generate_markets(self):
+        assets = [Asset.native()] + [self.faker.stellar_asset() for _ in range(self.config.market_pairs_count)]
+        for asset in assets[1:]:
+            price = self.random.uniform(0.01, 100)
+            self.add_order_book(asset, Asset.native(), price)
+            self.add_order_book(Asset.native(), asset, 1 / price)
+
+            reserve = self.random.uniform(1000, 10 ** 7)
+            self.liquidity_pools[frozenset([get_asset_string(asset), 'native'])] = {
+                'id': self.faker.stellar_claimable_balance_id()[8:],
+                'paging_token': self.faker.stellar_claimable_balance_id()[8:],
+                'fee_bp': 30,
+                'type': 'constant_product',
+                'reserves': [
+                    {'asset': get_asset_string(asset), 'amount': f'{reserve:.7f}'},
+                    {'asset': 'native', 'amount': f'{reserve * price:.7f}'},
+                ],
+            }
+
+    def add_order_book(self, selling: Asset, buying: Asset, price: float):
+        offers = PagedCollection()
+        for index in range(self.config.offers_per_order_book):
+            offer_price = price * (1 + self.random.uniform(0, 0.2))
+            denominator = 10 ** 7
+            offers.append({
+                'id': str(index + 1),
+                'paging_token': str(index + 1),
+                'seller': self.random.choice(self.accounts),
+                'selling': _asset_fields(selling),
+                'buying': _asset_fields(buying),
+                'amount': f'{self.random.uniform(1, 10000):.7f}',
+                'price_r': {'n': int(offer_price * denominator), 'd': denominator},
+                'price': f'{offer_price:.7f}',
+            })
+
+        self.offers[(get_asset_string(selling), get_asset_string(buying))] = offers
+
+
+def _parse_request_asset(query, name: str) -> Optional[str]:
+    if name in query:
+        return query[name]
+
+    asset_type = query.get(f'{name}_asset_type')
+    if not asset_type:
+        return None
+    if asset_type == 'native':
+        return 'native'
+
+    return f'{query[f"{name}_asset_code"]}:{query[f"{name}_asset_issuer"]}'
+
+
+class FakeHorizonApp:
+    """
+    Local horizon stand-in serving synthetic data, both paged and SSE.
+    Latency and errors are injected to measure throughput and backpressure of ingestion components.
+    """
+    def __init__(self, config: FakeHorizonConfig):
+        self.config = config
+        self.data = FakeHorizonData(config)
+        self.random = random.Random(config.seed)  # noqa: S311
+        self.new_operations = asyncio.Condition()
+
+    def get_application(self) -> web.Application:
+        app = web.Application(middlewares=[self.fault_middleware])
+        app.router.add_get('/claimable_balances', self.claimable_balances)
+        app.router.add_get('/claimable_balances/{balance_id}/operations', self.balance_operations)
+        app.router.add_get('/operations', self.operations)
+        app.router.add_get('/effects', self.effects)
+        app.router.add_get('/offers', self.offers)
+        app.router.add_get('/liquidity_pools', self.liquidity_pools)
+        app.on_startup.append(self.start_generator)
+        return app
+
+    @web.middleware
+    async def fault_middleware(self, request: web.Request, handler):
+        if self.config.latency or self.config.latency_jitter:
+            await asyncio.sleep(self.config.latency + self.random.uniform(0, self.config.latency_jitter))
+
+        if self.random.random() < self.config.error_rate:
+            return web.json_response({
+                'type': 'https://stellar.org/horizon-errors/injected',
+                'title': 'Injected error',
+                'status': self.config.error_status,
+            }, status=self.config.error_status)
+
+        return await handler(request)
+
+    async def start_generator(self, app: web.Application):
+        if self.config.stream_rate > 0:
+            app['generator'] = asyncio.create_task(self.generate_live_operations())
+
+    async def generate_live_operations(self):
+        while True:
+            await asyncio.sleep(1 / self.config.stream_rate)
+            self.data.generate_step(datetime.now(timezone.utc))
+            async with self.new_operations:
+                self.new_operations.notify_all()
+
+    def get_page_params(self, request: web.Request) -> Tuple[Optional[str], int, bool]:
+        query = request.query
+        return query.get('cursor'), min(int(query.get('limit', 10)), 200), query.get('order') == 'desc'
+
+    def page_response(self, request: web.Request, records: List[dict]) -> web.Response:
+        return web.json_response({
+            '_links': {'self': {'href': str(request.url)}},
+            '_embedded': {'records': records},
+        })
+
+    def is_stream(self, request: web.Request) -> bool:
+        return 'text/event-stream' in request.headers.get('Accept', '')
+
+    async def stream_collection(self, request: web.Request, collection: PagedCollection) -> web.StreamResponse:
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache'})
+        await response.prepare(request)
+        await response.write(b'retry: 1000\nevent: open\ndata: "hello"\n\n')
+
+        position = collection.after(request.query.get('cursor'))
+        try:
+            while True:
+                while position < len(collection.records):
+                    record = collection.records[position]
+                    position += 1
+                    if record is None:
+                        continue
+
+                    await response.write(
+                        f'id: {record["paging_token"]}\ndata: {json.dumps(record)}\n\n'.encode(),
+                    )
+
+                async with self.new_operations:
+                    await self.new_operations.wait()
+        except ConnectionResetError:
+            return response
+
+    async def claimable_balances(self, request: web.Request) -> web.Response:
+        cursor, limit, desc = self.get_page_params(request)
+        return self.page_response(request, self.data.claimable_balances.page(cursor, limit, desc))
+
+    async def balance_operations(self, request: web.Request) -> web.Response:
+        cursor, limit, desc = self.get_page_params(request)
+        collection = PagedCollection()
+        for operation in self.data.balance_operations.get(request.match_info['balance_id'], []):
+            collection.append(operation)
+
+        return self.page_response(request, collection.page(cursor, limit, desc))
+
+    async def operations(self, request: web.Request) -> web.StreamResponse:
+        if self.is_stream(request):
+            return await self.stream_collection(request, self.data.operations)
+
+        cursor, limit, desc = self.get_page_params(request)
+        return self.page_response(request, self.data.operations.page(cursor, limit, desc))
+
+    async def effects(self, request: web.Request) -> web.StreamResponse:
+        if self.is_stream(request):
+            return await self.stream_collection(request, self.data.effects)
+
+        cursor, limit, desc = self.get_page_params(request)
+        return self.page_response(request, self.data.effects.page(cursor, limit, desc))
+
+    async def offers(self, request: web.Request) -> web.Response:
+        cursor, limit, desc = self.get_page_params(request)
+        selling = _parse_request_asset(request.query, 'selling')
+        buying = _parse_request_asset(request.query, 'buying')
+
+        collection = self.data.offers.get((selling, buying))
+        if not collection:
+            return self.page_response(request, [])
+
+        return self.page_response(request, collection.page(cursor, limit, desc))
+
+    async def liquidity_pools(self, request: web.Request) -> web.Response:
+        reserves = frozenset(filter(None, request.query.get('reserves', '').split(',')))
+        liquidity_pool = self.data.liquidity_pools.get(reserves)
+        return self.page_response(request, [liquidity_pool] if liquidity_pool else [])
+
+
+def get_fake_horizon_application(config: FakeHorizonConfig) -> web.Application:
+    return FakeHorizonApp(config).get_application()
@@ -0,0 +1,231 @@
+import asyncio
+import functools
+import logging
+import random
+import re
+import time
+from typing import Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+import orjson
+import requests
+from prometheus_client import Counter, Histogram
+from requests.adapters import HTTPAdapter
+from requests_sse import EventSource
+from stellar_sdk import AiohttpClient, Server, ServerAsync
+from stellar_sdk.client.requests_client import IDENTIFICATION_HEADERS, USER_AGENT, RequestsClient
+from stellar_sdk.exceptions import ConnectionError as HorizonConnectionError
+from stellar_sdk.exceptions import StreamClientError
+
+from aqua_voting_tracker.utils.stellar.ratelimit import Priority, get_rate_limiter
+
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+STREAM_SERVICE_MESSAGES = ('"hello"', '"byebye"')
+STREAM_RECONNECT_DELAY = 1
+
+_id_segment_regex = re.compile(r'^([0-9a-f]{20,}|[0-9]+|G[A-Z0-9]{55}|[a-zA-Z0-9]{1,12}:G[A-Z0-9]{55})$')
+
+
+request_duration_histogram = Histogram(
+    f'{settings.PROMETHEUS_METRICS_NAMESPACE}_horizon_request_duration_seconds',
+    'Duration of horizon requests.',
+    ['endpoint'],
+)
+request_error_counter = Counter(
+    f'{settings.PROMETHEUS_METRICS_NAMESPACE}_horizon_request_errors',
+    'Count of failed horizon requests.',
+    ['endpoint', 'reason'],
+)
+
+
+def get_endpoint_label(url: str) -> str:
+    """
+    Collapse ids in url path to keep metrics cardinality low: /claimable_balances/{id}/operations.
+    """
+    segments = [
+        '{id}' if _id_segment_regex.match(segment) else segment
+        for segment in urlparse(url).path.split('/') if segment
+    ]
+    return '/' + '/'.join(segments)
+
+
+def observe_response(endpoint: str, started_at: float, status_code: Optional[int] = None, error: str = None):
+    request_duration_histogram.labels(endpoint).observe(time.perf_counter() - started_at)
+    if error:
+        request_error_counter.labels(endpoint, error).inc()
+    elif status_code >= 400:
+        request_error_counter.labels(endpoint, str(status_code)).inc()
+
+
+def get_backoff_time(attempt: int, backoff_factor: float, backoff_jitter: float) -> float:
+    backoff = backoff_factor * (2 ** attempt)
+    return backoff + random.uniform(0, backoff_jitter)  # noqa: S311
+
+
+class HorizonClient(RequestsClient):
+    """
+    Requests client with keep-alive pool, jittered retries, shared rate limit and per-endpoint metrics.
+    Retries are made above the adapter, so every attempt takes its own rate limit token.
+    """
+    def __init__(self, pool_size: int, num_retries: int, request_timeout: float, backoff_factor: float,
+                 backoff_jitter: float, priority: Priority = Priority.NORMAL,
+                 stream_reconnect_delay: float = STREAM_RECONNECT_DELAY):
+        self.backoff_jitter = backoff_jitter
+        self.priority = priority
+        self.stream_reconnect_delay = stream_reconnect_delay
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+
+        session = requests.Session()
+        session.headers.update({**IDENTIFICATION_HEADERS, 'User-Agent': USER_AGENT})
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        super(HorizonClient, self).__init__(
+            pool_size=pool_size,
+            num_retries=num_retries,
+            request_timeout=request_timeout,
+            backoff_factor=backoff_factor,
+            session=session,
+        )
+
+    def acquire_token(self):
+        rate_limiter = get_rate_limiter()
+        if rate_limiter:
+            rate_limiter.acquire(self.priority)
+
+    def get(self, url: str, params=None, **kwargs):
+        endpoint = get_endpoint_label(url)
+        attempt = 0
+        while True:
+            self.acquire_token()
+
+            started_at = time.perf_counter()
+            try:
+                response = super(HorizonClient, self).get(url, params=params, **kwargs)
+            except HorizonConnectionError:
+                observe_response(endpoint, started_at, error='connection')
+                if attempt >= self.num_retries:
+                    raise
+            else:
+                observe_response(endpoint, started_at, status_code=response.status_code)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.num_retries:
+                    return response
+
+            time.sleep(get_backoff_time(attempt, self.backoff_factor, self.backoff_jitter))
+            attempt += 1
+
+    def stream_raw(self, url: str, params=None) -> Iterator[Tuple[str, str]]:
+        """
+        Listen server sent events without decoding. Yield pairs of event id (paging token) and raw data.
+        Every connect, including reconnects, takes a rate limit token.
+        """
+        query_params = {**(params or {}), **IDENTIFICATION_HEADERS}
+        while True:
+            self.acquire_token()
+            try:
+                with EventSource(url, timeout=60, params=query_params, headers=self.headers) as client:
+                    for event in client:
+                        if event.last_event_id:
+                            query_params['cursor'] = event.last_event_id
+
+                        if event.data is not None and event.data not in STREAM_SERVICE_MESSAGES:
+                            yield event.last_event_id, event.data
+            except requests.Timeout:
+                logger.warning('Stream timed out, reconnecting with cursor %s.', query_params.get('cursor'))
+                time.sleep(self.stream_reconnect_delay)
+            except requests.RequestException as exc:
+                raise StreamClientError(query_params.get('cursor'), 'Failed to get stream message.') from exc
+
+    def stream(self, url: str, params=None, **kwargs):
+        for _event_id, data in self.stream_raw(url, params=params):
+            try:
+                yield orjson.loads(data)
+            except orjson.JSONDecodeError:
+                logger.warning('Skip malformed stream message.')
+
+
+class AsyncHorizonClient(AiohttpClient):
+    """
+    Aiohttp client with keep-alive pool, jittered retries, shared rate limit and per-endpoint metrics.
+    """
+    def __init__(self, pool_size: int, num_retries: int, request_timeout: float, backoff_factor: float,
+                 backoff_jitter: float, priority: Priority = Priority.NORMAL):
+        super(AsyncHorizonClient, self).__init__(
+            pool_size=pool_size,
+            request_timeout=request_timeout,
+            backoff_factor=backoff_factor,
+        )
+        self.num_retries = num_retries
+        self.backoff_jitter = backoff_jitter
+        self.priority = priority
+
+    async def acquire_token(self):
+        rate_limiter = get_rate_limiter()
+        if rate_limiter:
+            await rate_limiter.acquire_async(self.priority)
+
+    async def get(self, url: str, params=None, **kwargs):
+        endpoint = get_endpoint_label(url)
+        attempt = 0
+        while True:
+            await self.acquire_token()
+
+            started_at = time.perf_counter()
+            try:
+                response = await super(AsyncHorizonClient, self).get(url, params=params, **kwargs)
+            except (HorizonConnectionError, asyncio.TimeoutError):
+                observe_response(endpoint, started_at, error='connection')
+                if attempt >= self.num_retries:
+                    raise
+            else:
+                observe_response(endpoint, started_at, status_code=response.status_code)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.num_retries:
+                    return response
+
+            await asyncio.sleep(get_backoff_time(attempt, self.backoff_factor, self.backoff_jitter))
+            attempt += 1
+
+
+def get_horizon_server(horizon_url: str = None, priority: Priority = Priority.NORMAL) -> Server:
+    """
+    Process-wide horizon server. Connections are kept alive between calls,
+    requests are throttled by cluster-wide rate limit according to caller priority.
+    """
+    return _get_horizon_server(horizon_url or settings.HORIZON_URL, priority)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_horizon_server(horizon_url: str, priority: Priority) -> Server:
+    client = HorizonClient(
+        pool_size=settings.HORIZON_POOL_SIZE,
+        num_retries=settings.HORIZON_NUM_RETRIES,
+        request_timeout=settings.HORIZON_REQUEST_TIMEOUT,
+        backoff_factor=settings.HORIZON_BACKOFF_FACTOR,
+        backoff_jitter=settings.HORIZON_BACKOFF_JITTER,
+        priority=priority,
+    )
+    return Server(horizon_url, client=client)
+
+
+def get_horizon_server_async(horizon_url: str = None, request_timeout: float = None,
+                             priority: Priority = Priority.NORMAL) -> ServerAsync:
+    """
+    Async horizon server. Aiohttp session is bound to an event loop,
+    so server should be used as async context manager within a single loop run.
+    """
+    client = AsyncHorizonClient(
+        pool_size=settings.HORIZON_POOL_SIZE,
+        num_retries=settings.HORIZON_NUM_RETRIES,
+        request_timeout=request_timeout or settings.HORIZON_REQUEST_TIMEOUT,
+        backoff_factor=settings.HORIZON_BACKOFF_FACTOR,
+        backoff_jitter=settings.HORIZON_BACKOFF_JITTER,
+        priority=priority,
+    )
+    return ServerAsync(horizon_url or settings.HORIZON_URL, client=client)
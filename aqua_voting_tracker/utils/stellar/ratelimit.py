@@ -0,0 +1,118 @@
+import asyncio
+import enum
+import functools
+import time
+from typing import Optional
+
+from django.conf import settings
+
+import redis
+from prometheus_client import Counter, Histogram
+
+
+# Token bucket shared by all processes. Clock is taken from redis to avoid skew between hosts.
+# Caller can take a token only if the bucket keeps its priority reserve afterwards,
+# so under contention low priority callers starve first.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local reserve = tonumber(ARGV[3])
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'timestamp')
+local tokens = tonumber(state[1]) or capacity
+local timestamp = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - timestamp) * rate)
+
+local wait = 0
+if tokens - 1 >= reserve then
+    tokens = tokens - 1
+else
+    wait = (reserve + 1 - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'timestamp', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class Priority(enum.IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+token_wait_histogram = Histogram(
+    f'{settings.PROMETHEUS_METRICS_NAMESPACE}_horizon_token_wait_seconds',
+    'Time spent by horizon callers waiting for rate limit token.',
+    ['priority'],
+)
+throttled_counter = Counter(
+    f'{settings.PROMETHEUS_METRICS_NAMESPACE}_horizon_throttled_requests',
+    'Count of horizon requests delayed by rate limiter.',
+    ['priority'],
+)
+
+
+class HorizonRateLimiter:
+    key = 'aqua_voting_tracker.utils.stellar.HORIZON_TOKEN_BUCKET'
+
+    max_sleep = 1
+
+    def __init__(self, redis_client: redis.Redis, rate: float, capacity: float, reserves: dict):
+        self.redis_client = redis_client
+        self.rate = rate
+        self.capacity = capacity
+        self.reserves = reserves
+        self.script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def get_reserve(self, priority: Priority) -> float:
+        return self.capacity * self.reserves.get(priority.name, 0)
+
+    def try_acquire(self, priority: Priority) -> float:
+        """
+        Take a token if available. Otherwise return estimated time to wait.
+        """
+        return float(self.script(keys=[self.key], args=[self.rate, self.capacity, self.get_reserve(priority)]))
+
+    def acquire(self, priority: Priority = Priority.NORMAL):
+        started_at = time.perf_counter()
+        wait = self.try_acquire(priority)
+        if wait:
+            throttled_counter.labels(priority.name).inc()
+
+        while wait:
+            time.sleep(min(wait, self.max_sleep))
+            wait = self.try_acquire(priority)
+
+        token_wait_histogram.labels(priority.name).observe(time.perf_counter() - started_at)
+
+    async def acquire_async(self, priority: Priority = Priority.NORMAL):
+        # Redis client is blocking, run script calls in executor to keep event loop responsive.
+        loop = asyncio.get_running_loop()
+        started_at = time.perf_counter()
+        wait = await loop.run_in_executor(None, self.try_acquire, priority)
+        if wait:
+            throttled_counter.labels(priority.name).inc()
+
+        while wait:
+            await asyncio.sleep(min(wait, self.max_sleep))
+            wait = await loop.run_in_executor(None, self.try_acquire, priority)
+
+        token_wait_histogram.labels(priority.name).observe(time.perf_counter() - started_at)
+
+
+@functools.lru_cache(maxsize=None)
+def get_rate_limiter() -> Optional[HorizonRateLimiter]:
+    if not settings.HORIZON_RATE_LIMIT_REDIS_URL:
+        return None
+
+    return HorizonRateLimiter(
+        redis.Redis.from_url(settings.HORIZON_RATE_LIMIT_REDIS_URL),
+        rate=settings.HORIZON_RATE_LIMIT,
+        capacity=settings.HORIZON_RATE_LIMIT_BURST,
+        reserves=settings.HORIZON_RATE_LIMIT_RESERVES,
+    )
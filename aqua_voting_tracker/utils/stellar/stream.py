@@ -1,22 +1,59 @@
+import enum
 import logging
-from datetime import datetime, timezone
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import Iterator, List, Optional
 
-from dateutil.parser import parse as date_parse
-from prometheus_client import Counter, Summary
+import orjson
+from prometheus_client import Counter, Enum, Summary
 from stellar_sdk import Server
 from stellar_sdk.call_builder.call_builder_sync import BaseCallBuilder
+from stellar_sdk.utils import urljoin_with_query
+
+from aqua_voting_tracker.utils.stellar.horizon import get_horizon_server
+from aqua_voting_tracker.utils.stellar.ratelimit import Priority
 
 
 logger = logging.getLogger(__name__)
 
 
+class StreamMode(enum.Enum):
+    STREAM = 'stream'
+    PAGED = 'paged'
+
+
 class StreamWorker:
     horizon_url = 'https://horizon-testnet.stellar.org'
     horizon_limit = 200
+    horizon_priority = Priority.HIGH
+
+    # Stream falling behind for more than this switches to paged loading.
+    paged_mode_lag_threshold = timedelta(minutes=5)
+    # Paged loading switches back to stream once loaded entries are as fresh as this.
+    stream_mode_lag_threshold = timedelta(seconds=30)
+    # Maximal page size allowed by horizon.
+    paged_mode_limit = 200
+    # Seconds without new entries after which on_idle is called. None disables idle handling.
+    idle_timeout: Optional[float] = None
+
+    def __init__(self, *args, **kwargs):
+        super(StreamWorker, self).__init__(*args, **kwargs)
+
+        self.mode = StreamMode.STREAM
+        # Paging token of the last loaded entry.
+        self.paging_token: Optional[str] = None
+        # Paging token of the last entry passed to handle_entry, updated by the handling thread only.
+        # Both modes resume from it, so entries are never skipped or repeated on mode switch or reconnect.
+        self.handled_paging_token: Optional[str] = None
+        # Entries loaded by the reader thread but not handled yet, if idle handling is enabled.
+        self.entries_queue: Optional[queue.Queue] = None
 
     def get_server(self) -> Server:
-        return Server(self.horizon_url)
+        return get_horizon_server(self.horizon_url, priority=self.horizon_priority)
 
     def load_cursor(self) -> Optional[str]:
         raise NotImplementedError()
@@ -30,19 +67,124 @@ class StreamWorker:
     def handle_entry(self, entry: dict):
         raise NotImplementedError()
 
-    def load_data(self) -> Iterator[dict]:
+    def get_entry_created_at(self, entry: dict) -> datetime:
+        return datetime.fromisoformat(entry['created_at'])
+
+    def get_entry_lag(self, entry: dict) -> timedelta:
+        return datetime.now(timezone.utc) - self.get_entry_created_at(entry)
+
+    def set_mode(self, mode: StreamMode):
+        self.wait_handled()
+        logger.info('Switch to %s mode at cursor %s.', mode.value, self.handled_paging_token)
+        self.mode = mode
+
+    def open_stream(self, request: BaseCallBuilder) -> Iterator[dict]:
+        return request.stream()
+
+    def load_stream(self) -> Iterator[dict]:
         request = self.get_request_builder().limit(self.horizon_limit)
+        if self.handled_paging_token:
+            request = request.cursor(self.handled_paging_token)
+
+        stream = self.open_stream(request)
+        try:
+            for entry in stream:
+                self.paging_token = entry['paging_token']
+                yield entry
 
-        cursor = self.load_cursor()
+                if self.get_entry_lag(entry) > self.paged_mode_lag_threshold:
+                    self.set_mode(StreamMode.PAGED)
+                    return
+        finally:
+            stream.close()
+
+    def load_page(self, cursor: Optional[str]) -> List[dict]:
+        request = self.get_request_builder().order(desc=False).limit(self.paged_mode_limit)
         if cursor:
             request = request.cursor(cursor)
 
-        yield from request.stream()
+        return request.call()['_embedded']['records']
+
+    def is_caught_up(self, page: List[dict]) -> bool:
+        return len(page) < self.paged_mode_limit or self.get_entry_lag(page[-1]) < self.stream_mode_lag_threshold
+
+    def load_pages(self) -> Iterator[dict]:
+        """
+        Load pages one after another. Next page is prefetched while entries of the current one are handled.
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            next_page = executor.submit(self.load_page, self.handled_paging_token)
+            while next_page:
+                page = next_page.result()
+                if self.is_caught_up(page):
+                    next_page = None
+                else:
+                    next_page = executor.submit(self.load_page, page[-1]['paging_token'])
+
+                for entry in page:
+                    self.paging_token = entry['paging_token']
+                    yield entry
+
+        self.set_mode(StreamMode.STREAM)
+
+    def load_data(self) -> Iterator[dict]:
+        self.paging_token = self.handled_paging_token = self.load_cursor()
+        yield from self.load_entries()
+
+    def wait_handled(self):
+        """
+        Block the reader thread until queued entries are handled, so handled cursor catches up with loaded one.
+        """
+        if self.entries_queue is not None:
+            self.entries_queue.join()
+
+    def load_entries(self) -> Iterator[dict]:
+        while True:
+            self.wait_handled()
+            if self.mode == StreamMode.PAGED:
+                yield from self.load_pages()
+            else:
+                yield from self.load_stream()
+
+    def on_idle(self):
+        pass
+
+    def read_entries(self, entries: queue.Queue):
+        try:
+            for entry in self.load_entries():
+                entries.put(entry)
+        except Exception as exc:
+            entries.put(exc)
+
+    def process_entry(self, entry: dict):
+        logger.debug('Received entry: %s', entry['id'])
+        self.handle_entry(entry)
+        self.handled_paging_token = entry['paging_token']
 
     def run(self):
-        for entry in self.load_data():
-            logger.info('Received entry: %s', entry['id'])
-            self.handle_entry(entry)
+        if self.idle_timeout is None:
+            for entry in self.load_data():
+                self.process_entry(entry)
+            return
+
+        # Horizon is read by a background thread, so the worker wakes up when no entries arrive.
+        # Entries are handled in the calling thread only.
+        self.paging_token = self.handled_paging_token = self.load_cursor()
+        entries = self.entries_queue = queue.Queue(maxsize=self.horizon_limit)
+        threading.Thread(target=self.read_entries, args=(entries, ), daemon=True).start()
+
+        while True:
+            try:
+                entry = entries.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                self.on_idle()
+                continue
+
+            if isinstance(entry, Exception):
+                raise entry
+
+            self.process_entry(entry)
+            entries.task_done()
 
 
 class BunchedByOperationsEffectsStreamWorker(StreamWorker):
@@ -77,6 +219,86 @@ class BunchedByOperationsEffectsStreamWorker(StreamWorker):
         raise NotImplementedError()
 
 
+class PrefilteredEffectsStreamWorker(BunchedByOperationsEffectsStreamWorker):
+    """
+    Effects stream which decodes only operations containing interesting effects.
+
+    Streamed effects are kept as raw json until the operation is complete.
+    Operation is decoded and passed to handle_operation_effects only if any of its effects
+    contains one of relevant_effect_markers, the rest are dropped after a substring check.
+    """
+    relevant_effect_markers = NotImplemented
+
+    # Cursor of dropped operations is saved at most once per interval (seconds).
+    # Dropped operations are irrelevant, so replaying them after restart is harmless.
+    skipped_cursor_save_interval = 1
+
+    created_at_regex = re.compile(r'"created_at"\s*:\s*"([^"]+)"')
+
+    def __init__(self, *args, **kwargs):
+        super(PrefilteredEffectsStreamWorker, self).__init__(*args, **kwargs)
+
+        self.is_operation_relevant = False
+        self.skipped_cursor_saved_at = 0
+
+    def open_stream(self, request: BaseCallBuilder) -> Iterator[dict]:
+        url = urljoin_with_query(request.horizon_url, request.endpoint)
+        for paging_token, data in request.client.stream_raw(url, request.params):
+            yield {
+                'id': paging_token,
+                'paging_token': paging_token,
+                'data': data,
+            }
+
+    def get_entry_created_at(self, entry: dict) -> datetime:
+        if 'data' not in entry:
+            return super(PrefilteredEffectsStreamWorker, self).get_entry_created_at(entry)
+
+        return datetime.fromisoformat(self.created_at_regex.search(entry['data']).group(1))
+
+    def is_relevant(self, entry: dict) -> bool:
+        data = entry['data'] if 'data' in entry else entry['type']
+        return any(marker in data for marker in self.relevant_effect_markers)
+
+    def decode_effect(self, entry: dict) -> dict:
+        if 'data' not in entry:
+            # Loaded by pages, already decoded.
+            return entry
+
+        return orjson.loads(entry['data'])
+
+    def handle_entry(self, entry: dict):
+        operation_id = entry['paging_token'].split('-')[0]
+        if operation_id != self.current_operation_id:
+            self.flush_operation()
+            self.current_operation_id = operation_id
+
+        self.effects_bunch.append(entry)
+        self.is_operation_relevant = self.is_operation_relevant or self.is_relevant(entry)
+
+    def flush_operation(self):
+        if not self.effects_bunch:
+            return
+
+        if self.is_operation_relevant:
+            self.handle_operation_effects([self.decode_effect(entry) for entry in self.effects_bunch])
+        else:
+            self.skip_operation(self.effects_bunch[-1]['paging_token'])
+
+        self.effects_bunch = []
+        self.is_operation_relevant = False
+
+    def on_idle(self):
+        # Effects of a ledger are streamed together, so a quiet stream means the last operation is complete.
+        self.flush_operation()
+
+    def skip_operation(self, paging_token: str):
+        now = time.monotonic()
+        if now - self.skipped_cursor_saved_at >= self.skipped_cursor_save_interval:
+            self.save_cursor(paging_token)
+            self.skipped_cursor_saved_at = now
+
+
 class PrometheusMetricsMixin:
     metrics_namespace = NotImplemented
 
@@ -87,14 +309,16 @@ class PrometheusMetricsMixin:
                                            'Delay between creation of a entry and its receipt by the stream.')
         self.entry_counter = Counter(f'{self.metrics_namespace}_processed_entries',
                                      'Count of processed stream entries.')
+        self.mode_enum = Enum(f'{self.metrics_namespace}_mode', 'Current loading mode of the stream.',
+                              states=[mode.value for mode in StreamMode])
+        self.mode_enum.state(self.mode.value)
 
-    def get_entry_created_at(self, entry: dict) -> datetime:
-        return date_parse(entry['created_at'])
+    def set_mode(self, mode: StreamMode):
+        super(PrometheusMetricsMixin, self).set_mode(mode)
+        self.mode_enum.state(mode.value)
 
     def handle_entry(self, entry: dict):
-        now = datetime.now(timezone.utc)
-        created_at = self.get_entry_created_at(entry)
-        self.entry_delay_summary.observe((now - created_at).total_seconds())
+        self.entry_delay_summary.observe(self.get_entry_lag(entry).total_seconds())
 
         super(PrometheusMetricsMixin, self).handle_entry(entry)
         self.entry_counter.inc()
@@ -0,0 +1,29 @@
+from django.test import SimpleTestCase, override_settings
+
+from aqua_voting_tracker.utils.db_routers import ReplicaRouter, use_replica
+
+
+@override_settings(DATABASE_REPLICAS=['replica_0'])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_read_from_primary_by_default(self):
+        self.assertIsNone(self.router.db_for_read(None))
+        self.assertEqual(self.router.db_for_write(None), 'default')
+
+    def test_read_from_replica(self):
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(None), 'replica_0')
+            self.assertEqual(self.router.db_for_write(None), 'default')
+
+        self.assertIsNone(self.router.db_for_read(None))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        with use_replica():
+            self.assertIsNone(self.router.db_for_read(None))
+
+    def test_migrate_primary_only(self):
+        self.assertTrue(self.router.allow_migrate('default', 'voting'))
+        self.assertFalse(self.router.allow_migrate('replica_0', 'voting'))
@@ -0,0 +1,78 @@
+import json
+
+from aiohttp import web
+from aiohttp.test_utils import AioHTTPTestCase
+
+from aqua_voting_tracker.utils.stellar.fake_horizon import FakeHorizonApp, FakeHorizonConfig
+
+
+class FakeHorizonAppTestCase(AioHTTPTestCase):
+    async def get_application(self) -> web.Application:
+        self.fake_horizon = FakeHorizonApp(FakeHorizonConfig(
+            voting_assets=['AQUA:GBNZILSTVQZ4R7IKQDGHYGY2QXL5QOFJYQMXPKWRRM5PAV7Y4M67AQUA'],
+            votes_count=50,
+            claimed_share=0.3,
+            noise_ratio=1,
+            stream_rate=0,
+            seed=1,
+        ))
+        return self.fake_horizon.get_application()
+
+    async def get_records(self, path: str, **params) -> list:
+        response = await self.client.get(path, params=params)
+        self.assertEqual(response.status, 200)
+        return (await response.json())['_embedded']['records']
+
+    async def test_paging(self):
+        effects = self.fake_horizon.data.effects.records
+
+        first_page = await self.get_records('/effects', limit=5)
+        second_page = await self.get_records('/effects', limit=5, cursor=first_page[-1]['paging_token'])
+        desc_page = await self.get_records('/effects', limit=5, cursor=second_page[-1]['paging_token'], order='desc')
+
+        self.assertEqual(first_page + second_page, effects[:10])
+        self.assertEqual(desc_page, effects[:9][::-1][:5])
+        self.assertEqual(await self.get_records('/effects', cursor='now'), [])
+
+    async def test_claimed_balances_are_not_listed(self):
+        data = self.fake_horizon.data
+        open_ids = {balance['id'] for balance in data.open_balances}
+        claimed_ids = {
+            operation['balance_id'] for operation in data.operations.records
+            if operation['type'] == 'claim_claimable_balance'
+        }
+        self.assertTrue(claimed_ids)
+
+        balances = []
+        cursor = None
+        while True:
+            page = await self.get_records('/claimable_balances', limit=7, **({'cursor': cursor} if cursor else {}))
+            if not page:
+                break
+            balances.extend(page)
+            cursor = page[-1]['paging_token']
+
+        self.assertEqual({balance['id'] for balance in balances}, open_ids)
+
+    async def test_effects_stream(self):
+        effects = self.fake_horizon.data.effects.records
+        response = await self.client.get(
+            '/effects', params={'cursor': effects[2]['paging_token']}, headers={'Accept': 'text/event-stream'},
+        )
+        self.assertEqual(response.headers['Content-Type'], 'text/event-stream')
+
+        event = {}
+        async for line in response.content:
+            line = line.decode().strip()
+            if not line:
+                if 'id' in event:
+                    break
+                event = {}
+                continue
+
+            field, value = line.split(': ', 1)
+            event[field] = value
+
+        response.close()
+        self.assertEqual(event['id'], effects[3]['paging_token'])
+        self.assertEqual(json.loads(event['data']), effects[3])
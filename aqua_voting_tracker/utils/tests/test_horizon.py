@@ -0,0 +1,189 @@
+import contextlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from django.conf import settings
+
+import requests
+from prometheus_client import REGISTRY
+from stellar_sdk.client.requests_client import IDENTIFICATION_HEADERS, USER_AGENT
+from stellar_sdk.exceptions import ConnectionError as HorizonConnectionError
+from stellar_sdk.exceptions import StreamClientError
+
+from aqua_voting_tracker.utils.stellar.horizon import HorizonClient, get_endpoint_label, get_horizon_server
+from aqua_voting_tracker.utils.stellar.ratelimit import Priority
+
+
+BALANCE_ID = '00000000' + 'a1' * 32
+
+
+class FakeHorizonHandler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802
+        self.server.requests.append(self.path)
+        self.server.headers.append(dict(self.headers))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+
+        body = b'{}'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeHorizonServer(ThreadingHTTPServer):
+    def __init__(self):
+        super(FakeHorizonServer, self).__init__(('127.0.0.1', 0), FakeHorizonHandler)
+        self.statuses: List[int] = []
+        self.requests: List[str] = []
+        self.headers: List[dict] = []
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_port}'
+
+
+def get_metric(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(f'{settings.PROMETHEUS_METRICS_NAMESPACE}_{name}', labels) or 0
+
+
+class HorizonClientTestCase(TestCase):
+    num_retries = 3
+
+    def setUp(self):
+        self.server = FakeHorizonServer()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.client = HorizonClient(
+            pool_size=1,
+            num_retries=self.num_retries,
+            request_timeout=5,
+            backoff_factor=0,
+            backoff_jitter=0,
+        )
+        self.addCleanup(self.client.close)
+
+    def test_retry_on_rate_limit_and_server_errors(self):
+        for status in (429, 500, 502, 503, 504):
+            with self.subTest(status=status):
+                self.server.requests.clear()
+                self.server.statuses = [status, status]
+
+                response = self.client.get(f'{self.server.url}/ledgers')
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(self.server.requests), 3)
+
+    def test_retries_are_limited(self):
+        self.server.statuses = [503] * (self.num_retries + 2)
+
+        response = self.client.get(f'{self.server.url}/ledgers')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.server.requests), self.num_retries + 1)
+
+    def test_identification_headers(self):
+        self.client.get(f'{self.server.url}/ledgers')
+
+        headers = self.server.headers[0]
+        for name, value in IDENTIFICATION_HEADERS.items():
+            self.assertEqual(headers[name], value)
+        self.assertEqual(headers['User-Agent'], USER_AGENT)
+
+    def test_client_error_is_not_retried(self):
+        self.server.statuses = [404]
+
+        response = self.client.get(f'{self.server.url}/ledgers')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_metrics_endpoint_label(self):
+        endpoint = '/claimable_balances/{id}/operations'
+        labels = {'endpoint': endpoint}
+        requests_before = get_metric('horizon_request_duration_seconds_count', labels)
+        errors_before = get_metric('horizon_request_errors_total', {**labels, 'reason': '404'})
+
+        self.server.statuses = [404]
+        self.client.get(f'{self.server.url}/claimable_balances/{BALANCE_ID}/operations?limit=200')
+        self.client.get(f'{self.server.url}/claimable_balances/{BALANCE_ID}/operations')
+
+        self.assertEqual(get_metric('horizon_request_duration_seconds_count', labels), requests_before + 2)
+        self.assertEqual(get_metric('horizon_request_errors_total', {**labels, 'reason': '404'}), errors_before + 1)
+
+    def test_connection_error_metric(self):
+        url = self.server.url
+        self.server.shutdown()
+        self.server.server_close()
+
+        errors_before = get_metric('horizon_request_errors_total', {'endpoint': '/ledgers', 'reason': 'connection'})
+        with self.assertRaises(HorizonConnectionError):
+            self.client.get(f'{url}/ledgers')
+
+        self.assertEqual(
+            get_metric('horizon_request_errors_total', {'endpoint': '/ledgers', 'reason': 'connection'}),
+            errors_before + self.num_retries + 1,
+        )
+
+    def test_every_attempt_takes_token(self):
+        self.server.statuses = [429, 503]
+
+        with patch('aqua_voting_tracker.utils.stellar.horizon.get_rate_limiter') as get_rate_limiter_mock:
+            self.client.get(f'{self.server.url}/ledgers')
+
+        self.assertEqual(get_rate_limiter_mock.return_value.acquire.call_count, 3)
+
+    def test_every_stream_reconnect_takes_token(self):
+        event = Mock(last_event_id='10-1', data='{}')
+        event_sources = [requests.Timeout(), requests.Timeout(), [event], requests.ConnectionError()]
+
+        def get_event_source(*args, **kwargs):
+            result = event_sources.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return contextlib.nullcontext(result)
+
+        client = HorizonClient(
+            pool_size=1, num_retries=0, request_timeout=5, backoff_factor=0, backoff_jitter=0,
+            stream_reconnect_delay=0,
+        )
+        self.addCleanup(client.close)
+
+        with patch('aqua_voting_tracker.utils.stellar.horizon.get_rate_limiter') as get_rate_limiter_mock, \
+                patch('aqua_voting_tracker.utils.stellar.horizon.EventSource', side_effect=get_event_source):
+            events = []
+            with self.assertRaises(StreamClientError):
+                for event_id, data in client.stream_raw(f'{self.server.url}/effects'):
+                    events.append((event_id, data))
+
+        self.assertEqual(events, [('10-1', '{}')])
+        self.assertEqual(get_rate_limiter_mock.return_value.acquire.call_count, 4)
+
+
+class GetEndpointLabelTestCase(TestCase):
+    def test_ids_are_collapsed(self):
+        account_id = 'G' + 'A' * 55
+        self.assertEqual(get_endpoint_label(f'https://horizon/accounts/{account_id}/effects?cursor=1'),
+                         '/accounts/{id}/effects')
+        self.assertEqual(get_endpoint_label('https://horizon/ledgers/123/operations'), '/ledgers/{id}/operations')
+        self.assertEqual(get_endpoint_label(f'https://horizon/claimable_balances/{BALANCE_ID}'),
+                         '/claimable_balances/{id}')
+        self.assertEqual(get_endpoint_label(f'https://horizon/assets/AQUA:{account_id}'), '/assets/{id}')
+        self.assertEqual(get_endpoint_label('https://horizon/claimable_balances'), '/claimable_balances')
+
+
+class GetHorizonServerTestCase(TestCase):
+    def test_default_url_shares_server(self):
+        self.assertIs(get_horizon_server(), get_horizon_server(settings.HORIZON_URL))
+        self.assertIs(get_horizon_server(None, Priority.LOW), get_horizon_server(settings.HORIZON_URL, Priority.LOW))
+        self.assertIsNot(get_horizon_server(), get_horizon_server(priority=Priority.LOW))
@@ -0,0 +1,103 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import URLPattern
+
+from rest_framework.test import APIClient
+
+from aqua_voting_tracker.utils.loadtest.dataset import (
+    LoadTestDataset,
+    LoadTestDatasetConfig,
+    create_loadtest_token,
+    get_loadtest_token,
+)
+from aqua_voting_tracker.utils.loadtest.runner import EndpointResult, LoadTestScenario, compare_reports
+from aqua_voting_tracker.voting.constants import PUBLISHED_SNAPSHOT_CACHE_KEY
+from aqua_voting_tracker.voting.tests.factories import VotingSnapshotFactory
+from aqua_voting_tracker.voting.urls import urlpatterns as voting_urlpatterns
+from aqua_voting_tracker.voting_rewards.constants import REWARD_CACHE_KEY
+from aqua_voting_tracker.voting_rewards.urls import urlpatterns as voting_rewards_urlpatterns
+
+
+class LoadTestScenarioTests(TestCase):
+    def setUp(self):
+        for key in (PUBLISHED_SNAPSHOT_CACHE_KEY, REWARD_CACHE_KEY):
+            self.addCleanup(cache.delete, key)
+
+        config = LoadTestDatasetConfig(
+            voting_assets=list(settings.VOTING_ASSETS),
+            votes_count=200,
+            markets_count=20,
+            accounts_count=50,
+            snapshot_days=1,
+            snapshot_interval=timedelta(hours=6),
+            reward_interval=timedelta(hours=12),
+            chunk_size=50,
+            seed=1,
+        )
+        self.stats = LoadTestDataset(config).seed()
+        self.scenario = LoadTestScenario.load(token=create_loadtest_token())
+
+    def test_dataset(self):
+        self.assertEqual(self.stats, {'votes': 200, 'snapshots': 100, 'reward_runs': 60})
+
+    def test_every_route_is_covered(self):
+        routes = {
+            str(pattern.pattern) for pattern in voting_urlpatterns + voting_rewards_urlpatterns
+            if isinstance(pattern, URLPattern)
+        }
+
+        self.assertEqual({endpoint.route for endpoint in self.scenario.get_endpoints()}, routes)
+
+    def test_requests_are_valid(self):
+        client = APIClient()
+        rnd = random.Random(1)  # noqa: S311
+        for endpoint in self.scenario.get_endpoints():
+            request = endpoint.make_request(rnd)
+            headers = {f'HTTP_{name.upper()}': value for name, value in (request.headers or {}).items()}
+            if request.method == 'POST':
+                response = client.post(f'/api/{request.path}', request.data, format='json', **headers)
+            else:
+                response = client.get(f'/api/{request.path}', request.params, **headers)
+
+            self.assertEqual(response.status_code, 200, endpoint.name)
+
+
+class LoadTestReportTests(SimpleTestCase):
+    def test_summary(self):
+        result = EndpointResult('stats', latencies=[i / 1000 for i in range(1, 101)], errors=2, duration=2)
+
+        summary = result.get_summary()
+
+        self.assertEqual(summary['requests'], 100)
+        self.assertEqual(summary['errors'], 2)
+        self.assertAlmostEqual(summary['p50_ms'], 50.5)
+        self.assertAlmostEqual(summary['p99_ms'], 99.01)
+        self.assertEqual(summary['throughput_rps'], 50)
+
+    def test_compare(self):
+        baseline = {'endpoints': {'stats': {'p50_ms': 10, 'throughput_rps': 100}, 'removed': {'p50_ms': 1}}}
+        report = {'endpoints': {'stats': {'p50_ms': 15, 'throughput_rps': 0}, 'added': {'p50_ms': 1}}}
+
+        changes = compare_reports(baseline, report, metrics=('p50_ms', 'throughput_rps'))
+
+        self.assertEqual(changes, {'stats': {'p50_ms': 0.5, 'throughput_rps': -1}})
+
+
+class RunLoadTestCommandTests(TestCase):
+    def test_token_is_not_created(self):
+        VotingSnapshotFactory()
+
+        with self.assertRaisesMessage(CommandError, 'seedloadtest'):
+            call_command('runloadtest')
+
+        self.assertFalse(get_user_model().objects.exists())
+        self.assertIsNone(get_loadtest_token())
+
+        token = create_loadtest_token()
+        self.assertEqual(get_loadtest_token(), token)
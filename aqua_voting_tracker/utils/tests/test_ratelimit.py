@@ -0,0 +1,70 @@
+import asyncio
+from unittest import TestCase
+
+from django.conf import settings
+
+import fakeredis
+from prometheus_client import REGISTRY
+
+from aqua_voting_tracker.utils.stellar.ratelimit import HorizonRateLimiter, Priority
+
+
+RESERVES = {
+    'HIGH': 0,
+    'NORMAL': 0.2,
+    'LOW': 0.5,
+}
+
+
+def get_throttled_count(priority: Priority) -> float:
+    return REGISTRY.get_sample_value(
+        f'{settings.PROMETHEUS_METRICS_NAMESPACE}_horizon_throttled_requests_total', {'priority': priority.name},
+    ) or 0
+
+
+class HorizonRateLimiterTestCase(TestCase):
+    def get_rate_limiter(self, rate: float, capacity: float) -> HorizonRateLimiter:
+        return HorizonRateLimiter(fakeredis.FakeRedis(), rate=rate, capacity=capacity, reserves=RESERVES)
+
+    def take_all(self, rate_limiter: HorizonRateLimiter, priority: Priority) -> int:
+        taken = 0
+        while not rate_limiter.try_acquire(priority):
+            taken += 1
+        return taken
+
+    def test_priority_reserves(self):
+        # Refill is negligible, bucket holds 10 tokens.
+        rate_limiter = self.get_rate_limiter(rate=0.001, capacity=10)
+
+        self.assertEqual(self.take_all(rate_limiter, Priority.LOW), 5)
+        self.assertEqual(self.take_all(rate_limiter, Priority.NORMAL), 3)
+        self.assertEqual(self.take_all(rate_limiter, Priority.HIGH), 2)
+
+    def test_wait_estimate(self):
+        rate_limiter = self.get_rate_limiter(rate=0.001, capacity=10)
+        self.take_all(rate_limiter, Priority.HIGH)
+
+        self.assertAlmostEqual(rate_limiter.try_acquire(Priority.HIGH), 1 / 0.001, delta=1)
+        self.assertAlmostEqual(rate_limiter.try_acquire(Priority.LOW), 6 / 0.001, delta=1)
+
+    def test_acquire_waits_when_throttled(self):
+        rate_limiter = self.get_rate_limiter(rate=50, capacity=1)
+        throttled_before = get_throttled_count(Priority.HIGH)
+
+        rate_limiter.acquire(Priority.HIGH)
+        self.assertEqual(get_throttled_count(Priority.HIGH), throttled_before)
+
+        rate_limiter.acquire(Priority.HIGH)
+        self.assertEqual(get_throttled_count(Priority.HIGH), throttled_before + 1)
+
+    def test_acquire_async_waits_when_throttled(self):
+        rate_limiter = self.get_rate_limiter(rate=50, capacity=2)
+        throttled_before = get_throttled_count(Priority.LOW)
+
+        async def acquire():
+            await rate_limiter.acquire_async(Priority.LOW)
+            await rate_limiter.acquire_async(Priority.LOW)
+
+        asyncio.run(acquire())
+
+        self.assertEqual(get_throttled_count(Priority.LOW), throttled_before + 1)
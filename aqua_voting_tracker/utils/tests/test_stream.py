@@ -0,0 +1,293 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from unittest import TestCase
+
+from aqua_voting_tracker.utils.stellar.stream import PrefilteredEffectsStreamWorker, StreamMode, StreamWorker
+
+
+class StopWorkerError(Exception):
+    pass
+
+
+class FakeRequestBuilder:
+    def __init__(self, entries: List[dict], calls: list):
+        self.entries = entries
+        self.calls = calls
+        self.params = {}
+
+    def limit(self, limit: int):
+        self.params['limit'] = limit
+        return self
+
+    def order(self, desc: bool = True):
+        self.params['desc'] = desc
+        return self
+
+    def cursor(self, cursor: str):
+        self.params['cursor'] = cursor
+        return self
+
+    def get_entries(self) -> List[dict]:
+        cursor = self.params.get('cursor')
+        if cursor is None:
+            return self.entries
+        return [entry for entry in self.entries if int(entry['paging_token']) > int(cursor)]
+
+    def stream(self):
+        self.calls.append(('stream', self.params.get('cursor')))
+        yield from self.get_entries()
+
+    def call(self):
+        self.calls.append(('page', self.params.get('cursor')))
+        return {'_embedded': {'records': self.get_entries()[:self.params['limit']]}}
+
+
+class FakeStreamWorker(StreamWorker):
+    paged_mode_limit = 10
+
+    def __init__(self, entries: List[dict], stop_after: int, cursor: Optional[str] = None):
+        super(FakeStreamWorker, self).__init__()
+
+        self.entries = entries
+        self.stop_after = stop_after
+        self.cursor = cursor
+        self.calls = []
+        self.handled = []
+
+    def load_cursor(self) -> Optional[str]:
+        return self.cursor
+
+    def get_request_builder(self):
+        return FakeRequestBuilder(self.entries, self.calls)
+
+    def handle_entry(self, entry: dict):
+        self.handled.append(entry['paging_token'])
+        if len(self.handled) >= self.stop_after:
+            raise StopWorkerError()
+
+
+def get_entries(old_count: int, fresh_count: int) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    entries = []
+    for index in range(old_count + fresh_count):
+        created_at = now - timedelta(hours=1) if index < old_count else now
+        entries.append({
+            'id': str(index + 1),
+            'paging_token': str(index + 1),
+            'created_at': created_at.isoformat(),
+        })
+    return entries
+
+
+class StreamWorkerModeTests(TestCase):
+    def run_worker(self, worker: StreamWorker):
+        with self.assertRaises(StopWorkerError):
+            worker.run()
+
+    def test_realtime_stream(self):
+        worker = FakeStreamWorker(get_entries(0, 5), stop_after=5)
+        self.run_worker(worker)
+
+        self.assertEqual(worker.handled, ['1', '2', '3', '4', '5'])
+        self.assertEqual(worker.calls, [('stream', None)])
+        self.assertEqual(worker.mode, StreamMode.STREAM)
+
+    def test_switch_to_paged_and_back(self):
+        entries = get_entries(25, 10)
+        worker = FakeStreamWorker(entries, stop_after=32, cursor='0')
+        self.run_worker(worker)
+
+        self.assertEqual(worker.handled, [entry['paging_token'] for entry in entries[:32]])
+        self.assertEqual(worker.calls, [
+            ('stream', '0'),
+            ('page', '1'),
+            ('page', '11'),
+            ('page', '21'),
+            ('stream', '31'),
+        ])
+        self.assertEqual(worker.mode, StreamMode.STREAM)
+
+    def test_stay_in_paged_mode_while_behind(self):
+        entries = get_entries(50, 0)
+        worker = FakeStreamWorker(entries, stop_after=25, cursor='0')
+        self.run_worker(worker)
+
+        self.assertEqual(worker.handled, [entry['paging_token'] for entry in entries[:25]])
+        self.assertEqual(worker.mode, StreamMode.PAGED)
+
+
+class QuietRequestBuilder(FakeRequestBuilder):
+    """
+    Stream which hangs after the given entries, like horizon with no new ledgers.
+    """
+    def __init__(self, entries: List[dict], calls: list, error: Exception = None):
+        super(QuietRequestBuilder, self).__init__(entries, calls)
+        self.error = error
+
+    def stream(self):
+        yield from super(QuietRequestBuilder, self).stream()
+        if self.error:
+            raise self.error
+        threading.Event().wait()
+
+
+class QuietStreamWorker(FakeStreamWorker):
+    idle_timeout = 0.01
+
+    def __init__(self, entries: List[dict], error: Exception = None):
+        super(QuietStreamWorker, self).__init__(entries, stop_after=len(entries) + 1)
+        self.error = error
+        self.idle_handled = None
+
+    def get_request_builder(self):
+        return QuietRequestBuilder(self.entries, self.calls, error=self.error)
+
+    def on_idle(self):
+        self.idle_handled = list(self.handled)
+        raise StopWorkerError()
+
+
+class SlowQuietStreamWorker(QuietStreamWorker):
+    """
+    Handler lags behind the reader thread. Mode switches record the last handled entry.
+    """
+    def __init__(self, entries: List[dict]):
+        super(SlowQuietStreamWorker, self).__init__(entries)
+        self.switches = []
+
+    def handle_entry(self, entry: dict):
+        time.sleep(0.001)
+        super(SlowQuietStreamWorker, self).handle_entry(entry)
+
+    def set_mode(self, mode: StreamMode):
+        super(SlowQuietStreamWorker, self).set_mode(mode)
+        self.switches.append((mode, self.handled[-1] if self.handled else None))
+
+
+class StreamWorkerIdleTests(TestCase):
+    def test_idle_after_entries(self):
+        entries = get_entries(0, 5)
+        worker = QuietStreamWorker(entries)
+
+        with self.assertRaises(StopWorkerError):
+            worker.run()
+
+        self.assertEqual(worker.idle_handled, [entry['paging_token'] for entry in entries])
+
+    def test_reader_error_is_raised(self):
+        worker = QuietStreamWorker(get_entries(0, 2), error=ValueError('stream failed'))
+
+        with self.assertRaises(ValueError):
+            worker.run()
+
+        self.assertEqual(worker.handled, ['1', '2'])
+
+    def test_switch_resumes_from_handled_entry(self):
+        entries = get_entries(25, 3)
+        worker = SlowQuietStreamWorker(entries)
+
+        with self.assertRaises(StopWorkerError):
+            worker.run()
+
+        self.assertEqual(worker.idle_handled, [entry['paging_token'] for entry in entries])
+        self.assertEqual(worker.switches, [(StreamMode.PAGED, '1'), (StreamMode.STREAM, '28')])
+        self.assertEqual(worker.calls, [
+            ('stream', None),
+            ('page', '1'),
+            ('page', '11'),
+            ('page', '21'),
+            ('stream', '28'),
+        ])
+
+
+class FakeRawStreamClient:
+    def __init__(self, events: List[tuple]):
+        self.events = events
+
+    def stream_raw(self, url: str, params=None):
+        yield from self.events
+
+
+class FakeRawRequestBuilder(FakeRequestBuilder):
+    horizon_url = 'https://horizon.test'
+    endpoint = 'effects'
+
+    def __init__(self, events: List[tuple], calls: list):
+        super(FakeRawRequestBuilder, self).__init__([], calls)
+        self.client = FakeRawStreamClient(events)
+
+
+class FakePrefilteredWorker(PrefilteredEffectsStreamWorker):
+    relevant_effect_markers = ('claimable_balance_created', )
+    skipped_cursor_save_interval = 0
+
+    def __init__(self, events: List[tuple]):
+        super(FakePrefilteredWorker, self).__init__()
+
+        self.events = events
+        self.calls = []
+        self.operations = []
+        self.cursors = []
+
+    def load_cursor(self) -> Optional[str]:
+        return None
+
+    def save_cursor(self, cursor: str):
+        self.cursors.append(cursor)
+
+    def get_request_builder(self):
+        return FakeRawRequestBuilder(self.events, self.calls)
+
+    def handle_operation_effects(self, operation_effects: List[dict]):
+        self.operations.append(operation_effects)
+        self.save_cursor(operation_effects[-1]['paging_token'])
+
+
+def get_raw_effect(paging_token: str, effect_type: str) -> tuple:
+    created_at = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    data = f'{{"paging_token":"{paging_token}","type":"{effect_type}","created_at":"{created_at}"}}'
+    return paging_token, data
+
+
+class PrefilteredEffectsStreamWorkerTests(TestCase):
+    def test_decode_relevant_operations_only(self):
+        events = [
+            get_raw_effect('10-1', 'account_debited'),
+            get_raw_effect('10-2', 'account_credited'),
+            get_raw_effect('11-1', 'account_debited'),
+            get_raw_effect('11-2', 'claimable_balance_created'),
+            get_raw_effect('11-3', 'claimable_balance_claimant_created'),
+            get_raw_effect('12-1', 'trade'),
+            get_raw_effect('13-1', 'trade'),
+        ]
+        worker = FakePrefilteredWorker(events)
+        for entry in worker.load_stream():
+            worker.handle_entry(entry)
+
+        self.assertEqual(len(worker.operations), 1)
+        self.assertEqual(
+            [effect['type'] for effect in worker.operations[0]],
+            ['account_debited', 'claimable_balance_created', 'claimable_balance_claimant_created'],
+        )
+        # Last operation is not complete yet.
+        self.assertEqual(worker.cursors, ['10-2', '11-3', '12-1'])
+
+    def test_paged_entries(self):
+        worker = FakePrefilteredWorker([])
+        for paging_token, effect_type in [('10-1', 'claimable_balance_created'), ('11-1', 'trade')]:
+            worker.handle_entry({'paging_token': paging_token, 'type': effect_type})
+
+        self.assertEqual(worker.operations, [[{'paging_token': '10-1', 'type': 'claimable_balance_created'}]])
+
+    def test_last_operation_is_flushed_on_idle(self):
+        worker = FakePrefilteredWorker([])
+        worker.handle_entry({'paging_token': '10-1', 'type': 'claimable_balance_created'})
+        worker.handle_entry({'paging_token': '10-2', 'type': 'claimable_balance_claimant_created'})
+        self.assertEqual(worker.operations, [])
+
+        worker.on_idle()
+
+        self.assertEqual(len(worker.operations), 1)
+        self.assertEqual(worker.cursors, ['10-2'])
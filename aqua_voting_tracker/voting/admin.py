@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from aqua_voting_tracker.voting.models import Vote, VotingSnapshot
+from aqua_voting_tracker.voting.models import Checkpoint, Vote, VotingSnapshot
 
 
 @admin.register(Vote)
@@ -14,3 +14,9 @@ class VotingSnapshotAdmin(admin.ModelAdmin):
     list_display = ['market_key', 'rank', 'timestamp', 'votes_value', 'voting_amount']
     readonly_fields = ['market_key', 'rank', 'timestamp', 'votes_value', 'voting_amount']
     ordering = ['-timestamp', 'rank']
+
+
+@admin.register(Checkpoint)
+class CheckpointAdmin(admin.ModelAdmin):
+    list_display = ['key', 'cursor', 'updated_at']
+    readonly_fields = ['key', 'updated_at']
@@ -1,45 +1,108 @@
+import logging
 from datetime import datetime
+from typing import List, Optional
 
+from django.conf import settings
+from django.db import router
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
 from rest_framework.exceptions import ParseError
 from rest_framework.generics import GenericAPIView
 from rest_framework.mixins import ListModelMixin
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from aqua_voting_tracker.utils.drf.filters import MultiGetFilterBackend
+from aqua_voting_tracker.utils.drf.mixins import ReplicaReadMixin
+from aqua_voting_tracker.voting.exceptions import VoteStateError
 from aqua_voting_tracker.voting.models import Vote, VotingSnapshot
 from aqua_voting_tracker.voting.pagination import BaseVotingPagination, FakePagination
 from aqua_voting_tracker.voting.serializers import (
+    MultiGetVotingSnapshotRequestSerializer,
     VotingAccountStatsSerializer,
+    VotingSnapshotExportRequestSerializer,
     VotingSnapshotSerializer,
     VotingSnapshotStatsSerializer,
 )
+from aqua_voting_tracker.voting.services.snapshot_export import (
+    EXPORT_FORMATS,
+    get_export_queryset,
+    stream_snapshot_export,
+)
+from aqua_voting_tracker.voting.state.client import get_fresh_vote_state_client
+
+
+logger = logging.getLogger(__name__)
 
 
-class BaseVotingSnapshotView(GenericAPIView):
+class BaseVotingSnapshotView(ReplicaReadMixin, GenericAPIView):
     serializer_class = VotingSnapshotSerializer
-    queryset = VotingSnapshot.objects.filter_last_snapshot().annotate_assets()
+    queryset = VotingSnapshot.objects.annotate_assets()
     permission_classes = (AllowAny, )
 
+    def filter_snapshot(self, queryset):
+        return queryset.filter_published_snapshot()
+
+    def get_queryset(self):
+        return self.filter_snapshot(super(BaseVotingSnapshotView, self).get_queryset())
+
+
+class VotingSnapshotAtMixin:
+    """
+    Serve snapshot stored at or before the timestamp given in the url instead of the last one.
+    """
+    timestamp_kwarg = 'timestamp'
+
+    def get_snapshot_time(self) -> datetime:
+        try:
+            return datetime.utcfromtimestamp(self.kwargs[self.timestamp_kwarg]).replace(tzinfo=timezone.utc)
+        except (ValueError, OverflowError, OSError):
+            raise ParseError()
+
+    def filter_snapshot(self, queryset):
+        return queryset.filter_snapshot_at(self.get_snapshot_time())
+
 
 class MultiGetVotingSnapshotView(ListModelMixin, BaseVotingSnapshotView):
     pagination_class = FakePagination
     filter_backends = [MultiGetFilterBackend]
     multiget_filter_fields = ['market_key']
 
+    # Read-only endpoint, POST is used only to pass long market keys list. Skip session csrf check.
+    authentication_classes = ()
+
+    def get_request_market_keys(self):
+        serializer = MultiGetVotingSnapshotRequestSerializer(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        return list(dict.fromkeys(serializer.validated_data['market_key']))
+
     def get_queryset(self):
         queryset = super(MultiGetVotingSnapshotView, self).get_queryset()
 
+        if self.request.method == 'POST':
+            return queryset.filter_market_keys(self.get_request_market_keys())
+
         if not any(filter_field in self.request.query_params for filter_field in self.multiget_filter_fields):
             return queryset.none()
 
         return queryset
 
+    def filter_queryset(self, queryset):
+        if self.request.method == 'POST':
+            # Market keys from body are already applied in get_queryset.
+            return queryset
+
+        return super(MultiGetVotingSnapshotView, self).filter_queryset(queryset)
+
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
+    def post(self, request, *args, **kwargs):
+        return self.list(request, *args, **kwargs)
+
 
 class TopVolumeSnapshotView(ListModelMixin, BaseVotingSnapshotView):
     queryset = BaseVotingSnapshotView.queryset.order_by('-adjusted_votes_value', '-votes_value')
@@ -57,16 +120,55 @@ class TopVotedSnapshotView(ListModelMixin, BaseVotingSnapshotView):
         return self.list(request, *args, **kwargs)
 
 
+class MultiGetVotingSnapshotAtView(VotingSnapshotAtMixin, MultiGetVotingSnapshotView):
+    pass
+
+
+class TopVolumeSnapshotAtView(VotingSnapshotAtMixin, TopVolumeSnapshotView):
+    pass
+
+
+class TopVotedSnapshotAtView(VotingSnapshotAtMixin, TopVotedSnapshotView):
+    pass
+
+
 class VotingSnapshotStatsView(BaseVotingSnapshotView):
     def get(self, request, *args, **kwargs):
-        stats = VotingSnapshot.objects.filter_last_snapshot().current_stats()
+        stats = VotingSnapshot.objects.filter_published_snapshot().current_stats()
         serializer = VotingSnapshotStatsSerializer(instance=stats, context=self.get_serializer_context())
         return Response(
             serializer.data,
         )
 
 
-class VotingAccountStatsView(ListModelMixin, GenericAPIView):
+class VotingSnapshotExportView(ReplicaReadMixin, APIView):
+    """
+    Stream snapshot rows of the [since, until) range ordered by timestamp and rank.
+    Interrupted export is resumed by passing the last fully received slot timestamp as the cursor.
+    """
+    authentication_classes = (TokenAuthentication, SessionAuthentication)
+    permission_classes = (IsAuthenticated, )
+
+    def get(self, request, *args, **kwargs):
+        serializer = VotingSnapshotExportRequestSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        # Response is streamed after dispatch is finished, so database is pinned here.
+        queryset = get_export_queryset(
+            since=params.get('since'),
+            until=params.get('until'),
+            cursor=params.get('cursor'),
+        ).using(router.db_for_read(VotingSnapshot))
+
+        export_format = params['output']
+        content_type, _ = EXPORT_FORMATS[export_format]
+        response = StreamingHttpResponse(stream_snapshot_export(queryset, export_format), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="voting-snapshot.{export_format}"'
+        return response
+
+
+class VotingAccountStatsView(ReplicaReadMixin, ListModelMixin, GenericAPIView):
     serializer_class = VotingAccountStatsSerializer
     permission_classes = (AllowAny, )
     pagination_class = BaseVotingPagination
@@ -80,14 +182,40 @@ class VotingAccountStatsView(ListModelMixin, GenericAPIView):
         except (ValueError, OverflowError):
             raise ParseError()
 
+        market_key = self.kwargs.get('market_key', '')
+        stats = self.get_vote_state_stats(market_key, timestamp)
+        if stats is not None:
+            return stats
+
         return Vote.objects.filter(
-            market_key=self.kwargs.get('market_key', ''),
+            market_key=market_key,
         ).filter_exist_at(
             timestamp,
         # ).filter_by_min_term(
         #     settings.VOTING_MIN_TERM,
         ).annotate_by_voting_account().order_by('voting_account')
 
+    def get_vote_state_stats(self, market_key: str, timestamp: datetime) -> Optional[List[dict]]:
+        # Vote state keeps claimed back votes for catch up period only.
+        if timestamp < timezone.now() - settings.VOTING_SNAPSHOT_CATCH_UP_LIMIT:
+            return None
+
+        vote_state = get_fresh_vote_state_client()
+        if vote_state is None:
+            return None
+
+        try:
+            stats = vote_state.get_voting_account_stats(market_key, timestamp)
+        except (OSError, EOFError, VoteStateError):
+            logger.warning('Vote state is unavailable, voting account stats are queried from database.',
+                           exc_info=True)
+            return None
+
+        return [
+            {'voting_account': voting_account, 'votes_value': votes_value}
+            for voting_account, votes_value in stats
+        ]
+
     def injection_timestamp(self):
         """
         Insert current timestamp into query params. It needed to avoid timestamp shifting at pagination.
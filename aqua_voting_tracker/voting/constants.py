@@ -0,0 +1,7 @@
+from datetime import timedelta
+
+
+PUBLISHED_SNAPSHOT_CACHE_KEY = 'aqua_voting_tracker.voting.PUBLISHED_SNAPSHOT_CACHE_KEY'
+VOTE_STATE_PUBLISH_FAILED_CACHE_KEY = 'aqua_voting_tracker.voting.VOTE_STATE_PUBLISH_FAILED_CACHE_KEY'
+# Without publication in cache, api serves the newest snapshot at least this old, so all replicas have it.
+PUBLISHED_SNAPSHOT_FALLBACK = timedelta(minutes=10)
@@ -1,2 +1,6 @@
 class VoteParsingError(Exception):
     pass
+
+
+class VoteStateError(Exception):
+    pass
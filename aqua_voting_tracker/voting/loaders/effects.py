@@ -1,27 +1,41 @@
 import logging
-from typing import List, Optional
+import sys
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
 
 from django.conf import settings
-from django.core.cache import cache
+from django.db.transaction import atomic
 
 from prometheus_client import Counter
 from stellar_sdk import Asset
 
 from aqua_voting_tracker.utils.stellar.asset import get_asset_string
-from aqua_voting_tracker.utils.stellar.stream import BunchedByOperationsEffectsStreamWorker, PrometheusMetricsMixin
-from aqua_voting_tracker.voting.tasks import (
-    task_parse_close_claimable_balance_effects,
-    task_parse_create_claimable_balance_effects,
+from aqua_voting_tracker.utils.stellar.stream import PrefilteredEffectsStreamWorker, PrometheusMetricsMixin
+from aqua_voting_tracker.voting.exceptions import VoteParsingError
+from aqua_voting_tracker.voting.models import Checkpoint, Vote
+from aqua_voting_tracker.voting.parser import (
+    parse_claimable_balance_from_effects,
+    parse_close_claimable_balance_effects,
 )
+from aqua_voting_tracker.voting.state.client import publish_vote_events
 
 
 logger = logging.getLogger(__name__)
 
 
-class EffectsStream(PrometheusMetricsMixin, BunchedByOperationsEffectsStreamWorker):
+class EffectsStream(PrometheusMetricsMixin, PrefilteredEffectsStreamWorker):
     horizon_url = settings.HORIZON_URL
 
-    cursor_cache_key = 'aqua_voting_tracker.voting.EFFECTS_CURSOR'
+    cursor_checkpoint_key = 'aqua_voting_tracker.voting.EFFECTS_CURSOR'
+
+    # Votes are written in batches, together with the cursor of the last handled operation.
+    batch_size = 100
+    batch_interval = 1
+    # Pending batch is committed when the stream is quiet for this long.
+    idle_timeout = batch_interval
+    # Cursor advance is cheap until the batch is committed.
+    skipped_cursor_save_interval = 0
 
     metrics_namespace = f'{settings.PROMETHEUS_METRICS_NAMESPACE}_effects_stream'
 
@@ -30,6 +44,12 @@ class EffectsStream(PrometheusMetricsMixin, BunchedByOperationsEffectsStreamWork
     claimable_balance_clawed_back = 'claimable_balance_clawed_back'
     account_credited = 'account_credited'
 
+    relevant_effect_markers = (
+        claimable_balance_created,
+        claimable_balance_claimed,
+        claimable_balance_clawed_back,
+    )
+
     def __init__(self, *args, **kwargs):
         super(EffectsStream, self).__init__(*args, **kwargs)
 
@@ -42,11 +62,44 @@ class EffectsStream(PrometheusMetricsMixin, BunchedByOperationsEffectsStreamWork
             'Count of processed close claimable balance operations.',
         )
 
+        self.new_votes: List[Vote] = []
+        self.closed_votes: List[Tuple[str, datetime]] = []
+        self.pending_cursor: Optional[str] = None
+        self.batch_started_at = time.monotonic()
+
     def save_cursor(self, cursor: str):
-        cache.set(self.cursor_cache_key, cursor, None)
+        """
+        Advance cursor. It is committed along with pending votes once the batch is full or old enough.
+        """
+        self.pending_cursor = cursor
+
+        batch_length = len(self.new_votes) + len(self.closed_votes)
+        if batch_length >= self.batch_size or time.monotonic() - self.batch_started_at >= self.batch_interval:
+            self.commit_batch()
 
     def load_cursor(self) -> Optional[str]:
-        return cache.get(self.cursor_cache_key)
+        return Checkpoint.objects.get_cursor(self.cursor_checkpoint_key)
+
+    def on_idle(self):
+        super(EffectsStream, self).on_idle()
+
+        if self.new_votes or self.closed_votes or self.pending_cursor:
+            self.commit_batch()
+
+    def commit_batch(self):
+        with atomic():
+            inserted = set(Vote.objects.bulk_upsert(self.new_votes))
+            closed_votes = Vote.objects.bulk_close(self.closed_votes)
+
+            if self.pending_cursor:
+                Checkpoint.objects.set_cursor(self.cursor_checkpoint_key, self.pending_cursor)
+
+        publish_vote_events([vote for vote in self.new_votes if vote.balance_id in inserted], closed_votes)
+
+        self.new_votes = []
+        self.closed_votes = []
+        self.pending_cursor = None
+        self.batch_started_at = time.monotonic()
 
     def handle_operation_effects(self, operation_effects: List[dict]):
         effects_types = {effect['type'] for effect in operation_effects}
@@ -64,7 +117,13 @@ class EffectsStream(PrometheusMetricsMixin, BunchedByOperationsEffectsStreamWork
         if claimable_balance_created_effect['asset'] not in settings.VOTING_ASSETS:
             return
 
-        task_parse_create_claimable_balance_effects.delay(operation_effects)
+        try:
+            vote = parse_claimable_balance_from_effects(operation_effects)
+        except VoteParsingError:
+            logger.warning('Invalid claimable balance.', exc_info=sys.exc_info())
+            return
+
+        self.new_votes.append(vote)
         self.processed_create_claimable_balance_counter.inc()
 
     def handle_close_claimable_balance(self, operation_effects: List[dict]):
@@ -80,5 +139,5 @@ class EffectsStream(PrometheusMetricsMixin, BunchedByOperationsEffectsStreamWork
         if balance_asset not in settings.VOTING_ASSETS:
             return
 
-        task_parse_close_claimable_balance_effects.delay(operation_effects)
+        self.closed_votes.append(parse_close_claimable_balance_effects(operation_effects))
         self.processed_close_claimable_balance_counter.inc()
@@ -2,12 +2,14 @@ import logging
 from typing import Iterator
 
 from django.conf import settings
-from django.core.cache import cache
+from django.db.transaction import atomic
 
 from dateutil.parser import parse as date_parse
 from stellar_sdk import Server
 
-from aqua_voting_tracker.voting.models import Vote
+from aqua_voting_tracker.utils.stellar.horizon import get_horizon_server
+from aqua_voting_tracker.voting.models import Checkpoint, Vote
+from aqua_voting_tracker.voting.state.client import publish_vote_events
 
 
 logger = logging.getLogger(__name__)
@@ -16,17 +18,17 @@ logger = logging.getLogger(__name__)
 class OperationLoader:
     HORIZON_URL = settings.HORIZON_URL
 
-    CURSOR_CACHE_KEY = 'aqua_voting_tracker.voting.OPERATIONS_CURSOR_CACHE_KEY'
+    CURSOR_CHECKPOINT_KEY = 'aqua_voting_tracker.voting.OPERATIONS_CURSOR_CACHE_KEY'
     PAGE_LIMIT = 200
 
     def get_server(self) -> Server:
-        return Server(self.HORIZON_URL)
+        return get_horizon_server(self.HORIZON_URL)
 
     def load_cursor(self):
-        return cache.get(self.CURSOR_CACHE_KEY)
+        return Checkpoint.objects.get_cursor(self.CURSOR_CHECKPOINT_KEY)
 
     def save_cursor(self, cursor):
-        cache.set(self.CURSOR_CACHE_KEY, cursor, None)
+        Checkpoint.objects.set_cursor(self.CURSOR_CHECKPOINT_KEY, cursor)
 
     def load_operations(self) -> Iterator[dict]:
         horizon_server = self.get_server()
@@ -36,21 +38,22 @@ class OperationLoader:
         if cursor:
             request_builder = request_builder.cursor(cursor)
 
-        for record in request_builder.stream():
-            yield record
+        yield from request_builder.stream()
 
-            self.save_cursor(record['paging_token'])
-
-    def update_claimed_back_time(self, operation):
+    def update_claimed_back_time(self, operation) -> list:
         if operation['type'] not in ['claim_claimable_balance', 'clawback_claimable_balance']:
-            return
+            return []
 
         balance_id = operation['balance_id']
         claimed_back_at = date_parse(operation['created_at'])
-        Vote.objects.filter(balance_id=balance_id).update(claimed_back_at=claimed_back_at)
+        return Vote.objects.bulk_close([(balance_id, claimed_back_at)])
 
     def run(self):
         for operation in self.load_operations():
             logger.info(f'Process operation id: {operation["id"]}')
 
-            self.update_claimed_back_time(operation)
+            with atomic():
+                closed_votes = self.update_claimed_back_time(operation)
+                self.save_cursor(operation['paging_token'])
+
+            publish_vote_events([], closed_votes)
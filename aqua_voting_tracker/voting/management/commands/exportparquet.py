@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from aqua_voting_tracker.voting.services.parquet_export import DATASETS, ParquetExporter
+
+
+class Command(BaseCommand):
+    help = 'Export votes and voting snapshots to partitioned parquet files since the last export.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--uri', default=settings.PARQUET_EXPORT_URI,
+                            help='Local path or filesystem uri (s3://bucket/path) to export to.')
+        parser.add_argument('--dataset', nargs='+', choices=[dataset.name for dataset in DATASETS],
+                            help='Datasets to export, all by default.')
+        parser.add_argument('--chunk-size', type=int, default=settings.PARQUET_EXPORT_CHUNK_SIZE,
+                            help='Rows fetched from the database and written at once.')
+
+    def handle(self, *args, **options):
+        if not options['uri']:
+            raise CommandError('Export uri is not configured, set PARQUET_EXPORT_URI or pass --uri.')
+
+        datasets = [dataset for dataset in DATASETS if not options['dataset'] or dataset.name in options['dataset']]
+        exporter = ParquetExporter(options['uri'], chunk_size=options['chunk_size'], lag=settings.PARQUET_EXPORT_LAG)
+        for dataset_name, exported in exporter.export_all(datasets).items():
+            self.stdout.write(f'{dataset_name}: {exported} rows exported.')
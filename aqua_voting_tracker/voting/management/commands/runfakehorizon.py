@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from aiohttp import web
+
+from aqua_voting_tracker.utils.stellar.fake_horizon import FakeHorizonConfig, get_fake_horizon_application
+
+
+class Command(BaseCommand):
+    help = 'Start a local horizon stand-in with synthetic voting data for offline load testing.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8010)
+        parser.add_argument('--votes', type=int, default=1000, help='Count of historical vote operations.')
+        parser.add_argument('--markets', type=int, default=100, help='Count of market keys to vote for.')
+        parser.add_argument('--market-pairs', type=int, default=20, help='Count of order books and pools.')
+        parser.add_argument('--offers', type=int, default=100, help='Offers per order book.')
+        parser.add_argument('--noise-ratio', type=int, default=10, help='Irrelevant operations per vote operation.')
+        parser.add_argument('--stream-rate', type=float, default=10, help='Live operations per second.')
+        parser.add_argument('--latency', type=float, default=0, help='Response latency, seconds.')
+        parser.add_argument('--latency-jitter', type=float, default=0, help='Random extra latency, seconds.')
+        parser.add_argument('--error-rate', type=float, default=0, help='Share of failed responses.')
+        parser.add_argument('--error-status', type=int, default=503, help='Status code of failed responses.')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        config = FakeHorizonConfig(
+            voting_assets=list(settings.VOTING_ASSETS),
+            votes_count=options['votes'],
+            markets_count=options['markets'],
+            market_pairs_count=options['market_pairs'],
+            offers_per_order_book=options['offers'],
+            noise_ratio=options['noise_ratio'],
+            stream_rate=options['stream_rate'],
+            latency=options['latency'],
+            latency_jitter=options['latency_jitter'],
+            error_rate=options['error_rate'],
+            error_status=options['error_status'],
+            seed=options['seed'],
+        )
+
+        self.stdout.write('Generating synthetic horizon data...')
+        web.run_app(get_fake_horizon_application(config), host=options['host'], port=options['port'])
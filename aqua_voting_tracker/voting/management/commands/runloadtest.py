@@ -0,0 +1,78 @@
+from django.core.management import BaseCommand, CommandError
+
+from aqua_voting_tracker.utils.loadtest.dataset import get_loadtest_token
+from aqua_voting_tracker.utils.loadtest.runner import (
+    LoadTestRunner,
+    LoadTestScenario,
+    compare_reports,
+    load_report,
+    save_report,
+)
+from aqua_voting_tracker.voting.models import VotingSnapshot
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive every public api endpoint against a running server and report latency percentiles '
+        'and throughput. Request parameters are sampled from the database seeded by seedloadtest.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base url of the server under test.')
+        parser.add_argument('--concurrency', type=int, default=10, help='Concurrent requests.')
+        parser.add_argument('--requests', type=int, default=500, help='Measured requests per endpoint.')
+        parser.add_argument('--warmup', type=int, default=10, help='Requests per endpoint sent before measuring.')
+        parser.add_argument('--timeout', type=float, default=60, help='Request timeout, seconds.')
+        parser.add_argument('--endpoint', nargs='+', help='Names of endpoints to run, all by default.')
+        parser.add_argument('--token', help='Api token for authenticated endpoints, the load test user by default.')
+        parser.add_argument('--output', help='Path to save the report to, so it can be used as a baseline.')
+        parser.add_argument('--baseline', help='Path of a previously saved report to compare with.')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if not VotingSnapshot.objects.exists():
+            raise CommandError('No snapshots found, seed the database with seedloadtest first.')
+
+        token = options['token'] or get_loadtest_token()
+        if not token:
+            raise CommandError('Load test user not found, seed the database with seedloadtest or pass --token.')
+
+        scenario = LoadTestScenario.load(token=token)
+        endpoints = scenario.get_endpoints()
+        if options['endpoint']:
+            endpoints = [endpoint for endpoint in endpoints if endpoint.name in options['endpoint']]
+
+        runner = LoadTestRunner(
+            options['url'],
+            concurrency=options['concurrency'],
+            requests_count=options['requests'],
+            warmup=options['warmup'],
+            timeout=options['timeout'],
+            seed=options['seed'],
+        )
+
+        self.stdout.write(
+            f'{"endpoint":<16}{"requests":>10}{"errors":>8}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"rps":>10}',
+        )
+        report = runner.get_report(runner.run(endpoints, on_result=self.write_result))
+
+        if options['output']:
+            save_report(report, options['output'])
+            self.stdout.write(f'Report is saved to {options["output"]}.')
+
+        if options['baseline']:
+            self.write_comparison(compare_reports(load_report(options['baseline']), report))
+
+    def write_result(self, result):
+        summary = result.get_summary()
+        self.stdout.write(
+            f'{result.name:<16}{summary["requests"]:>10}{summary["errors"]:>8}{summary["p50_ms"]:>10}'
+            f'{summary["p95_ms"]:>10}{summary["p99_ms"]:>10}{summary["throughput_rps"]:>10}',
+        )
+
+    def write_comparison(self, changes):
+        self.stdout.write('Change against baseline:')
+        for name, metrics in changes.items():
+            self.stdout.write(f'{name:<16}' + '  '.join(
+                f'{metric}: {"n/a" if change is None else f"{change:+.1%}"}' for metric, change in metrics.items()
+            ))
@@ -0,0 +1,35 @@
+import logging
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from aqua_voting_tracker.voting.state.client import get_authkey, parse_address
+from aqua_voting_tracker.voting.state.server import VoteStateServer
+
+
+class Command(BaseCommand):
+    help = 'Keep active votes in memory and serve vote aggregations to local clients.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--address', nargs='?', default=settings.VOTE_STATE_ADDRESS,
+                            help='Unix socket path or host:port to listen on.')
+
+    def set_up_logger(self):
+        logger = logging.getLogger()
+        logger.setLevel(logging.INFO)
+
+        handler = logging.StreamHandler(self.stdout)
+        logger.addHandler(handler)
+
+    def handle(self, *args, **options):
+        self.set_up_logger()
+
+        if not options['address']:
+            self.stderr.write('Vote state address is not configured, set VOTE_STATE_ADDRESS.')
+            return
+
+        VoteStateServer(
+            parse_address(options['address']),
+            get_authkey(),
+            settings.VOTE_STATE_RELOAD_INTERVAL,
+        ).serve_forever()
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from aqua_voting_tracker.utils.loadtest.dataset import (
+    LoadTestDataset,
+    LoadTestDatasetConfig,
+    create_loadtest_token,
+    flush_dataset,
+    is_dataset_empty,
+)
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with a synthetic dataset for load testing. Never run it against production.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--votes', type=int, default=1000000, help='Count of votes.')
+        parser.add_argument('--markets', type=int, default=500, help='Count of market keys to vote for.')
+        parser.add_argument('--accounts', type=int, default=50000, help='Count of voting accounts.')
+        parser.add_argument('--snapshot-days', type=int, default=90, help='Days of snapshot history.')
+        parser.add_argument('--snapshot-interval', type=int, default=60,
+                            help='Minutes between snapshots. Pass 5 to match production density.')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Rows inserted at once.')
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--flush', action='store_true',
+                            help='Delete all votes, snapshots and reward runs before seeding.')
+
+    def handle(self, *args, **options):
+        if options['flush']:
+            flush_dataset()
+        elif not is_dataset_empty():
+            raise CommandError('Database already has votes or snapshots, pass --flush to replace them.')
+
+        config = LoadTestDatasetConfig(
+            voting_assets=list(settings.VOTING_ASSETS),
+            votes_count=options['votes'],
+            markets_count=options['markets'],
+            accounts_count=options['accounts'],
+            snapshot_days=options['snapshot_days'],
+            snapshot_interval=timedelta(minutes=options['snapshot_interval']),
+            chunk_size=options['chunk_size'],
+            seed=options['seed'],
+        )
+
+        dataset = LoadTestDataset(config, on_progress=self.write_progress)
+        for name, count in dataset.seed().items():
+            self.stdout.write(f'{name}: {count} rows created.')
+
+        self.stdout.write(f'Token of the load test user: {create_loadtest_token()}')
+
+    def write_progress(self, name: str, done: int, total: int):
+        self.stdout.write(f'{name}: {done}/{total}')
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:44
+
+from django.core.cache import cache
+from django.db import migrations, models
+
+
+CURSOR_KEYS = [
+    'aqua_voting_tracker.voting.EFFECTS_CURSOR',
+    'aqua_voting_tracker.voting.OPERATIONS_CURSOR_CACHE_KEY',
+    'aqua_voting_tracker.voting.CLAIMABLE_BALANCES_CURSOR_CACHE_KEY',
+]
+
+
+def copy_cursors_from_cache(apps, schema_editor):
+    Checkpoint = apps.get_model('voting', 'Checkpoint')
+    for key, cursor in cache.get_many(CURSOR_KEYS).items():
+        Checkpoint.objects.create(key=key, cursor=cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voting', '0009_votingsnapshotasset'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Checkpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=128, unique=True)),
+                ('cursor', models.CharField(max_length=128)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(copy_cursors_from_cache, migrations.RunPython.noop),
+    ]
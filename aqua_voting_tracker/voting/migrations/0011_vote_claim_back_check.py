@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-19 14:00
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voting', '0010_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='claim_back_check_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='claim_back_check_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('claim_back_check_at', 'locked_until'), condition=models.Q(('claimed_back_at__isnull', True)), name='voting_vote_claim_back_check'),
+        ),
+    ]
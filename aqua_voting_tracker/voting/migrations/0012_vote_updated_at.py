@@ -0,0 +1,20 @@
+# Generated by Django 3.2.25 on 2026-10-19 14:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voting', '0011_vote_claim_back_check'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
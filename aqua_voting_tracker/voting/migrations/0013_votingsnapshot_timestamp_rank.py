@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voting', '0012_vote_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='votingsnapshot',
+            index=models.Index(fields=['timestamp', 'rank'], name='voting_snapshot_timestamp_rank'),
+        ),
+    ]
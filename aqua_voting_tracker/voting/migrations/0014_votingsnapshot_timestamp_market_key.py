@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-19 15:07
+
+from django.db import migrations, models
+
+
+def delete_duplicate_snapshots(apps, schema_editor):
+    VotingSnapshot = apps.get_model('voting', 'VotingSnapshot')
+    duplicates = VotingSnapshot.objects.values('timestamp', 'market_key').annotate(
+        first_id=models.Min('id'), count=models.Count('id'),
+    ).filter(count__gt=1)
+
+    for duplicate in duplicates:
+        VotingSnapshot.objects.filter(
+            timestamp=duplicate['timestamp'], market_key=duplicate['market_key'],
+        ).exclude(id=duplicate['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voting', '0013_votingsnapshot_timestamp_rank'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_snapshots, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='votingsnapshot',
+            constraint=models.UniqueConstraint(fields=('timestamp', 'market_key'), name='voting_snapshot_timestamp_market_key'),
+        ),
+    ]
@@ -1,4 +1,15 @@
-from django.db import models
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from more_itertools import chunked
+
+from aqua_voting_tracker.voting.constants import PUBLISHED_SNAPSHOT_CACHE_KEY, PUBLISHED_SNAPSHOT_FALLBACK
 
 
 class VoteQuerySet(models.QuerySet):
@@ -17,6 +28,24 @@ class VoteQuerySet(models.QuerySet):
             ),
         )
 
+    def filter_exist_between(self, start, end):
+        return self.filter(
+            models.Q(locked_at__lte=end)
+            & models.Q(
+                models.Q(claimed_back_at__isnull=True)
+                | models.Q(claimed_back_at__gt=start),
+            ),
+        )
+
+    def filter_claim_back_check_due(self, time_filter):
+        """
+        Unlocked votes with unknown claim back time which are due to be checked, in order of check time.
+        Never checked votes are due at unlock time.
+        """
+        return self.filter(claimed_back_at__isnull=True).annotate(
+            next_claim_back_check_at=Coalesce('claim_back_check_at', 'locked_until'),
+        ).filter(next_claim_back_check_at__lte=time_filter).order_by('next_claim_back_check_at')
+
     def annotate_stats(self):
         return self.values('market_key', 'asset').annotate(
             votes_value=models.Sum('amount'),
@@ -28,6 +57,71 @@ class VoteQuerySet(models.QuerySet):
             votes_value=models.Sum('amount'),
         )
 
+    def bulk_upsert(self, votes: Iterable['Vote'], batch_size: int = 1000) -> List[str]:
+        """
+        Insert votes in one statement per batch. Already known balances are not duplicated,
+        only their claim back time is filled if it was unknown. Return balance ids of inserted votes.
+        """
+        connection = connections[self.db]
+        quote_name = connection.ops.quote_name
+        table = quote_name(self.model._meta.db_table)
+        fields = [field for field in self.model._meta.concrete_fields if not field.primary_key]
+        columns = ', '.join(quote_name(field.column) for field in fields)
+        row_placeholder = '({0})'.format(', '.join(['%s'] * len(fields)))
+
+        # Postgres can't affect the same row twice in one statement.
+        unique_votes = {}
+        for vote in votes:
+            unique_votes.setdefault(vote.balance_id, vote)
+
+        inserted = []
+        with connection.cursor() as cursor:
+            for batch in chunked(unique_votes.values(), batch_size):
+                values = ', '.join([row_placeholder] * len(batch))
+                params = [
+                    field.get_db_prep_save(field.pre_save(vote, True), connection)
+                    for vote in batch for field in fields
+                ]
+                cursor.execute(
+                    f'INSERT INTO {table} ({columns}) VALUES {values} '
+                    f'ON CONFLICT (balance_id) DO UPDATE '
+                    f'SET claimed_back_at = EXCLUDED.claimed_back_at, updated_at = EXCLUDED.updated_at '
+                    f'WHERE {table}.claimed_back_at IS NULL AND EXCLUDED.claimed_back_at IS NOT NULL '
+                    f'RETURNING balance_id, (xmax = 0) AS inserted',
+                    params,
+                )
+                inserted.extend(balance_id for balance_id, is_inserted in cursor.fetchall() if is_inserted)
+
+        return inserted
+
+    def bulk_close(self, closed_votes: Iterable[Tuple[str, datetime]],
+                   batch_size: int = 1000) -> List[Tuple[str, datetime]]:
+        """
+        Set claim back time of votes by balance id in one statement per batch.
+        Return balance ids and claim back time of votes which are actually updated.
+        """
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+
+        closed_votes = list(dict(closed_votes).items())
+
+        updated = []
+        with connection.cursor() as cursor:
+            for batch in chunked(closed_votes, batch_size):
+                values = ', '.join(['(%s, %s::timestamptz)'] * len(batch))
+                cursor.execute(
+                    f'UPDATE {table} SET claimed_back_at = closed.claimed_back_at, updated_at = %s '
+                    f'FROM (VALUES {values}) '
+                    f'AS closed (balance_id, claimed_back_at) '
+                    f'WHERE {table}.balance_id = closed.balance_id '
+                    f'AND {table}.claimed_back_at IS DISTINCT FROM closed.claimed_back_at '
+                    f'RETURNING {table}.balance_id, {table}.claimed_back_at',
+                    [timezone.now()] + [value for closed_vote in batch for value in closed_vote],
+                )
+                updated.extend(cursor.fetchall())
+
+        return updated
+
 
 class Vote(models.Model):
     balance_id = models.CharField(max_length=72, unique=True)
@@ -42,22 +136,102 @@ class Vote(models.Model):
     locked_until = models.DateTimeField()
     claimed_back_at = models.DateTimeField(null=True)
 
+    claim_back_check_at = models.DateTimeField(null=True)
+    claim_back_check_count = models.PositiveIntegerField(default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     objects = VoteQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                Coalesce('claim_back_check_at', 'locked_until'),
+                condition=models.Q(claimed_back_at__isnull=True),
+                name='voting_vote_claim_back_check',
+            ),
+        ]
+
     def __str__(self):
         return f'{self.market_key} - {self.amount}'
 
     def get_vote_term(self):
         return self.locked_until - self.locked_at
 
+    def schedule_claim_back_check(self, now: datetime, interval: timedelta, max_interval: timedelta):
+        """
+        Postpone next claim back check with exponential backoff.
+        """
+        self.claim_back_check_at = now + min(interval * 2 ** self.claim_back_check_count, max_interval)
+        self.claim_back_check_count += 1
+
 
 class VotingSnapshotQuerySet(models.QuerySet):
     def filter_last_snapshot(self):
         last_snapshot_timestamp = self.order_by('-timestamp').values('timestamp')[:1]
         return self.filter(timestamp=models.Subquery(last_snapshot_timestamp))
 
+    def get_published_timestamp(self) -> Optional[datetime]:
+        """
+        Timestamp of the last snapshot replayed by all replicas. If publication is lost from cache,
+        it is restored from the newest snapshot old enough to be replayed everywhere, never from replica head.
+        """
+        timestamp = cache.get(PUBLISHED_SNAPSHOT_CACHE_KEY)
+        if timestamp is not None:
+            return timestamp
+
+        timestamp = VotingSnapshot.objects.using(self.db).filter(
+            timestamp__lte=timezone.now() - PUBLISHED_SNAPSHOT_FALLBACK,
+        ).order_by('-timestamp').values_list('timestamp', flat=True).first()
+        if timestamp is not None:
+            # Concurrent publication wins, so published snapshot never moves backwards.
+            cache.add(PUBLISHED_SNAPSHOT_CACHE_KEY, timestamp, None)
+        return timestamp
+
+    def filter_published_snapshot(self):
+        """
+        Last snapshot already replayed by all replicas.
+        """
+        timestamp = self.get_published_timestamp()
+        if timestamp is None:
+            return self.none()
+
+        return self.filter(timestamp=timestamp)
+
+    def get_snapshot_timestamp_at(self, timestamp: datetime) -> Optional[datetime]:
+        """
+        Nearest snapshot slot at or before given time. Unpublished snapshots are never returned.
+        """
+        published_timestamp = self.get_published_timestamp()
+        if published_timestamp is None:
+            return None
+
+        timestamp = min(timestamp, published_timestamp)
+        return VotingSnapshot.objects.using(self.db).filter(
+            timestamp__lte=timestamp,
+        ).order_by('-timestamp').values_list('timestamp', flat=True).first()
+
+    def filter_snapshot_at(self, timestamp: datetime):
+        snapshot_timestamp = self.get_snapshot_timestamp_at(timestamp)
+        if snapshot_timestamp is None:
+            return self.none()
+
+        return self.filter(timestamp=snapshot_timestamp)
+
+    def filter_market_keys(self, market_keys: List[str]):
+        """
+        Filter by market keys given as a single array parameter and order by position in the array.
+        """
+        table = connections[self.db].ops.quote_name(self.model._meta.db_table)
+        return self.annotate(
+            market_key_position=RawSQL(
+                f'array_position(%s::varchar[], {table}.market_key)',
+                (list(market_keys), ),
+                output_field=models.IntegerField(),
+            ),
+        ).filter(market_key_position__isnull=False).order_by('market_key_position')
+
     def annotate_assets(self):
         return self.prefetch_related(
             models.Prefetch(
@@ -82,7 +256,7 @@ class VotingSnapshotQuerySet(models.QuerySet):
             timestamp=models.Max('timestamp'),
         )
 
-        stats['assets'] = list(VotingSnapshotAsset.objects.filter_last_snapshot().get_stats_by_assets())
+        stats['assets'] = list(VotingSnapshotAsset.objects.filter(snapshot__in=self).get_stats_by_assets())
 
         return stats
 
@@ -105,6 +279,15 @@ class VotingSnapshot(models.Model):
 
     objects = VotingSnapshotQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            # Export order, rows are read without sorting.
+            models.Index(fields=['timestamp', 'rank'], name='voting_snapshot_timestamp_rank'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['timestamp', 'market_key'], name='voting_snapshot_timestamp_market_key'),
+        ]
+
     def __str__(self):
         return f'{self.market_key} - {self.timestamp}'
 
@@ -137,3 +320,27 @@ class VotingSnapshotAsset(models.Model):
 
     def __str__(self):
         return f'{self.snapshot} - {self.asset}'
+
+
+class CheckpointQuerySet(models.QuerySet):
+    def get_cursor(self, key: str):
+        return self.filter(key=key).values_list('cursor', flat=True).first()
+
+    def set_cursor(self, key: str, cursor: str):
+        """
+        Should be called within the transaction writing data loaded up to the cursor.
+        """
+        if not self.filter(key=key).update(cursor=cursor, updated_at=timezone.now()):
+            self.create(key=key, cursor=cursor)
+
+
+class Checkpoint(models.Model):
+    key = models.CharField(max_length=128, unique=True)
+    cursor = models.CharField(max_length=128)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = CheckpointQuerySet.as_manager()
+
+    def __str__(self):
+        return f'{self.key} - {self.cursor}'
@@ -152,3 +152,12 @@ def parse_claimable_balance_from_effects(effects: List[dict]) -> Vote:
         locked_at=created_at,
         locked_until=locked_until,
     )
+
+
+def parse_close_claimable_balance_effects(effects: List[dict]) -> (str, datetime):
+    close_effect = next(
+        effect for effect in effects
+        if effect['type'] in {'claimable_balance_claimed', 'claimable_balance_clawed_back'}
+    )
+
+    return close_effect['balance_id'], date_parse(close_effect['created_at'])
@@ -1,6 +1,11 @@
+from datetime import datetime
+
+from django.utils import timezone
+
 from rest_framework import serializers
 
 from aqua_voting_tracker.voting.models import VotingSnapshot
+from aqua_voting_tracker.voting.services.snapshot_export import EXPORT_FORMATS
 
 
 class VotingSnapshotAssetStatsSerializer(serializers.Serializer):
@@ -28,6 +33,30 @@ class VotingSnapshotSerializer(serializers.ModelSerializer):
         return extra
 
 
+class MultiGetVotingSnapshotRequestSerializer(serializers.Serializer):
+    market_key = serializers.ListField(
+        child=serializers.CharField(max_length=56),
+        allow_empty=False,
+        max_length=10000,
+    )
+
+
+class UnixTimestampField(serializers.IntegerField):
+    def to_internal_value(self, data):
+        value = super(UnixTimestampField, self).to_internal_value(data)
+        try:
+            return datetime.utcfromtimestamp(value).replace(tzinfo=timezone.utc)
+        except (ValueError, OverflowError, OSError):
+            self.fail('invalid')
+
+
+class VotingSnapshotExportRequestSerializer(serializers.Serializer):
+    since = UnixTimestampField(required=False)
+    until = UnixTimestampField(required=False)
+    cursor = UnixTimestampField(required=False)
+    output = serializers.ChoiceField(choices=list(EXPORT_FORMATS), default='ndjson')
+
+
 class VotingSnapshotStatsSerializer(serializers.Serializer):
     timestamp = serializers.DateTimeField()
     market_key_count = serializers.IntegerField()
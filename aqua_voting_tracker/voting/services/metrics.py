@@ -0,0 +1,113 @@
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from django.conf import settings
+from django.db import connection
+
+from prometheus_client import Counter, Gauge, Histogram
+
+
+logger = logging.getLogger(__name__)
+
+
+metrics_namespace = f'{settings.PROMETHEUS_METRICS_NAMESPACE}_voting_snapshot'
+
+stage_duration_histogram = Histogram(
+    f'{metrics_namespace}_stage_duration_seconds',
+    'Duration of snapshot creation stages.',
+    ['stage'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, float('inf')),
+)
+stage_rows_gauge = Gauge(
+    f'{metrics_namespace}_stage_rows',
+    'Count of rows consumed and produced by snapshot creation stage during the last run.',
+    ['stage', 'direction'],
+    multiprocess_mode='liveall',
+)
+stage_queries_counter = Counter(
+    f'{metrics_namespace}_stage_queries',
+    'Count of database queries executed by snapshot creation stages.',
+    ['stage'],
+)
+lateness_gauge = Gauge(
+    f'{metrics_namespace}_lateness_seconds',
+    'Delay between the moment snapshot slot is due and snapshot creation finish.',
+    multiprocess_mode='liveall',
+)
+late_counter = Counter(
+    f'{metrics_namespace}_late',
+    'Count of snapshots finished later than lateness threshold.',
+)
+
+
+_recorded_stages = contextvars.ContextVar('recorded_stages', default=None)
+_active_stage = contextvars.ContextVar('active_stage', default=None)
+
+
+@contextmanager
+def record_stages() -> Iterator[List['SnapshotStage']]:
+    """
+    Collect stages finished within the block, in order of finish. Used by benchmarks.
+    """
+    token = _recorded_stages.set([])
+    try:
+        yield _recorded_stages.get()
+    finally:
+        _recorded_stages.reset(token)
+
+
+class SnapshotStage:
+    """
+    Measure duration, rows and database queries of a snapshot creation stage.
+    Queries of nested stages are counted by the innermost stage only.
+    """
+    def __init__(self, name: str, rows_in: Optional[int] = None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out: Optional[int] = None
+        self.queries = 0
+        self.duration: Optional[float] = None
+
+        self._started_at = None
+        self._active_token = None
+        self._execute_wrapper = connection.execute_wrapper(self.count_query)
+
+    def count_query(self, execute, sql, params, many, context):
+        if _active_stage.get() is self:
+            self.queries += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self) -> 'SnapshotStage':
+        self._execute_wrapper.__enter__()
+        self._active_token = _active_stage.set(self)
+        self._started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        duration = self.duration = time.perf_counter() - self._started_at
+        _active_stage.reset(self._active_token)
+        self._execute_wrapper.__exit__(exc_type, exc_val, exc_tb)
+
+        recorded_stages = _recorded_stages.get()
+        if recorded_stages is not None:
+            recorded_stages.append(self)
+
+        stage_duration_histogram.labels(self.name).observe(duration)
+        stage_queries_counter.labels(self.name).inc(self.queries)
+        if self.rows_in is not None:
+            stage_rows_gauge.labels(self.name, 'in').set(self.rows_in)
+        if self.rows_out is not None:
+            stage_rows_gauge.labels(self.name, 'out').set(self.rows_out)
+
+        logger.info('Snapshot stage %s: %.3fs, rows %s -> %s, queries %s.',
+                    self.name, duration, self.rows_in, self.rows_out, self.queries)
+
+
+def observe_lateness(lateness: float, threshold: float):
+    lateness_gauge.set(lateness)
+    if lateness > threshold:
+        late_counter.inc()
+        logger.error('Voting snapshot is late for %.0f seconds.', lateness)
@@ -0,0 +1,245 @@
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from django.db import DEFAULT_DB_ALIAS, connections, models, router
+from django.utils import timezone
+
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+from more_itertools import chunked
+from pyarrow import fs
+
+from aqua_voting_tracker.utils.db_routers import use_replica
+from aqua_voting_tracker.voting.models import Checkpoint, Vote, VotingSnapshot, VotingSnapshotAsset
+
+
+logger = logging.getLogger(__name__)
+
+
+PARQUET_EXPORT_CHECKPOINT_KEY = 'aqua_voting_tracker.voting.PARQUET_EXPORT'
+
+DEFAULT_LAG = timedelta(minutes=5)
+
+TIMESTAMP = pa.timestamp('us', tz='UTC')
+AMOUNT = pa.decimal128(20, 7)
+
+
+@dataclass
+class ExportColumn:
+    name: str
+    type: pa.DataType
+    # Queryset lookup, column name by default.
+    lookup: str = None
+    convert: Callable[[Any], Any] = None
+
+    def get_lookup(self) -> str:
+        return self.lookup or self.name
+
+
+@dataclass
+class ExportDataset:
+    """
+    Model exported in order of cursor field. Rows are written to a partition by date of partition field.
+    Datetime cursors are exported only up to the lag, as rows updated recently may be not committed yet.
+    """
+    name: str
+    model: Type[models.Model]
+    columns: List[ExportColumn]
+    partition_field: str
+    cursor_field: str = 'id'
+
+    @property
+    def is_time_cursor(self) -> bool:
+        return isinstance(self.model._meta.get_field(self.cursor_field), models.DateTimeField)
+
+    @property
+    def schema(self) -> pa.Schema:
+        return pa.schema([(column.name, column.type) for column in self.columns])
+
+    def parse_cursor(self, cursor: Optional[str]):
+        if cursor is None:
+            return None
+        if self.is_time_cursor:
+            return datetime.fromisoformat(cursor)
+        return int(cursor)
+
+    def format_cursor(self, cursor) -> str:
+        if isinstance(cursor, datetime):
+            return cursor.isoformat()
+        return str(cursor)
+
+    def get_queryset(self, cursor, until: Optional[datetime]) -> models.QuerySet:
+        queryset = self.model.objects.all()
+        if cursor is not None:
+            queryset = queryset.filter(**{f'{self.cursor_field}__gt': cursor})
+        if self.is_time_cursor:
+            queryset = queryset.filter(**{f'{self.cursor_field}__lte': until})
+
+        ordering = [self.cursor_field] if self.cursor_field == 'id' else [self.cursor_field, 'id']
+        lookups = [self.partition_field, self.cursor_field] + [column.get_lookup() for column in self.columns]
+        return queryset.order_by(*ordering).values_list(*lookups)
+
+    def to_batch(self, rows: List[tuple]) -> pa.RecordBatch:
+        arrays = []
+        for index, column in enumerate(self.columns, start=2):
+            values = [row[index] for row in rows]
+            if column.convert:
+                values = [column.convert(value) for value in values]
+            arrays.append(pa.array(values, type=column.type))
+
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+def dump_json(value) -> Optional[str]:
+    return None if value is None else orjson.dumps(value).decode()
+
+
+VOTE_DATASET = ExportDataset(
+    name='vote',
+    model=Vote,
+    cursor_field='updated_at',
+    partition_field='updated_at',
+    columns=[
+        ExportColumn('id', pa.int64()),
+        ExportColumn('balance_id', pa.string()),
+        ExportColumn('voting_account', pa.string()),
+        ExportColumn('market_key', pa.string()),
+        ExportColumn('asset', pa.string()),
+        ExportColumn('amount', AMOUNT),
+        ExportColumn('locked_at', TIMESTAMP),
+        ExportColumn('locked_until', TIMESTAMP),
+        ExportColumn('claimed_back_at', TIMESTAMP),
+        ExportColumn('created_at', TIMESTAMP),
+        ExportColumn('updated_at', TIMESTAMP),
+    ],
+)
+
+VOTING_SNAPSHOT_DATASET = ExportDataset(
+    name='voting_snapshot',
+    model=VotingSnapshot,
+    partition_field='timestamp',
+    columns=[
+        ExportColumn('id', pa.int64()),
+        ExportColumn('timestamp', TIMESTAMP),
+        ExportColumn('market_key', pa.string()),
+        ExportColumn('rank', pa.int32()),
+        ExportColumn('votes_value', AMOUNT),
+        ExportColumn('voting_amount', pa.int64()),
+        ExportColumn('upvote_value', AMOUNT),
+        ExportColumn('downvote_value', AMOUNT),
+        ExportColumn('adjusted_votes_value', AMOUNT),
+        ExportColumn('extra', pa.string(), convert=dump_json),
+    ],
+)
+
+VOTING_SNAPSHOT_ASSET_DATASET = ExportDataset(
+    name='voting_snapshot_asset',
+    model=VotingSnapshotAsset,
+    partition_field='snapshot__timestamp',
+    columns=[
+        ExportColumn('id', pa.int64()),
+        ExportColumn('snapshot_id', pa.int64()),
+        ExportColumn('snapshot_timestamp', TIMESTAMP, lookup='snapshot__timestamp'),
+        ExportColumn('asset', pa.string()),
+        ExportColumn('direction', pa.int16()),
+        ExportColumn('votes_sum', AMOUNT),
+        ExportColumn('votes_count', pa.int64()),
+    ],
+)
+
+DATASETS = [VOTE_DATASET, VOTING_SNAPSHOT_DATASET, VOTING_SNAPSHOT_ASSET_DATASET]
+
+
+class ParquetExporter:
+    """
+    Export datasets incrementally to hive partitioned parquet files: <uri>/<dataset>/date=<date>/part-<cursor>.parquet.
+    Uri is a local path or any filesystem uri supported by pyarrow (s3://, gs://, hdfs://).
+    Rows are streamed from a server-side cursor, so memory is bounded by the chunk size.
+    Every run writes one file per touched partition, named by the cursor it started from,
+    so a run interrupted before saving the checkpoint is overwritten by the next one.
+    Only the writer of the current partition is kept open; if rows return to a closed partition,
+    another file of the partition is started.
+    Datetime cursors are also held behind the replica, so rows it hasn't replayed yet aren't skipped.
+    Rows of mutable datasets (votes) are exported again on every update, latest updated_at wins.
+    """
+
+    def __init__(self, uri: str, chunk_size: int = 10000, lag: timedelta = DEFAULT_LAG):
+        self.filesystem, self.base_path = fs.FileSystem.from_uri(uri)
+        self.chunk_size = chunk_size
+        self.lag = lag
+
+    def get_checkpoint_key(self, dataset: ExportDataset) -> str:
+        return f'{PARQUET_EXPORT_CHECKPOINT_KEY}.{dataset.name}'
+
+    def get_path(self, dataset: ExportDataset, partition: datetime, cursor: Optional[str], part: int = 0) -> str:
+        part_name = re.sub(r'[^0-9A-Za-z]', '', cursor) if cursor else '0'
+        if part:
+            part_name = f'{part_name}-{part}'
+        return f'{self.base_path}/{dataset.name}/date={partition.date().isoformat()}/part-{part_name}.parquet'
+
+    def open_writer(self, dataset: ExportDataset, partition: datetime, cursor: Optional[str],
+                    part: int = 0) -> pq.ParquetWriter:
+        path = self.get_path(dataset, partition, cursor, part)
+        self.filesystem.create_dir(path.rsplit('/', 1)[0], recursive=True)
+        return pq.ParquetWriter(path, dataset.schema, filesystem=self.filesystem, compression='zstd')
+
+    def get_replay_timestamp(self, using: str) -> Optional[datetime]:
+        """
+        Commit time of the last transaction replayed by replica, None on primary.
+        """
+        with connections[using].cursor() as db_cursor:
+            db_cursor.execute('SELECT pg_last_xact_replay_timestamp()')
+            return db_cursor.fetchone()[0]
+
+    def get_until(self, dataset: ExportDataset) -> datetime:
+        until = timezone.now()
+        replay_timestamp = self.get_replay_timestamp(router.db_for_read(dataset.model) or DEFAULT_DB_ALIAS)
+        if replay_timestamp is not None:
+            until = min(until, replay_timestamp)
+        return until - self.lag
+
+    def export(self, dataset: ExportDataset) -> int:
+        checkpoint_key = self.get_checkpoint_key(dataset)
+        start_cursor = Checkpoint.objects.get_cursor(checkpoint_key)
+        cursor = dataset.parse_cursor(start_cursor)
+
+        parts: Dict[date, int] = {}
+        writer: Optional[pq.ParquetWriter] = None
+        partition = None
+        exported = 0
+        try:
+            with use_replica():
+                until = self.get_until(dataset) if dataset.is_time_cursor else None
+                rows = dataset.get_queryset(cursor, until).iterator(chunk_size=self.chunk_size)
+                for chunk in chunked(rows, self.chunk_size):
+                    for row_partition, partition_rows in groupby(chunk, key=lambda row: row[0].date()):
+                        partition_rows = list(partition_rows)
+                        if row_partition != partition:
+                            if writer:
+                                writer.close()
+                            partition = row_partition
+                            parts[partition] = parts[partition] + 1 if partition in parts else 0
+                            writer = self.open_writer(dataset, partition_rows[0][0], start_cursor, parts[partition])
+                        writer.write_batch(dataset.to_batch(partition_rows))
+
+                    exported += len(chunk)
+                    cursor = chunk[-1][1]
+        finally:
+            if writer:
+                writer.close()
+
+        if dataset.is_time_cursor:
+            cursor = until
+        if cursor is not None:
+            Checkpoint.objects.set_cursor(checkpoint_key, dataset.format_cursor(cursor))
+
+        logger.info('Parquet export of %s: %s rows in %s partitions.', dataset.name, exported, len(parts))
+        return exported
+
+    def export_all(self, datasets: List[ExportDataset] = None) -> Dict[str, int]:
+        return {dataset.name: self.export(dataset) for dataset in datasets or DATASETS}
@@ -1,13 +1,24 @@
 import dataclasses
+import logging
+from collections import defaultdict
 from datetime import datetime
 from decimal import Decimal
-from typing import Iterable, Iterator, List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Max
 from django.db.transaction import atomic
+from django.utils import timezone
 
+from aqua_voting_tracker.voting.exceptions import VoteStateError
 from aqua_voting_tracker.voting.marketkeys.base import BaseMarketKeysProvider
 from aqua_voting_tracker.voting.models import Vote, VotingSnapshot, VotingSnapshotAsset
+from aqua_voting_tracker.voting.services.metrics import SnapshotStage, observe_lateness
+from aqua_voting_tracker.voting.state.client import VoteStateClient, get_fresh_vote_state_client
+
+
+logger = logging.getLogger(__name__)
 
 
 @dataclasses.dataclass
@@ -46,11 +57,33 @@ class SnapshotRecord:
 
 class SnapshotCreationUseCase:
     VOTING_MIN_TERM = settings.VOTING_MIN_TERM
+    SNAPSHOT_INTERVAL = settings.VOTING_SNAPSHOT_INTERVAL
+    LATENESS_THRESHOLD = settings.VOTING_SNAPSHOT_LATENESS_THRESHOLD
+    CATCH_UP_LIMIT = settings.VOTING_SNAPSHOT_CATCH_UP_LIMIT
+
+    @classmethod
+    def get_finished_slot(cls, moment: datetime) -> datetime:
+        """
+        Timestamp of the last snapshot slot which is over at the moment.
+        """
+        interval = cls.SNAPSHOT_INTERVAL.total_seconds()
+        slot = datetime.fromtimestamp(moment.timestamp() // interval * interval, tz=timezone.utc)
+        return slot - cls.SNAPSHOT_INTERVAL
 
     def __init__(self, market_key_provider: BaseMarketKeysProvider):
         self.market_key_provider = market_key_provider
 
+    def get_vote_state(self) -> Optional[VoteStateClient]:
+        return get_fresh_vote_state_client()
+
     def get_votes_aggregation(self, timestamp: datetime) -> dict:
+        vote_state = self.get_vote_state()
+        if vote_state:
+            try:
+                return vote_state.get_votes_aggregation(timestamp)
+            except (OSError, EOFError, VoteStateError):
+                logger.warning('Vote state is unavailable, votes are aggregated by database.', exc_info=True)
+
         # TODO
         # queryset = Vote.objects.filter_by_min_term(self.VOTING_MIN_TERM).filter_exist_at(timestamp)
         queryset = Vote.objects.filter_exist_at(timestamp)
@@ -65,6 +98,61 @@ class SnapshotCreationUseCase:
 
         return votes_aggregation
 
+    def get_votes_aggregations(self, timestamps: List[datetime]) -> Iterator[Tuple[datetime, dict]]:
+        """
+        Aggregate votes for several timestamps in one pass.
+        Votes are replayed as lock and claim back events, aggregation is captured at every timestamp.
+        """
+        vote_state = self.get_vote_state()
+        if vote_state:
+            try:
+                yield from vote_state.get_votes_aggregations(timestamps)
+                return
+            except (OSError, EOFError, VoteStateError):
+                logger.warning('Vote state is unavailable, votes are aggregated by database.', exc_info=True)
+
+        timestamps = sorted(timestamps)
+        queryset = Vote.objects.filter_exist_between(timestamps[0], timestamps[-1])
+
+        events = []
+        for market_key, asset, voting_account, amount, locked_at, claimed_back_at in queryset.values_list(
+            'market_key', 'asset', 'voting_account', 'amount', 'locked_at', 'claimed_back_at',
+        ).iterator():
+            events.append((locked_at, 1, (market_key, asset), voting_account, amount))
+            if claimed_back_at:
+                events.append((claimed_back_at, -1, (market_key, asset), voting_account, amount))
+        # Locks go before claim backs happened at the same time, so counters never go negative.
+        events.sort(key=lambda event: (event[0], -event[1]))
+
+        votes_value: Dict[Tuple[str, str], Decimal] = defaultdict(Decimal)
+        voting_accounts: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+        events_iterator = iter(events)
+        event = next(events_iterator, None)
+        for timestamp in timestamps:
+            while event and event[0] <= timestamp:
+                _, sign, stat_key, voting_account, amount = event
+                votes_value[stat_key] += sign * amount
+                voting_accounts[stat_key][voting_account] += sign
+                if not voting_accounts[stat_key][voting_account]:
+                    del voting_accounts[stat_key][voting_account]
+                if not voting_accounts[stat_key]:
+                    del voting_accounts[stat_key]
+                    del votes_value[stat_key]
+
+                event = next(events_iterator, None)
+
+            votes_aggregation = {}
+            for (market_key, asset), value in votes_value.items():
+                votes_aggregation.setdefault(market_key, []).append({
+                    'market_key': market_key,
+                    'asset': asset,
+                    'votes_value': value,
+                    'voting_amount': len(voting_accounts[market_key, asset]),
+                })
+
+            yield timestamp, votes_aggregation
+
     def get_markets_data(self, market_keys: Iterable[str]) -> Iterator[SnapshotRecord]:
         yield from (
             SnapshotRecord(
@@ -171,19 +259,95 @@ class SnapshotCreationUseCase:
                     votes_count=asset_record.votes_count,
                 ))
 
-        with atomic():
-            VotingSnapshot.objects.bulk_create(snapshot_objects)
-            VotingSnapshotAsset.objects.bulk_create(asset_objects)
+        try:
+            with atomic():
+                if VotingSnapshot.objects.filter(timestamp=timestamp).exists():
+                    logger.warning('Voting snapshot %s already exists.', timestamp)
+                    return
 
-    def create_snapshot(self, timestamp: datetime):
-        votes_aggregation = self.get_votes_aggregation(timestamp)
+                VotingSnapshot.objects.bulk_create(snapshot_objects)
+                VotingSnapshotAsset.objects.bulk_create(asset_objects)
+        except IntegrityError:
+            # Concurrent run has saved the slot after the check.
+            logger.warning('Voting snapshot %s already exists.', timestamp)
+
+    def process_snapshot(self, snapshot: List[SnapshotRecord], votes_aggregation: dict, timestamp: datetime):
+        with SnapshotStage('votes_value', rows_in=len(snapshot)) as stage:
+            snapshot = list(self.set_votes_value(snapshot, votes_aggregation))
+            snapshot = list(self.apply_boost(snapshot))
+            stage.rows_out = len(snapshot)
 
-        snapshot = self.get_markets_data(votes_aggregation.keys())
+        with SnapshotStage('ranking', rows_in=len(snapshot)) as stage:
+            snapshot = list(self.set_rank(snapshot))
+            stage.rows_out = len(snapshot)
 
-        snapshot = self.set_votes_value(snapshot, votes_aggregation)
+        with SnapshotStage('saving', rows_in=len(snapshot)) as stage:
+            self.save_snapshot(snapshot, timestamp)
+            stage.rows_out = len(snapshot)
 
-        snapshot = self.apply_boost(snapshot)
+    def observe_lateness(self, timestamp: datetime):
+        lateness = timezone.now() - (timestamp + self.SNAPSHOT_INTERVAL)
+        observe_lateness(lateness.total_seconds(), self.LATENESS_THRESHOLD.total_seconds())
 
-        snapshot = self.set_rank(snapshot)
+    def create_snapshot(self, timestamp: datetime):
+        with SnapshotStage('aggregation') as stage:
+            votes_aggregation = self.get_votes_aggregation(timestamp)
+            stage.rows_out = len(votes_aggregation)
+
+        with SnapshotStage('markets_data', rows_in=len(votes_aggregation)) as stage:
+            snapshot = list(self.get_markets_data(votes_aggregation.keys()))
+            stage.rows_out = len(snapshot)
+
+        self.process_snapshot(snapshot, votes_aggregation, timestamp)
+
+        self.observe_lateness(timestamp)
+
+    def create_snapshots(self, timestamps: List[datetime]):
+        """
+        Create snapshots for several timestamps in one pass over votes. Markets data is loaded once.
+        """
+        timestamps = sorted(timestamps)
+        market_keys = list(
+            Vote.objects.filter_exist_between(timestamps[0], timestamps[-1])
+            .values_list('market_key', flat=True).distinct(),
+        )
 
-        self.save_snapshot(snapshot, timestamp)
+        with SnapshotStage('markets_data', rows_in=len(market_keys)) as stage:
+            markets_data = list(self.get_markets_data(market_keys))
+            stage.rows_out = len(markets_data)
+
+        with SnapshotStage('catch_up', rows_in=len(timestamps)) as stage:
+            stage.rows_out = 0
+            for timestamp, votes_aggregation in self.get_votes_aggregations(timestamps):
+                snapshot = [dataclasses.replace(snapshot_record) for snapshot_record in markets_data]
+                self.process_snapshot(snapshot, votes_aggregation, timestamp)
+                stage.rows_out += 1
+
+        self.observe_lateness(timestamps[-1])
+
+    def get_missing_timestamps(self, timestamp: datetime) -> List[datetime]:
+        """
+        Slots up to the given timestamp without snapshot, not older than catch up limit.
+        """
+        last_timestamp = VotingSnapshot.objects.aggregate(timestamp=Max('timestamp'))['timestamp']
+        if last_timestamp:
+            slot = max(last_timestamp + self.SNAPSHOT_INTERVAL, timestamp - self.CATCH_UP_LIMIT)
+        else:
+            slot = timestamp
+
+        timestamps = []
+        while slot <= timestamp:
+            timestamps.append(slot)
+            slot += self.SNAPSHOT_INTERVAL
+
+        return timestamps
+
+    def create_missing_snapshots(self, timestamp: datetime):
+        timestamps = self.get_missing_timestamps(timestamp)
+        if not timestamps:
+            logger.warning('Voting snapshot %s already exists.', timestamp)
+        elif len(timestamps) == 1:
+            self.create_snapshot(timestamp)
+        else:
+            logger.warning('Catch up %s missed voting snapshots since %s.', len(timestamps) - 1, timestamps[0])
+            self.create_snapshots(timestamps)
@@ -0,0 +1,93 @@
+import csv
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, Optional
+
+import orjson
+from more_itertools import chunked
+
+from aqua_voting_tracker.voting.models import VotingSnapshot
+
+
+EXPORT_FIELDS = (
+    'timestamp',
+    'market_key',
+    'rank',
+    'votes_value',
+    'voting_amount',
+    'upvote_value',
+    'downvote_value',
+    'adjusted_votes_value',
+)
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def get_export_queryset(since: Optional[datetime] = None, until: Optional[datetime] = None,
+                        cursor: Optional[datetime] = None):
+    """
+    Snapshot rows of [since, until) range in export order. Cursor is the last exported slot, it is excluded.
+    Unpublished snapshots are never exported.
+    """
+    queryset = VotingSnapshot.objects.all()
+    if since is not None:
+        queryset = queryset.filter(timestamp__gte=since)
+    if until is not None:
+        queryset = queryset.filter(timestamp__lt=until)
+    if cursor is not None:
+        queryset = queryset.filter(timestamp__gt=cursor)
+
+    published_timestamp = queryset.get_published_timestamp()
+    if published_timestamp is None:
+        return queryset.none().values_list(*EXPORT_FIELDS)
+    queryset = queryset.filter(timestamp__lte=published_timestamp)
+
+    return queryset.order_by('timestamp', 'rank').values_list(*EXPORT_FIELDS)
+
+
+def format_value(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat().replace('+00:00', 'Z')
+    return value
+
+
+class Echo:
+    """
+    File-like object which returns written value instead of buffering it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_ndjson(rows: Iterable[tuple], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    for chunk in chunked(rows, chunk_size):
+        yield b''.join(
+            orjson.dumps({
+                field: format_value(value) for field, value in zip(EXPORT_FIELDS, row)
+            }) + b'\n'
+            for row in chunk
+        )
+
+
+def iter_csv(rows: Iterable[tuple], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for chunk in chunked(rows, chunk_size):
+        yield ''.join(writer.writerow([format_value(value) for value in row]) for row in chunk)
+
+
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', iter_ndjson),
+    'csv': ('text/csv', iter_csv),
+}
+
+
+def stream_snapshot_export(queryset, export_format: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator:
+    """
+    Rows are fetched with a server-side cursor and rendered by chunks, so memory stays flat for any range.
+    """
+    _, render = EXPORT_FORMATS[export_format]
+    return render(queryset.iterator(chunk_size=chunk_size), chunk_size=chunk_size)
@@ -0,0 +1,39 @@
+import logging
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+
+from aqua_voting_tracker.voting.constants import PUBLISHED_SNAPSHOT_CACHE_KEY
+from aqua_voting_tracker.voting.models import VotingSnapshot
+
+
+logger = logging.getLogger(__name__)
+
+
+def is_snapshot_replicated(timestamp: datetime) -> bool:
+    return all(
+        VotingSnapshot.objects.using(replica).filter(timestamp=timestamp).exists()
+        for replica in settings.DATABASE_REPLICAS
+    )
+
+
+def publish_snapshot(timestamp: datetime) -> bool:
+    """
+    Make snapshot visible to api as the last one. Snapshot is published only after all replicas replayed it,
+    so the api never switches back and forth between snapshots while replicas catch up.
+    Return false if replicas are lagging.
+    """
+    published_timestamp = cache.get(PUBLISHED_SNAPSHOT_CACHE_KEY)
+    if published_timestamp and published_timestamp >= timestamp:
+        return True
+
+    if not VotingSnapshot.objects.filter(timestamp=timestamp).exists():
+        logger.warning('Voting snapshot %s is empty, nothing to publish.', timestamp)
+        return True
+
+    if not is_snapshot_replicated(timestamp):
+        return False
+
+    cache.set(PUBLISHED_SNAPSHOT_CACHE_KEY, timestamp, None)
+    return True
@@ -0,0 +1,161 @@
+import logging
+from datetime import datetime
+from decimal import Decimal
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+from typing import Iterable, List, Optional, Tuple, Union
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from aqua_voting_tracker.voting.constants import VOTE_STATE_PUBLISH_FAILED_CACHE_KEY
+from aqua_voting_tracker.voting.exceptions import VoteStateError
+from aqua_voting_tracker.voting.state.protocol import (
+    dump_message,
+    load_message,
+    parse_timestamp,
+    parse_votes_aggregation,
+    parse_voting_account_stats,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+Address = Union[str, Tuple[str, int]]
+
+
+def parse_address(address: str) -> Address:
+    """
+    Unix socket path or host:port, the latter only if tcp is explicitly allowed.
+    """
+    if address.startswith('/') or ':' not in address:
+        return address
+
+    if not settings.VOTE_STATE_ALLOW_TCP:
+        raise ImproperlyConfigured(f'Vote state address {address} is not a unix socket, set VOTE_STATE_ALLOW_TCP.')
+
+    host, port = address.rsplit(':', 1)
+    return host, int(port)
+
+
+def get_authkey() -> bytes:
+    if not settings.VOTE_STATE_AUTHKEY:
+        raise ImproperlyConfigured('Vote state requires VOTE_STATE_AUTHKEY.')
+
+    return settings.VOTE_STATE_AUTHKEY.encode()
+
+
+class VoteStateClient:
+    """
+    Client of the vote state process started by runvotestate command.
+    """
+
+    def __init__(self, address: Address, authkey: bytes, timeout: float):
+        self.address = address
+        self.authkey = authkey
+        self.timeout = timeout
+
+    def call(self, method: str, *args):
+        try:
+            connection = Client(self.address, authkey=self.authkey)
+        except AuthenticationError as exc:
+            raise VoteStateError(f'Vote state authentication failed: {exc}.')
+
+        with connection:
+            connection.send_bytes(dump_message([method, args]))
+            if not connection.poll(self.timeout):
+                raise VoteStateError(f'Vote state call {method} timed out.')
+
+            is_success, result = load_message(connection.recv_bytes())
+
+        if not is_success:
+            raise VoteStateError(result)
+
+        return result
+
+    def get_votes_aggregation(self, timestamp: datetime) -> dict:
+        return parse_votes_aggregation(self.call('get_votes_aggregation', timestamp))
+
+    def get_votes_aggregations(self, timestamps: List[datetime]) -> List[Tuple[datetime, dict]]:
+        return [
+            (parse_timestamp(timestamp), parse_votes_aggregation(votes_aggregation))
+            for timestamp, votes_aggregation in self.call('get_votes_aggregations', timestamps)
+        ]
+
+    def get_voting_account_stats(self, market_key: str, timestamp: datetime) -> List[Tuple[str, Decimal]]:
+        return parse_voting_account_stats(self.call('get_voting_account_stats', market_key, timestamp))
+
+    def apply_events(self, new_votes: list, closed_votes: List[Tuple[str, datetime]]):
+        return self.call('apply_events', new_votes, closed_votes)
+
+    def get_loaded_at(self) -> Optional[datetime]:
+        return parse_timestamp(self.call('get_loaded_at'))
+
+    def is_stale(self) -> bool:
+        """
+        Engine misses events which failed to publish until it is reloaded after the failure.
+        """
+        failed_at = cache.get(VOTE_STATE_PUBLISH_FAILED_CACHE_KEY)
+        if failed_at is None:
+            return False
+
+        loaded_at = self.get_loaded_at()
+        return loaded_at is None or loaded_at <= failed_at
+
+
+def get_vote_state_client(timeout: float = None) -> Optional[VoteStateClient]:
+    if not settings.VOTE_STATE_ADDRESS:
+        return None
+
+    return VoteStateClient(
+        parse_address(settings.VOTE_STATE_ADDRESS), get_authkey(), timeout or settings.VOTE_STATE_TIMEOUT,
+    )
+
+
+def get_fresh_vote_state_client() -> Optional[VoteStateClient]:
+    """
+    Vote state client if engine is reachable and has all published events, None to query database instead.
+    """
+    client = get_vote_state_client()
+    if client is None:
+        return None
+
+    try:
+        is_stale = client.is_stale()
+    except (OSError, EOFError, VoteStateError):
+        logger.warning('Vote state is unavailable, votes are aggregated by database.', exc_info=True)
+        return None
+
+    if is_stale:
+        logger.warning('Vote state missed events, votes are aggregated by database until it is reloaded.')
+        return None
+
+    return client
+
+
+def publish_vote_events(new_votes: Iterable, closed_votes: Iterable[Tuple[str, datetime]]):
+    """
+    Push committed vote changes to the vote state process. If events are lost, engine is marked stale
+    and readers fall back to database until its next reload.
+    """
+    client = get_vote_state_client(settings.VOTE_STATE_PUBLISH_TIMEOUT)
+    if client is None:
+        return
+
+    new_votes = [
+        (vote.balance_id, vote.voting_account, vote.market_key, vote.asset, vote.amount,
+         vote.locked_at, vote.claimed_back_at)
+        for vote in new_votes
+    ]
+    closed_votes = list(closed_votes)
+    if not new_votes and not closed_votes:
+        return
+
+    try:
+        client.apply_events(new_votes, closed_votes)
+    except (OSError, EOFError, VoteStateError):
+        logger.warning('Unable to publish vote events to vote state.', exc_info=True)
+        cache.set(VOTE_STATE_PUBLISH_FAILED_CACHE_KEY, timezone.now(), timeout=None)
@@ -0,0 +1,221 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Claim back time of votes which are still locked.
+NEVER = np.iinfo(np.int64).max
+STROOP_EXPONENT = 7
+
+# balance_id, voting_account, market_key, asset, amount, locked_at, claimed_back_at
+VoteRecord = Tuple[str, str, str, str, Decimal, datetime, Optional[datetime]]
+
+
+def to_microseconds(value: Optional[datetime]) -> int:
+    if value is None:
+        return NEVER
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def to_stroops(amount: Decimal) -> int:
+    return int(Decimal(amount).scaleb(STROOP_EXPONENT))
+
+
+def from_stroops(amount: int) -> Decimal:
+    return Decimal(int(amount)).scaleb(-STROOP_EXPONENT)
+
+
+class Interner:
+    """
+    Map repeated strings (market keys, accounts, assets) to dense integer ids.
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, value_id: int) -> str:
+        return self.values[value_id]
+
+    def get(self, value: str) -> Optional[int]:
+        return self.ids.get(value)
+
+    def intern(self, value: str) -> int:
+        value_id = self.ids.get(value)
+        if value_id is None:
+            value_id = len(self.values)
+            self.ids[value] = value_id
+            self.values.append(value)
+        return value_id
+
+
+class VoteStateEngine:
+    """
+    Votes kept in memory as numpy columns: interned market, asset and account ids,
+    amounts in stroops and lock/claim back times in microseconds.
+    Aggregations match VoteQuerySet.filter_exist_at(timestamp).annotate_stats().
+    """
+
+    columns = (
+        ('market', np.int32),
+        ('asset', np.int32),
+        ('account', np.int32),
+        ('amount', np.int64),
+        ('locked_at', np.int64),
+        ('claimed_back_at', np.int64),
+    )
+
+    def __init__(self, capacity: int = 1024):
+        self.markets = Interner()
+        self.assets = Interner()
+        self.accounts = Interner()
+
+        self.rows: Dict[str, int] = {}
+        self.size = 0
+        self.data = {name: np.empty(capacity, dtype=dtype) for name, dtype in self.columns}
+
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return self.size
+
+    def column(self, name: str) -> np.ndarray:
+        return self.data[name][:self.size]
+
+    def reserve(self, size: int):
+        capacity = len(self.data['amount'])
+        if size <= capacity:
+            return
+
+        while capacity < size:
+            capacity *= 2
+
+        for name, array in self.data.items():
+            resized = np.empty(capacity, dtype=array.dtype)
+            resized[:self.size] = array[:self.size]
+            self.data[name] = resized
+
+    def add_votes(self, votes: Iterable[VoteRecord]) -> int:
+        """
+        Append new votes. Known votes are only closed if claim back time is given. Return count of added votes.
+        """
+        with self.lock:
+            new_rows = {name: [] for name, _ in self.columns}
+            closed_votes = []
+            for balance_id, voting_account, market_key, asset, amount, locked_at, claimed_back_at in votes:
+                if balance_id in self.rows:
+                    if claimed_back_at is not None:
+                        closed_votes.append((balance_id, claimed_back_at))
+                    continue
+
+                self.rows[balance_id] = self.size + len(new_rows['amount'])
+                new_rows['market'].append(self.markets.intern(market_key))
+                new_rows['asset'].append(self.assets.intern(asset))
+                new_rows['account'].append(self.accounts.intern(voting_account))
+                new_rows['amount'].append(to_stroops(amount))
+                new_rows['locked_at'].append(to_microseconds(locked_at))
+                new_rows['claimed_back_at'].append(to_microseconds(claimed_back_at))
+
+            added = len(new_rows['amount'])
+            self.reserve(self.size + added)
+            for name, dtype in self.columns:
+                self.data[name][self.size:self.size + added] = np.array(new_rows[name], dtype=dtype)
+            self.size += added
+
+            self.close_votes(closed_votes)
+
+        return added
+
+    def close_votes(self, closed_votes: Iterable[Tuple[str, datetime]]) -> int:
+        """
+        Set claim back time of known votes. Return count of updated votes.
+        """
+        updated = 0
+        with self.lock:
+            claimed_back_at_column = self.data['claimed_back_at']
+            for balance_id, claimed_back_at in closed_votes:
+                row = self.rows.get(balance_id)
+                if row is None:
+                    continue
+
+                claimed_back_at = to_microseconds(claimed_back_at)
+                if claimed_back_at_column[row] != claimed_back_at:
+                    claimed_back_at_column[row] = claimed_back_at
+                    updated += 1
+
+        return updated
+
+    def get_exist_mask(self, timestamp: datetime) -> np.ndarray:
+        timestamp = to_microseconds(timestamp)
+        return (self.column('locked_at') <= timestamp) & (self.column('claimed_back_at') > timestamp)
+
+    def get_votes_aggregation(self, timestamp: datetime) -> dict:
+        with self.lock:
+            mask = self.get_exist_mask(timestamp)
+            markets = self.column('market')[mask]
+            assets = self.column('asset')[mask]
+            accounts = self.column('account')[mask]
+            amounts = self.column('amount')[mask]
+
+        if not len(amounts):
+            return {}
+
+        keys = (markets.astype(np.int64) << 32) | assets.astype(np.int64)
+        order = np.lexsort((accounts, keys))
+        keys = keys[order]
+        accounts = accounts[order]
+        amounts = amounts[order]
+
+        is_group_start = np.concatenate(([True], keys[1:] != keys[:-1]))
+        is_new_account = is_group_start | np.concatenate(([True], accounts[1:] != accounts[:-1]))
+        group_starts = np.flatnonzero(is_group_start)
+
+        votes_values = np.add.reduceat(amounts, group_starts)
+        voting_amounts = np.add.reduceat(is_new_account.astype(np.int64), group_starts)
+
+        votes_aggregation = {}
+        for key, votes_value, voting_amount in zip(
+            keys[group_starts].tolist(), votes_values.tolist(), voting_amounts.tolist(),
+        ):
+            market_key = self.markets[key >> 32]
+            votes_aggregation.setdefault(market_key, []).append({
+                'market_key': market_key,
+                'asset': self.assets[key & 0xFFFFFFFF],
+                'votes_value': from_stroops(votes_value),
+                'voting_amount': voting_amount,
+            })
+
+        return votes_aggregation
+
+    def get_votes_aggregations(self, timestamps: List[datetime]) -> Iterator[Tuple[datetime, dict]]:
+        for timestamp in sorted(timestamps):
+            yield timestamp, self.get_votes_aggregation(timestamp)
+
+    def get_voting_account_stats(self, market_key: str, timestamp: datetime) -> List[Tuple[str, Decimal]]:
+        """
+        Votes value of every voting account of the market, ordered by account.
+        """
+        market = self.markets.get(market_key)
+        if market is None:
+            return []
+
+        with self.lock:
+            mask = self.get_exist_mask(timestamp) & (self.column('market') == market)
+            accounts = self.column('account')[mask]
+            amounts = self.column('amount')[mask]
+
+        unique_accounts, inverse = np.unique(accounts, return_inverse=True)
+        votes_values = np.zeros(len(unique_accounts), dtype=np.int64)
+        np.add.at(votes_values, inverse, amounts)
+
+        return sorted(
+            (self.accounts[account], from_stroops(votes_value))
+            for account, votes_value in zip(unique_accounts.tolist(), votes_values.tolist())
+        )
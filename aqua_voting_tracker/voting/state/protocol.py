@@ -0,0 +1,65 @@
+"""
+Vote state messages are json frames of plain lists and dicts, so peers never unpickle each other's data.
+Datetimes are sent as iso strings and amounts as decimal strings, every side parses what it receives.
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from django.utils.dateparse import parse_datetime
+
+import orjson
+
+from aqua_voting_tracker.voting.state.engine import VoteRecord
+
+
+# Largest request accepted by vote state, enough for any batch of vote events.
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+
+def encode_value(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'Type {type(value).__name__} is not serializable.')
+
+
+def dump_message(message) -> bytes:
+    return orjson.dumps(message, default=encode_value)
+
+
+def load_message(data: bytes):
+    return orjson.loads(data)
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if value is None:
+        return None
+
+    timestamp = parse_datetime(value)
+    if timestamp is None or timestamp.tzinfo is None:
+        raise ValueError(f'Invalid timestamp {value}.')
+    return timestamp
+
+
+def parse_vote_record(value: list) -> VoteRecord:
+    balance_id, voting_account, market_key, asset, amount, locked_at, claimed_back_at = value
+    return (
+        str(balance_id), str(voting_account), str(market_key), str(asset), Decimal(amount),
+        parse_timestamp(locked_at), parse_timestamp(claimed_back_at),
+    )
+
+
+def parse_closed_vote(value: list) -> Tuple[str, datetime]:
+    balance_id, claimed_back_at = value
+    return str(balance_id), parse_timestamp(claimed_back_at)
+
+
+def parse_votes_aggregation(value: dict) -> dict:
+    return {
+        market_key: [{**stat, 'votes_value': Decimal(stat['votes_value'])} for stat in stats]
+        for market_key, stats in value.items()
+    }
+
+
+def parse_voting_account_stats(value: list) -> List[Tuple[str, Decimal]]:
+    return [(voting_account, Decimal(votes_value)) for voting_account, votes_value in value]
@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Connection, Listener
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, models
+from django.utils import timezone
+
+from more_itertools import chunked
+
+from aqua_voting_tracker.voting.models import Vote
+from aqua_voting_tracker.voting.state.client import Address
+from aqua_voting_tracker.voting.state.engine import VoteRecord, VoteStateEngine
+from aqua_voting_tracker.voting.state.protocol import (
+    MAX_MESSAGE_SIZE,
+    dump_message,
+    load_message,
+    parse_closed_vote,
+    parse_timestamp,
+    parse_vote_record,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def load_engine(batch_size: int = 10000) -> VoteStateEngine:
+    """
+    Load votes which are active or may be needed to catch up missed snapshots.
+    """
+    retention = settings.VOTING_SNAPSHOT_CATCH_UP_LIMIT + settings.VOTING_SNAPSHOT_INTERVAL
+    queryset = Vote.objects.filter(
+        models.Q(claimed_back_at__isnull=True)
+        | models.Q(claimed_back_at__gt=timezone.now() - retention),
+    ).values_list(
+        'balance_id', 'voting_account', 'market_key', 'asset', 'amount', 'locked_at', 'claimed_back_at',
+    )
+
+    engine = VoteStateEngine()
+    for batch in chunked(queryset.iterator(chunk_size=batch_size), batch_size):
+        engine.add_votes(batch)
+
+    return engine
+
+
+class VoteStateServer:
+    """
+    Serve vote state engine to local clients. Database stays the durable source: engine is rebuilt
+    every reload interval and events received while it is loading are replayed on the new one.
+    """
+    def __init__(self, address: Address, authkey: bytes, reload_interval: timedelta):
+        self.address = address
+        self.authkey = authkey
+        self.reload_interval = reload_interval
+
+        self.engine: Optional[VoteStateEngine] = None
+        self.loaded_at: Optional[datetime] = None
+        self.journal: Optional[List[Tuple[List[VoteRecord], list]]] = None
+        self.events_lock = threading.Lock()
+
+    def apply_events(self, new_votes: List[VoteRecord], closed_votes: list):
+        with self.events_lock:
+            self.engine.add_votes(new_votes)
+            self.engine.close_votes(closed_votes)
+
+            if self.journal is not None:
+                self.journal.append((new_votes, closed_votes))
+
+    def reload(self):
+        started_at = time.monotonic()
+        with self.events_lock:
+            self.journal = []
+        # Events committed before this moment are read by the load.
+        loaded_at = timezone.now()
+
+        try:
+            engine = load_engine()
+        finally:
+            close_old_connections()
+
+        with self.events_lock:
+            for new_votes, closed_votes in self.journal:
+                engine.add_votes(new_votes)
+                engine.close_votes(closed_votes)
+
+            self.engine = engine
+            self.loaded_at = loaded_at
+            self.journal = None
+
+        logger.info('Vote state is loaded: %s votes in %.2f seconds.', len(engine), time.monotonic() - started_at)
+
+    def run_reloading(self):
+        while True:
+            time.sleep(self.reload_interval.total_seconds())
+            try:
+                self.reload()
+            except Exception:
+                logger.exception('Vote state reload failed.')
+
+    def dispatch(self, method: str, args: list):
+        if method == 'apply_events':
+            new_votes, closed_votes = args
+            return self.apply_events(
+                [parse_vote_record(vote) for vote in new_votes],
+                [parse_closed_vote(closed_vote) for closed_vote in closed_votes],
+            )
+
+        if method == 'get_loaded_at':
+            return self.loaded_at
+
+        if method == 'get_votes_aggregation':
+            timestamp, = args
+            return self.engine.get_votes_aggregation(parse_timestamp(timestamp))
+
+        if method == 'get_votes_aggregations':
+            timestamps, = args
+            return list(self.engine.get_votes_aggregations([parse_timestamp(timestamp) for timestamp in timestamps]))
+
+        if method == 'get_voting_account_stats':
+            market_key, timestamp = args
+            return self.engine.get_voting_account_stats(str(market_key), parse_timestamp(timestamp))
+
+        raise ValueError(f'Unknown method {method}.')
+
+    def handle_connection(self, connection: Connection):
+        method = None
+        with connection:
+            try:
+                method, args = load_message(connection.recv_bytes(MAX_MESSAGE_SIZE))
+                response = [True, self.dispatch(method, args)]
+            except (EOFError, OSError):
+                logger.warning('Vote state request is not received.', exc_info=True)
+                return
+            except Exception as exc:
+                logger.exception('Vote state call %s failed.', method)
+                response = [False, repr(exc)]
+
+            connection.send_bytes(dump_message(response))
+
+    def serve_forever(self):
+        self.reload()
+        threading.Thread(target=self.run_reloading, daemon=True).start()
+
+        self.listen()
+
+    def listen(self):
+        with Listener(self.address, authkey=self.authkey) as listener:
+            logger.info('Vote state is listening on %s.', self.address)
+            while True:
+                try:
+                    connection = listener.accept()
+                except (OSError, EOFError, AuthenticationError):
+                    logger.warning('Vote state connection is rejected.', exc_info=True)
+                    continue
+
+                threading.Thread(target=self.handle_connection, args=(connection, ), daemon=True).start()
@@ -2,37 +2,56 @@ import asyncio
 import logging
 import sys
 from asyncio import Semaphore
-from typing import Iterable, List
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
 
 from django.conf import settings
-from django.core.cache import cache
+from django.db.transaction import atomic
 from django.utils import timezone
 
-from asgiref.sync import sync_to_async
 from dateutil.parser import parse as date_parse
-from stellar_sdk import AiohttpClient, Server, ServerAsync
+from stellar_sdk import ServerAsync
 
 from aqua_voting_tracker.taskapp import app as celery_app
+from aqua_voting_tracker.utils.lock import cache_lock
+from aqua_voting_tracker.utils.stellar.horizon import get_horizon_server, get_horizon_server_async
+from aqua_voting_tracker.utils.stellar.ratelimit import Priority
 from aqua_voting_tracker.utils.stellar.requests import load_all_records
 from aqua_voting_tracker.voting.exceptions import VoteParsingError
 from aqua_voting_tracker.voting.marketkeys import get_marketkeys_provider
-from aqua_voting_tracker.voting.models import Vote
-from aqua_voting_tracker.voting.parser import parse_claimable_balance, parse_claimable_balance_from_effects
+from aqua_voting_tracker.voting.models import Checkpoint, Vote
+from aqua_voting_tracker.voting.parser import (
+    parse_claimable_balance,
+    parse_claimable_balance_from_effects,
+    parse_close_claimable_balance_effects,
+)
+from aqua_voting_tracker.voting.services.parquet_export import ParquetExporter
 from aqua_voting_tracker.voting.services.snapshot_creation import SnapshotCreationUseCase
+from aqua_voting_tracker.voting.services.snapshot_publication import publish_snapshot
+from aqua_voting_tracker.voting.state.client import publish_vote_events
 
 
 logger = logging.getLogger()
 
 
-CLAIMABLE_BALANCES_CURSOR_CACHE_KEY = 'aqua_voting_tracker.voting.CLAIMABLE_BALANCES_CURSOR_CACHE_KEY'
+CLAIMABLE_BALANCES_CHECKPOINT_KEY = 'aqua_voting_tracker.voting.CLAIMABLE_BALANCES_CURSOR_CACHE_KEY'
 CLAIMABLE_BALANCES_LIMIT = 200
 CLAIMABLE_BALANCES_BULK_LIMIT = 10000
 
-CLAIM_BACK_CURSOR_CACHE_KEY = 'aqua_voting_tracker.voting.CLAIM_BACK_CURSOR_CACHE_KEY'
+CLAIM_BACK_LOCK_KEY = 'aqua_voting_tracker.voting.CLAIM_BACK_LOCK'
+CLAIM_BACK_LOCK_TIMEOUT = 10 * 60
 CLAIM_BACK_BUNCH_LIMIT = 250
+# Votes still unclaimed are rechecked after 10 minutes, 20 minutes and so on, up to a week.
+CLAIM_BACK_CHECK_INTERVAL = timezone.timedelta(minutes=10)
+CLAIM_BACK_CHECK_MAX_INTERVAL = timezone.timedelta(days=7)
 CLAIM_BACK_REQUEST_TIMEOUT = 60
 CLAIM_BACK_SEMAPHORE = 30
 
+VOTING_SNAPSHOT_LOCK_KEY = 'aqua_voting_tracker.voting.VOTING_SNAPSHOT_LOCK'
+PARQUET_EXPORT_LOCK_KEY = 'aqua_voting_tracker.voting.PARQUET_EXPORT_LOCK'
+VOTING_SNAPSHOT_PUBLICATION_RETRY_DELAY = 5
+VOTING_SNAPSHOT_PUBLICATION_MAX_RETRIES = 60
+
 
 def _parse_vote(claimable_balance: dict):
     try:
@@ -43,14 +62,14 @@ def _parse_vote(claimable_balance: dict):
 
 @celery_app.task(ignore_result=True)
 def task_load_new_claimable_balances():
-    horizon_server = Server(settings.HORIZON_URL)
+    horizon_server = get_horizon_server(priority=Priority.LOW)
 
     request_builder = horizon_server.claimable_balances().order(desc=False)
 
-    cursor = cache.get(CLAIMABLE_BALANCES_CURSOR_CACHE_KEY, None)
+    cursor = Checkpoint.objects.get_cursor(CLAIMABLE_BALANCES_CHECKPOINT_KEY)
 
     last_claimable_balance = None
-    new_votes = []
+    votes = []
     for index, claimable_balance in enumerate(load_all_records(request_builder,
                                                                start_cursor=cursor,
                                                                page_size=CLAIMABLE_BALANCES_LIMIT)):
@@ -58,66 +77,106 @@ def task_load_new_claimable_balances():
             break
 
         vote = _parse_vote(claimable_balance)
-        if vote and not Vote.objects.filter(balance_id=vote.balance_id).exists():
-            logger.warning('Old task get new claimable balance: %s', vote.balance_id)
-            new_votes.append(vote)
+        if vote:
+            votes.append(vote)
 
         last_claimable_balance = claimable_balance
 
-    if last_claimable_balance:
-        cache.set(CLAIMABLE_BALANCES_CURSOR_CACHE_KEY,
-                  last_claimable_balance['paging_token'],
-                  None)
+    with atomic():
+        inserted = Vote.objects.bulk_upsert(votes)
+        for balance_id in inserted:
+            logger.warning('Old task get new claimable balance: %s', balance_id)
+
+        if last_claimable_balance:
+            Checkpoint.objects.set_cursor(CLAIMABLE_BALANCES_CHECKPOINT_KEY, last_claimable_balance['paging_token'])
 
-    Vote.objects.bulk_create(new_votes)
+    inserted = set(inserted)
+    publish_vote_events([vote for vote in votes if vote.balance_id in inserted], [])
 
 
-async def _update_claim_back_time(vote: Vote, *, server: ServerAsync, semaphore: Semaphore):
+async def _get_claim_back_time(vote: Vote, *, server: ServerAsync,
+                               semaphore: Semaphore) -> Optional[Tuple[str, datetime]]:
     async with semaphore:
         response = await server.operations().for_claimable_balance(vote.balance_id).order(desc=True).limit(1).call()
     operation = response['_embedded']['records'][0]
 
     if operation['type'] not in ['claim_claimable_balance', 'clawback_claimable_balance']:
-        return
+        return None
 
     logger.warning('Old claim back task is still useful.')
-    vote.claimed_back_at = date_parse(operation['created_at'])
-    await sync_to_async(vote.save)()
+    return vote.balance_id, date_parse(operation['created_at'])
 
 
-async def _bunch_update_claim_back_time(votes: Iterable[Vote]):
+async def _bunch_get_claim_back_time(votes: Iterable[Vote]) -> List[Tuple[str, datetime]]:
     semaphore = Semaphore(CLAIM_BACK_SEMAPHORE)
-    client = AiohttpClient(request_timeout=CLAIM_BACK_REQUEST_TIMEOUT)
-    async with ServerAsync(settings.HORIZON_URL, client=client) as server:
-        await asyncio.gather(*[_update_claim_back_time(vote, server=server, semaphore=semaphore)
-                               for vote in votes])
+    async with get_horizon_server_async(request_timeout=CLAIM_BACK_REQUEST_TIMEOUT,
+                                        priority=Priority.LOW) as server:
+        closed_votes = await asyncio.gather(*[_get_claim_back_time(vote, server=server, semaphore=semaphore)
+                                              for vote in votes])
+
+    return [closed_vote for closed_vote in closed_votes if closed_vote]
+
+
+def _update_claim_back_time() -> int:
+    now = timezone.now()
+    votes = list(Vote.objects.filter_claim_back_check_due(now)[:CLAIM_BACK_BUNCH_LIMIT])
+    if not votes:
+        return 0
+
+    closed_votes = asyncio.run(_bunch_get_claim_back_time(votes))
+
+    closed_balance_ids = {balance_id for balance_id, _ in closed_votes}
+    unclaimed_votes = [vote for vote in votes if vote.balance_id not in closed_balance_ids]
+    for vote in unclaimed_votes:
+        vote.schedule_claim_back_check(now, CLAIM_BACK_CHECK_INTERVAL, CLAIM_BACK_CHECK_MAX_INTERVAL)
+
+    with atomic():
+        closed_votes = Vote.objects.bulk_close(closed_votes)
+        Vote.objects.bulk_update(unclaimed_votes, ['claim_back_check_at', 'claim_back_check_count'])
+
+    publish_vote_events([], closed_votes)
+
+    return len(votes)
 
 
 @celery_app.task(ignore_result=True)
 def task_update_claim_back_time():
-    now = timezone.now()
-    queryset = Vote.objects.filter(locked_until__lt=now, claimed_back_at__isnull=True)
-    cursor = cache.get(CLAIM_BACK_CURSOR_CACHE_KEY)
-    if cursor:
-        queryset = queryset.filter(id__gt=cursor)
+    """
+    Check unlocked votes in order of their next check time. Runs every minute, so votes are checked
+    right after unlock; votes staying unclaimed are rechecked with exponential backoff.
+    """
+    with cache_lock(CLAIM_BACK_LOCK_KEY, CLAIM_BACK_LOCK_TIMEOUT) as acquired:
+        if not acquired:
+            return
 
-    votes = list(queryset[:CLAIM_BACK_BUNCH_LIMIT])
-    asyncio.run(_bunch_update_claim_back_time(votes))
+        checked = _update_claim_back_time()
 
-    if len(votes) < CLAIM_BACK_BUNCH_LIMIT:
-        cache.delete(CLAIM_BACK_CURSOR_CACHE_KEY)
-    else:
-        cache.set(CLAIM_BACK_CURSOR_CACHE_KEY, votes[-1].id, None)
+    if checked >= CLAIM_BACK_BUNCH_LIMIT:
+        # More votes are due, continue without waiting for the next run.
+        task_update_claim_back_time.delay()
 
 
 @celery_app.task(ignore_result=True)
 def task_create_voting_snapshot():
-    now = timezone.now()
-    timestamp = now.replace(minute=now.minute // 5 * 5, second=0, microsecond=0) - timezone.timedelta(minutes=5)
+    timestamp = SnapshotCreationUseCase.get_finished_slot(timezone.now())
+
+    with cache_lock(VOTING_SNAPSHOT_LOCK_KEY, settings.VOTING_SNAPSHOT_LOCK_TIMEOUT.total_seconds()) as acquired:
+        if not acquired:
+            logger.warning('Voting snapshot creation is already running.')
+            return
+
+        SnapshotCreationUseCase(
+            get_marketkeys_provider(),
+        ).create_missing_snapshots(timestamp)
+
+    task_publish_voting_snapshot.delay(timestamp.isoformat())
+
 
-    SnapshotCreationUseCase(
-        get_marketkeys_provider(),
-    ).create_snapshot(timestamp)
+@celery_app.task(bind=True, ignore_result=True, max_retries=VOTING_SNAPSHOT_PUBLICATION_MAX_RETRIES)
+def task_publish_voting_snapshot(self, timestamp: str):
+    if not publish_snapshot(date_parse(timestamp)):
+        logger.warning('Voting snapshot %s is not replicated yet.', timestamp)
+        raise self.retry(countdown=VOTING_SNAPSHOT_PUBLICATION_RETRY_DELAY)
 
 
 @celery_app.task(ignore_result=True)
@@ -128,20 +187,30 @@ def task_parse_create_claimable_balance_effects(effects: List[dict]):
         logger.warning('Invalid claimable balance.', exc_info=sys.exc_info())
         return
 
-    if not Vote.objects.filter(balance_id=vote.balance_id).exists():
-        vote.save()
-    else:
+    if not Vote.objects.bulk_upsert([vote]):
         logger.warning('Claimable balance duplicate: %s', vote.balance_id)
+        return
+
+    publish_vote_events([vote], [])
 
 
 @celery_app.task(ignore_result=True)
 def task_parse_close_claimable_balance_effects(effects: List[dict]):
-    claimable_balance_claimed = 'claimable_balance_claimed'
-    claimable_balance_clawed_back = 'claimable_balance_clawed_back'
-    close_effect = next(effect for effect in effects
-                        if effect['type'] in {claimable_balance_claimed, claimable_balance_clawed_back})
+    publish_vote_events([], Vote.objects.bulk_close([parse_close_claimable_balance_effects(effects)]))
+
+
+@celery_app.task(ignore_result=True)
+def task_export_parquet():
+    if not settings.PARQUET_EXPORT_URI:
+        return
 
-    balance_id = close_effect['balance_id']
-    closed_at = date_parse(close_effect['created_at'])
+    with cache_lock(PARQUET_EXPORT_LOCK_KEY, settings.PARQUET_EXPORT_LOCK_TIMEOUT.total_seconds()) as acquired:
+        if not acquired:
+            logger.warning('Parquet export is already running.')
+            return
 
-    Vote.objects.filter(balance_id=balance_id).update(claimed_back_at=closed_at)
+        ParquetExporter(
+            settings.PARQUET_EXPORT_URI,
+            chunk_size=settings.PARQUET_EXPORT_CHUNK_SIZE,
+            lag=settings.PARQUET_EXPORT_LAG,
+        ).export_all()
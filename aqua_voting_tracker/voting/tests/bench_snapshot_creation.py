@@ -0,0 +1,300 @@
+"""
+Scaling benchmark of snapshot creation. It is not collected by the default test run, start it explicitly:
+
+    python manage.py test aqua_voting_tracker.voting.tests.bench_snapshot_creation
+
+Every case generates votes in the test database and creates a snapshot several times, each round is rolled back.
+Stage timings (best of rounds, the least noisy estimate), queries and peak python memory are compared
+with the stored baseline and the benchmark fails on regression. Environment variables:
+
+    SNAPSHOT_BENCHMARK_CASES      comma separated case names to run, all by default
+    SNAPSHOT_BENCHMARK_ROUNDS     measured rounds per case, 10 by default
+    SNAPSHOT_BENCHMARK_TOLERANCE  allowed relative slowdown, 1 (twice slower) by default
+    SNAPSHOT_BENCHMARK_SAVE       write results as the new baseline instead of comparing
+
+Timings depend on hardware, regenerate the baseline on the machine the benchmark runs on.
+"""
+import dataclasses
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.db import connection
+from django.db.transaction import atomic, set_rollback
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from more_itertools import chunked
+
+from aqua_voting_tracker.voting.marketkeys.base import BaseMarketKeysProvider
+from aqua_voting_tracker.voting.models import Vote, VotingSnapshot, VotingSnapshotAsset
+from aqua_voting_tracker.voting.services.metrics import record_stages
+from aqua_voting_tracker.voting.services.snapshot_creation import SnapshotCreationUseCase
+from aqua_voting_tracker.voting.state.engine import VoteStateEngine
+from aqua_voting_tracker.voting.state.server import load_engine
+
+
+BASELINE_PATH = Path(__file__).with_suffix('.json')
+
+# Slowdowns below this many seconds are noise regardless of tolerance.
+MIN_REGRESSION = 0.005
+# Peak memory barely depends on the machine, so it is checked tighter than timings.
+MEMORY_TOLERANCE = 0.1
+
+
+@dataclasses.dataclass
+class BenchmarkCase:
+    name: str
+    votes_count: int
+    markets_count: int
+    assets_count: int
+    # Votes are aggregated by database or by in-memory vote state engine.
+    backend: str = 'database'
+
+
+CASES = [
+    *(BenchmarkCase(f'votes-{votes_count}', votes_count, 500, 2) for votes_count in (10000, 50000, 200000)),
+    *(BenchmarkCase(f'markets-{markets_count}', 50000, markets_count, 2) for markets_count in (100, 1000, 5000)),
+    *(BenchmarkCase(f'assets-{assets_count}', 50000, 500, assets_count) for assets_count in (1, 5, 20)),
+    *(BenchmarkCase(f'engine-votes-{votes_count}', votes_count, 500, 2, backend='engine')
+      for votes_count in (50000, 200000)),
+]
+
+
+class InMemoryMarketKeysProvider(BaseMarketKeysProvider):
+    def __init__(self, markets_data: List[dict]):
+        self.markets_data = markets_data
+        self.markets_data_by_account = {}
+        for market_data in markets_data:
+            self.markets_data_by_account[market_data['upvote_account_id']] = market_data
+            self.markets_data_by_account[market_data['downvote_account_id']] = market_data
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.markets_data)
+
+    def get_multiple(self, account_ids: Iterable[str]) -> Iterator[dict]:
+        markets_data = {}
+        for account_id in account_ids:
+            market_data = self.markets_data_by_account.get(account_id)
+            if market_data:
+                markets_data[market_data['account_id']] = market_data
+        return iter(markets_data.values())
+
+
+class EngineSnapshotCreationUseCase(SnapshotCreationUseCase):
+    def __init__(self, market_key_provider: BaseMarketKeysProvider, engine: VoteStateEngine):
+        super(EngineSnapshotCreationUseCase, self).__init__(market_key_provider)
+        self.engine = engine
+
+    def get_vote_state(self) -> VoteStateEngine:
+        return self.engine
+
+
+def _account_id(rnd: random.Random) -> str:
+    return 'G' + ''.join(rnd.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ234567', k=55))
+
+
+def generate_dataset(case: BenchmarkCase, timestamp: datetime, seed: int = 0) -> InMemoryMarketKeysProvider:
+    """
+    Create votes of the case and return market keys provider knowing all of voted markets.
+    Market popularity is skewed, some votes are claimed back or locked after the timestamp.
+    """
+    rnd = random.Random(seed)  # noqa: S311
+    markets_data = [
+        {
+            'account_id': account_id,
+            'upvote_account_id': account_id,
+            'downvote_account_id': _account_id(rnd),
+            'voting_boost': rnd.choice([0, 0, 0, Decimal('0.3')]),
+            'downvote_immunity': rnd.random() < 0.1,
+        }
+        for account_id in (_account_id(rnd) for _ in range(case.markets_count))
+    ]
+    assets = [f'VOTE{index}:{_account_id(rnd)}' for index in range(case.assets_count)]
+    accounts = [_account_id(rnd) for _ in range(max(1, case.votes_count // 10))]
+    weights = [rnd.paretovariate(1.2) for _ in markets_data]
+
+    def generate_votes() -> Iterator[Vote]:
+        for index, market_data in enumerate(rnd.choices(markets_data, weights=weights, k=case.votes_count)):
+            locked_at = timestamp - timedelta(days=rnd.uniform(-1, 60))
+            claimed_back_at = locked_at + timedelta(days=rnd.uniform(1, 30)) if rnd.random() < 0.3 else None
+            yield Vote(
+                balance_id=f'{index:072x}',
+                voting_account=rnd.choice(accounts),
+                market_key=market_data['downvote_account_id' if rnd.random() < 0.1 else 'upvote_account_id'],
+                asset=rnd.choice(assets),
+                amount=Decimal(rnd.randint(1, 10 ** 12)).scaleb(-7),
+                locked_at=locked_at,
+                locked_until=locked_at + timedelta(days=30),
+                claimed_back_at=claimed_back_at,
+            )
+
+    for chunk in chunked(generate_votes(), 10000):
+        Vote.objects.bulk_create(chunk)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {connection.ops.quote_name(Vote._meta.db_table)}')  # noqa: S608
+
+    return InMemoryMarketKeysProvider(markets_data)
+
+
+def run_case(case: BenchmarkCase, rounds: int) -> dict:
+    timestamp = timezone.now().replace(second=0, microsecond=0)
+    provider = generate_dataset(case, timestamp)
+
+    result = {}
+    if case.backend == 'engine':
+        started_at = time.perf_counter()
+        engine = load_engine()
+        result['engine_load'] = round(time.perf_counter() - started_at, 6)
+        use_case = EngineSnapshotCreationUseCase(provider, engine)
+    else:
+        use_case = SnapshotCreationUseCase(provider)
+
+    def run_round() -> list:
+        with atomic(), record_stages() as stages:
+            use_case.create_snapshot(timestamp)
+            set_rollback(True)
+        return stages
+
+    # Warm up caches of database and python.
+    run_round()
+
+    rounds_stages = [run_round() for _ in range(rounds)]
+
+    tracemalloc.start()
+    try:
+        run_round()
+        result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    stages = {}
+    for stage in rounds_stages[0]:
+        durations = [
+            next(round_stage.duration for round_stage in round_stages if round_stage.name == stage.name)
+            for round_stages in rounds_stages
+        ]
+        stages[stage.name] = {
+            'median': round(statistics.median(durations), 6),
+            'min': round(min(durations), 6),
+            'queries': stage.queries,
+            'rows_in': stage.rows_in,
+            'rows_out': stage.rows_out,
+        }
+
+    result['stages'] = stages
+    result['total'] = round(min(sum(stage.duration for stage in round_stages) for round_stages in rounds_stages), 6)
+    return result
+
+
+def find_regressions(baseline: Dict[str, dict], results: Dict[str, dict], tolerance: float) -> List[str]:
+    """
+    Descriptions of metrics which got worse than the baseline. Cases and stages missing in the baseline are skipped.
+    """
+    def is_slower(value: float, baseline_value: float) -> bool:
+        return value > baseline_value * (1 + tolerance) and value - baseline_value > MIN_REGRESSION
+
+    regressions = []
+    for name, result in results.items():
+        case_baseline = baseline.get(name)
+        if not case_baseline:
+            continue
+
+        if is_slower(result['total'], case_baseline['total']):
+            regressions.append(f'{name}: total {result["total"]:.3f}s, baseline {case_baseline["total"]:.3f}s')
+
+        if result['peak_memory'] > case_baseline['peak_memory'] * (1 + MEMORY_TOLERANCE):
+            regressions.append(
+                f'{name}: peak memory {result["peak_memory"]} bytes, baseline {case_baseline["peak_memory"]} bytes',
+            )
+
+        for stage_name, stage in result['stages'].items():
+            stage_baseline = case_baseline['stages'].get(stage_name)
+            if not stage_baseline:
+                continue
+
+            if is_slower(stage['min'], stage_baseline['min']):
+                regressions.append(
+                    f'{name}: {stage_name} {stage["min"]:.3f}s, baseline {stage_baseline["min"]:.3f}s',
+                )
+            if stage['queries'] > stage_baseline['queries']:
+                regressions.append(
+                    f'{name}: {stage_name} {stage["queries"]} queries, baseline {stage_baseline["queries"]}',
+                )
+
+    return regressions
+
+
+def format_report(results: Dict[str, dict]) -> str:
+    lines = [f'{"case":<22}{"stage":<14}{"median s":>10}{"min s":>10}{"queries":>9}{"rows in":>9}{"rows out":>9}']
+    for name, result in results.items():
+        for stage_name, stage in result['stages'].items():
+            lines.append(
+                f'{name:<22}{stage_name:<14}{stage["median"]:>10.4f}{stage["min"]:>10.4f}{stage["queries"]:>9}'
+                f'{stage["rows_in"] if stage["rows_in"] is not None else "":>9}{stage["rows_out"]:>9}',
+            )
+        lines.append(
+            f'{name:<22}{"total":<14}{"":>10}{result["total"]:>10.4f}'
+            f'   peak memory {result["peak_memory"] / 2 ** 20:.1f} MiB'
+            + (f', engine load {result["engine_load"]:.3f}s' if 'engine_load' in result else ''),
+        )
+    return '\n'.join(lines)
+
+
+def load_baseline() -> Dict[str, dict]:
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text())
+
+
+def save_baseline(results: Dict[str, dict]):
+    BASELINE_PATH.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+
+
+def clear_dataset():
+    """
+    Rolled back rounds leave dead rows behind, truncate tables so every case starts from the same state.
+    """
+    tables = ', '.join(
+        connection.ops.quote_name(model._meta.db_table) for model in (Vote, VotingSnapshotAsset, VotingSnapshot)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'TRUNCATE {tables}')  # noqa: S608
+
+
+def get_cases(names: Optional[str]) -> List[BenchmarkCase]:
+    if not names:
+        return CASES
+    names = set(names.split(','))
+    return [case for case in CASES if case.name in names]
+
+
+class SnapshotCreationBenchmark(TransactionTestCase):
+    def test_scaling(self):
+        rounds = int(os.environ.get('SNAPSHOT_BENCHMARK_ROUNDS', 10))
+        tolerance = float(os.environ.get('SNAPSHOT_BENCHMARK_TOLERANCE', 1))
+
+        results = {}
+        for case in get_cases(os.environ.get('SNAPSHOT_BENCHMARK_CASES')):
+            try:
+                results[case.name] = run_case(case, rounds)
+            finally:
+                clear_dataset()
+
+        sys.stderr.write(f'\n{format_report(results)}\n')
+
+        if os.environ.get('SNAPSHOT_BENCHMARK_SAVE'):
+            save_baseline({**load_baseline(), **results})
+            return
+
+        regressions = find_regressions(load_baseline(), results, tolerance)
+        self.assertFalse(regressions, 'Snapshot creation regressed:\n' + '\n'.join(regressions))
@@ -7,7 +7,7 @@ import factory
 import factory.fuzzy
 
 import aqua_voting_tracker.utils.tests  # NoQA: F401
-from aqua_voting_tracker.voting.models import Vote
+from aqua_voting_tracker.voting.models import Vote, VotingSnapshot
 from aqua_voting_tracker.voting.services.snapshot_creation import SnapshotAssetRecord, SnapshotRecord
 
 
@@ -27,6 +27,23 @@ class VoteFactory(factory.django.DjangoModelFactory):
         model = Vote
 
 
+class VotingSnapshotFactory(factory.django.DjangoModelFactory):
+    market_key = factory.Faker('stellar_public_key')
+    rank = factory.Sequence(lambda n: n + 1)
+
+    upvote_value = factory.fuzzy.FuzzyDecimal(10)
+    downvote_value = Decimal(0)
+    votes_value = factory.LazyAttribute(lambda vs: vs.upvote_value - vs.downvote_value)
+    adjusted_votes_value = factory.LazyAttribute(lambda vs: vs.votes_value)
+    voting_amount = factory.fuzzy.FuzzyInteger(1, 10)
+
+    timestamp = factory.LazyFunction(lambda: timezone.now().replace(second=0, microsecond=0))
+    extra = factory.LazyFunction(dict)
+
+    class Meta:
+        model = VotingSnapshot
+
+
 class SnapshotAssetRecordFactory(factory.Factory):
     asset = 'VOTE:GAT3XHMN2WXG62BDC3JGNANIA2Y53BCUAHO6B5UFZM2EITZRRYKEBGQ6'
 
@@ -0,0 +1,188 @@
+import csv
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+import orjson
+
+from aqua_voting_tracker.voting.constants import PUBLISHED_SNAPSHOT_CACHE_KEY
+from aqua_voting_tracker.voting.tests.factories import VotingSnapshotFactory
+
+
+class BaseVotingSnapshotApiTestCase(TestCase):
+    def setUp(self):
+        cache.delete(PUBLISHED_SNAPSHOT_CACHE_KEY)
+        self.addCleanup(cache.delete, PUBLISHED_SNAPSHOT_CACHE_KEY)
+
+        self.client = APIClient()
+        self.timestamp = timezone.now().replace(second=0, microsecond=0)
+        cache.set(PUBLISHED_SNAPSHOT_CACHE_KEY, self.timestamp)
+
+
+class MultiGetVotingSnapshotApiTestCase(BaseVotingSnapshotApiTestCase):
+    url = '/api/voting-snapshot/'
+
+    def setUp(self):
+        super(MultiGetVotingSnapshotApiTestCase, self).setUp()
+
+        self.snapshots = VotingSnapshotFactory.create_batch(5, timestamp=self.timestamp)
+        VotingSnapshotFactory(
+            market_key=self.snapshots[0].market_key,
+            timestamp=self.timestamp - timezone.timedelta(minutes=5),
+        )
+
+    def test_post_keeps_request_order(self):
+        market_keys = [self.snapshots[3].market_key, 'unknown', self.snapshots[0].market_key,
+                       self.snapshots[3].market_key, self.snapshots[1].market_key]
+
+        response = self.client.post(self.url, {'market_key': market_keys}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(
+            [result['market_key'] for result in response.data['results']],
+            [self.snapshots[3].market_key, self.snapshots[0].market_key, self.snapshots[1].market_key],
+        )
+        self.assertTrue(all(result['timestamp'] for result in response.data['results']))
+        self.assertIn('upvote_assets', response.data['results'][0]['extra'])
+
+    def test_post_is_not_truncated(self):
+        market_keys = [snapshot.market_key for snapshot in self.snapshots] + [f'unknown-{i}' for i in range(500)]
+
+        response = self.client.post(self.url, {'market_key': market_keys}, format='json')
+
+        self.assertEqual(response.data['count'], 5)
+
+    def test_post_validation(self):
+        self.assertEqual(self.client.post(self.url, {'market_key': []}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(self.url, {}, format='json').status_code, 400)
+
+    def test_get(self):
+        response = self.client.get(self.url, {'market_key': self.snapshots[0].market_key})
+
+        self.assertEqual(response.data['count'], 1)
+
+
+class VotingSnapshotAtApiTestCase(BaseVotingSnapshotApiTestCase):
+    def setUp(self):
+        super(VotingSnapshotAtApiTestCase, self).setUp()
+
+        self.previous_timestamp = self.timestamp - timezone.timedelta(minutes=5)
+        self.previous_snapshots = VotingSnapshotFactory.create_batch(3, timestamp=self.previous_timestamp)
+        self.snapshots = VotingSnapshotFactory.create_batch(2, timestamp=self.timestamp)
+
+    def get_url(self, timestamp, suffix=''):
+        return f'/api/voting-snapshot/at/{int(timestamp.timestamp())}/{suffix}'
+
+    def test_nearest_previous_slot(self):
+        response = self.client.get(self.get_url(self.timestamp - timezone.timedelta(minutes=1), 'top-volume/'))
+
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(
+            {result['timestamp'] for result in response.data['results']},
+            {self.previous_timestamp.isoformat().replace('+00:00', 'Z')},
+        )
+
+    def test_exact_slot(self):
+        response = self.client.get(self.get_url(self.timestamp, 'top-voted/'))
+
+        self.assertEqual(response.data['count'], 2)
+
+    def test_unpublished_slot_is_hidden(self):
+        cache.set(PUBLISHED_SNAPSHOT_CACHE_KEY, self.previous_timestamp)
+
+        response = self.client.get(self.get_url(self.timestamp + timezone.timedelta(days=1), 'top-volume/'))
+
+        self.assertEqual(response.data['count'], 3)
+
+    def test_before_first_slot(self):
+        response = self.client.get(self.get_url(self.previous_timestamp - timezone.timedelta(seconds=1), 'top-volume/'))
+
+        self.assertEqual(response.data['count'], 0)
+
+    def test_multi_get(self):
+        market_key = self.previous_snapshots[1].market_key
+
+        response = self.client.get(self.get_url(self.timestamp, ''), {'market_key': market_key})
+        self.assertEqual(response.data['count'], 0)
+
+        response = self.client.post(
+            self.get_url(self.previous_timestamp, ''), {'market_key': [market_key]}, format='json',
+        )
+        self.assertEqual([result['market_key'] for result in response.data['results']], [market_key])
+
+    def test_invalid_timestamp(self):
+        response = self.client.get(f'/api/voting-snapshot/at/{10 ** 20}/top-volume/')
+
+        self.assertEqual(response.status_code, 400)
+
+
+class VotingSnapshotExportApiTestCase(BaseVotingSnapshotApiTestCase):
+    url = '/api/voting-snapshot/export/'
+
+    def setUp(self):
+        super(VotingSnapshotExportApiTestCase, self).setUp()
+
+        self.timestamps = [self.timestamp - timezone.timedelta(minutes=minutes) for minutes in (10, 5, 0)]
+        for timestamp in self.timestamps:
+            for rank in (2, 1):
+                VotingSnapshotFactory(timestamp=timestamp, rank=rank)
+
+        user = get_user_model().objects.create_user('exporter')
+        self.token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def get_rows(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content)
+        return [orjson.loads(line) for line in content.splitlines()]
+
+    def test_authentication_required(self):
+        self.client.credentials()
+
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_ndjson(self):
+        rows = self.get_rows()
+
+        self.assertEqual(len(rows), 6)
+        self.assertEqual([row['rank'] for row in rows], [1, 2] * 3)
+        self.assertEqual(rows[0]['timestamp'], self.timestamps[0].isoformat().replace('+00:00', 'Z'))
+        self.assertIsInstance(rows[0]['votes_value'], str)
+
+    def test_csv(self):
+        response = self.client.get(self.url, {'output': 'csv'})
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]['rank'], '1')
+
+    def test_range(self):
+        rows = self.get_rows(
+            since=int(self.timestamps[1].timestamp()),
+            until=int(self.timestamps[2].timestamp()),
+        )
+
+        self.assertEqual({row['timestamp'] for row in rows}, {self.timestamps[1].isoformat().replace('+00:00', 'Z')})
+
+    def test_resume_from_cursor(self):
+        rows = self.get_rows(cursor=int(self.timestamps[0].timestamp()))
+
+        self.assertEqual(len(rows), 4)
+
+    def test_unpublished_slot_is_hidden(self):
+        cache.set(PUBLISHED_SNAPSHOT_CACHE_KEY, self.timestamps[1])
+
+        self.assertEqual(len(self.get_rows()), 4)
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get(self.url, {'output': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
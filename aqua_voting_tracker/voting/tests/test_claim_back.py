@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from aqua_voting_tracker.voting import tasks
+from aqua_voting_tracker.voting.models import Vote
+from aqua_voting_tracker.voting.tests.factories import VoteFactory
+
+
+class ClaimBackCheckTestCase(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+
+    def create_vote(self, **kwargs):
+        kwargs.setdefault('locked_at', self.now - timezone.timedelta(days=30))
+        return VoteFactory(**kwargs)
+
+    def test_due_votes_order(self):
+        unlocked_recently = self.create_vote(locked_until=self.now - timezone.timedelta(minutes=1))
+        unlocked_long_ago = self.create_vote(locked_until=self.now - timezone.timedelta(days=10))
+        rechecked = self.create_vote(
+            locked_until=self.now - timezone.timedelta(days=20),
+            claim_back_check_at=self.now - timezone.timedelta(minutes=5),
+            claim_back_check_count=3,
+        )
+        self.create_vote(locked_until=self.now + timezone.timedelta(minutes=1))
+        self.create_vote(
+            locked_until=self.now - timezone.timedelta(days=20),
+            claim_back_check_at=self.now + timezone.timedelta(hours=1),
+        )
+        self.create_vote(locked_until=self.now - timezone.timedelta(days=20), claimed_back_at=self.now)
+
+        self.assertEqual(
+            list(Vote.objects.filter_claim_back_check_due(self.now)),
+            [unlocked_long_ago, rechecked, unlocked_recently],
+        )
+
+    def test_backoff(self):
+        vote = VoteFactory.build(claim_back_check_count=0)
+        interval = timezone.timedelta(minutes=10)
+        max_interval = timezone.timedelta(hours=1)
+
+        delays = []
+        for _ in range(5):
+            vote.schedule_claim_back_check(self.now, interval, max_interval)
+            delays.append(vote.claim_back_check_at - self.now)
+
+        self.assertEqual(delays, [interval, interval * 2, interval * 4, max_interval, max_interval])
+        self.assertEqual(vote.claim_back_check_count, 5)
+
+    def test_update_claim_back_time(self):
+        claimed_vote = self.create_vote(locked_until=self.now - timezone.timedelta(minutes=1))
+        unclaimed_vote = self.create_vote(locked_until=self.now - timezone.timedelta(minutes=2))
+        claimed_back_at = self.now.replace(microsecond=0)
+
+        async def get_claim_back_time(votes):
+            return [(vote.balance_id, claimed_back_at) for vote in votes if vote.id == claimed_vote.id]
+
+        with mock.patch.object(tasks, '_bunch_get_claim_back_time', side_effect=get_claim_back_time) as horizon_mock, \
+                mock.patch.object(tasks, 'publish_vote_events') as publish_mock:
+            tasks.task_update_claim_back_time()
+            tasks.task_update_claim_back_time()
+
+        self.assertEqual(horizon_mock.call_count, 1)
+        publish_mock.assert_called_once_with([], [(claimed_vote.balance_id, claimed_back_at)])
+        self.assertEqual(Vote.objects.get(id=claimed_vote.id).claimed_back_at, claimed_back_at)
+
+        unclaimed_vote.refresh_from_db()
+        self.assertEqual(unclaimed_vote.claim_back_check_count, 1)
+        self.assertGreater(unclaimed_vote.claim_back_check_at, self.now)
@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase
+from django.utils import timezone
+
+from aqua_voting_tracker.voting.loaders.effects import EffectsStream
+from aqua_voting_tracker.voting.models import Checkpoint, Vote
+from aqua_voting_tracker.voting.tests.factories import VoteFactory
+
+
+class EffectsStreamCheckpointTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(EffectsStreamCheckpointTestCase, cls).setUpClass()
+        # Stream registers prometheus metrics, so it can be created only once.
+        cls.stream = EffectsStream()
+
+    def setUp(self):
+        self.stream.new_votes = []
+        self.stream.closed_votes = []
+        self.stream.pending_cursor = None
+
+    def test_cursor_is_committed_with_votes(self):
+        closed_vote = VoteFactory()
+        self.stream.new_votes = VoteFactory.build_batch(3)
+        self.stream.closed_votes = [(closed_vote.balance_id, timezone.now())]
+
+        with mock.patch.object(self.stream, 'batch_interval', 0):
+            self.stream.save_cursor('100-1')
+
+        self.assertEqual(Vote.objects.count(), 4)
+        self.assertIsNotNone(Vote.objects.get(id=closed_vote.id).claimed_back_at)
+        self.assertEqual(self.stream.load_cursor(), '100-1')
+        self.assertEqual(self.stream.new_votes, [])
+
+    def test_cursor_is_pending_until_batch_is_full(self):
+        self.stream.new_votes = VoteFactory.build_batch(3)
+
+        with mock.patch.object(self.stream, 'batch_interval', 60):
+            self.stream.save_cursor('100-1')
+
+        self.assertEqual(Vote.objects.count(), 0)
+        self.assertIsNone(self.stream.load_cursor())
+        self.assertEqual(self.stream.pending_cursor, '100-1')
+
+    def test_votes_are_rolled_back_with_cursor(self):
+        self.stream.new_votes = VoteFactory.build_batch(3)
+        self.stream.pending_cursor = '100-1'
+
+        with mock.patch.object(Checkpoint.objects, 'set_cursor', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.stream.commit_batch()
+
+        self.assertEqual(Vote.objects.count(), 0)
+        self.assertIsNone(self.stream.load_cursor())
+
+    def test_replayed_votes_are_ignored(self):
+        vote = VoteFactory()
+        self.stream.new_votes = [Vote(**{
+            field.name: getattr(vote, field.name) for field in Vote._meta.concrete_fields if field.name != 'id'
+        })]
+        self.stream.pending_cursor = '100-1'
+        self.stream.commit_batch()
+
+        self.assertEqual(Vote.objects.count(), 1)
+        self.assertEqual(self.stream.load_cursor(), '100-1')
+
+    def test_pending_batch_is_committed_on_idle(self):
+        self.stream.new_votes = VoteFactory.build_batch(2)
+
+        with mock.patch.object(self.stream, 'batch_interval', 60):
+            self.stream.save_cursor('100-1')
+            self.assertEqual(Vote.objects.count(), 0)
+
+            self.stream.on_idle()
+
+        self.assertEqual(Vote.objects.count(), 2)
+        self.assertEqual(self.stream.load_cursor(), '100-1')
+        self.assertIsNone(self.stream.pending_cursor)
+
+        with mock.patch.object(self.stream, 'commit_batch') as commit_batch_mock:
+            self.stream.on_idle()
+        commit_batch_mock.assert_not_called()
+
+    def test_only_written_votes_are_published(self):
+        claimed_back_at = timezone.now()
+        existing_vote = VoteFactory()
+        closed_vote = VoteFactory(claimed_back_at=claimed_back_at)
+        open_vote = VoteFactory()
+        new_vote = VoteFactory.build()
+        self.stream.new_votes = [new_vote, VoteFactory.build(balance_id=existing_vote.balance_id)]
+        self.stream.closed_votes = [(closed_vote.balance_id, claimed_back_at), (open_vote.balance_id, claimed_back_at)]
+
+        with mock.patch('aqua_voting_tracker.voting.loaders.effects.publish_vote_events') as publish_mock:
+            self.stream.commit_batch()
+
+        publish_mock.assert_called_once_with([new_vote], [(open_vote.balance_id, claimed_back_at)])
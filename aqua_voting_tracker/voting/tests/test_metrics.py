@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.test import TestCase
+
+from prometheus_client import REGISTRY
+
+from aqua_voting_tracker.voting.models import Vote
+from aqua_voting_tracker.voting.services.metrics import SnapshotStage, observe_lateness
+from aqua_voting_tracker.voting.tests.factories import VoteFactory
+
+
+def get_metric(name: str, labels: dict = None) -> float:
+    return REGISTRY.get_sample_value(
+        f'{settings.PROMETHEUS_METRICS_NAMESPACE}_voting_snapshot_{name}', labels or {},
+    ) or 0
+
+
+class SnapshotStageTestCase(TestCase):
+    def test_queries_and_rows(self):
+        VoteFactory.create_batch(3)
+        queries_before = get_metric('stage_queries_total', {'stage': 'test-stage'})
+
+        with SnapshotStage('test-stage', rows_in=10) as stage:
+            stage.rows_out = len(list(Vote.objects.all()))
+            Vote.objects.count()
+
+        Vote.objects.count()
+
+        self.assertEqual(stage.queries, 2)
+        self.assertGreater(stage.duration, 0)
+        self.assertEqual(get_metric('stage_queries_total', {'stage': 'test-stage'}), queries_before + 2)
+        self.assertEqual(get_metric('stage_rows', {'stage': 'test-stage', 'direction': 'in'}), 10)
+        self.assertEqual(get_metric('stage_rows', {'stage': 'test-stage', 'direction': 'out'}), 3)
+
+    def test_nested_stage_queries_are_counted_once(self):
+        VoteFactory.create_batch(3)
+
+        with SnapshotStage('test-outer') as outer_stage:
+            Vote.objects.count()
+            with SnapshotStage('test-inner') as inner_stage:
+                Vote.objects.count()
+                Vote.objects.count()
+            Vote.objects.count()
+
+        self.assertEqual(inner_stage.queries, 2)
+        self.assertEqual(outer_stage.queries, 2)
+
+
+class ObserveLatenessTestCase(TestCase):
+    def test_late_snapshot_is_counted(self):
+        threshold = settings.VOTING_SNAPSHOT_LATENESS_THRESHOLD.total_seconds()
+        late_before = get_metric('late_total')
+
+        observe_lateness(threshold / 2, threshold)
+        self.assertEqual(get_metric('lateness_seconds'), threshold / 2)
+        self.assertEqual(get_metric('late_total'), late_before)
+
+        with self.assertLogs('aqua_voting_tracker.voting.services.metrics', 'ERROR'):
+            observe_lateness(threshold + 1, threshold)
+        self.assertEqual(get_metric('lateness_seconds'), threshold + 1)
+        self.assertEqual(get_metric('late_total'), late_before + 1)
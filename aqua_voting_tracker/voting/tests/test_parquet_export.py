@@ -0,0 +1,91 @@
+import glob
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+import pyarrow.dataset as ds
+
+from aqua_voting_tracker.voting.models import Checkpoint, Vote, VotingSnapshotAsset
+from aqua_voting_tracker.voting.services.parquet_export import (
+    DATASETS,
+    VOTE_DATASET,
+    VOTING_SNAPSHOT_DATASET,
+    ParquetExporter,
+)
+from aqua_voting_tracker.voting.tests.factories import VoteFactory, VotingSnapshotFactory
+
+
+class ParquetExportTestCase(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+
+        self.exporter = ParquetExporter(self.path, chunk_size=3, lag=timezone.timedelta(0))
+
+    def read(self, dataset_name: str):
+        return ds.dataset(f'{self.path}/{dataset_name}', format='parquet', partitioning='hive').to_table()
+
+    def test_incremental_export(self):
+        now = timezone.now()
+        votes = VoteFactory.create_batch(5)
+        for days in range(2):
+            snapshot = VotingSnapshotFactory(timestamp=now - timezone.timedelta(days=days))
+            VotingSnapshotAsset.objects.create(
+                snapshot=snapshot, asset='AQUA:ISSUER', direction=VotingSnapshotAsset.Direction.UP,
+                votes_sum=snapshot.upvote_value, votes_count=1,
+            )
+
+        self.assertEqual(self.exporter.export_all(), {'vote': 5, 'voting_snapshot': 2, 'voting_snapshot_asset': 2})
+        self.assertEqual(self.exporter.export_all(), {'vote': 0, 'voting_snapshot': 0, 'voting_snapshot_asset': 0})
+
+        snapshots = self.read('voting_snapshot')
+        self.assertEqual(snapshots.num_rows, 2)
+        self.assertEqual(len(set(snapshots.column('date').to_pylist())), 2)
+        self.assertEqual(self.read('voting_snapshot_asset').num_rows, 2)
+
+        Vote.objects.bulk_close([(votes[0].balance_id, now)])
+        VoteFactory()
+
+        self.assertEqual(self.exporter.export_all()['vote'], 2)
+
+        exported_votes = self.read('vote').to_pylist()
+        self.assertEqual(len(exported_votes), 7)
+        latest_version = max(
+            (vote for vote in exported_votes if vote['balance_id'] == votes[0].balance_id),
+            key=lambda vote: vote['updated_at'],
+        )
+        self.assertEqual(latest_version['claimed_back_at'], now)
+        self.assertEqual(latest_version['amount'], votes[0].amount)
+
+    def test_recent_updates_are_delayed(self):
+        VoteFactory()
+        exporter = ParquetExporter(self.path, lag=timezone.timedelta(minutes=5))
+
+        self.assertEqual(exporter.export(DATASETS[0]), 0)
+
+    def test_export_is_held_behind_replica(self):
+        now = timezone.now()
+        VoteFactory()
+        replayed_at = now - timezone.timedelta(hours=1)
+
+        with patch.object(ParquetExporter, 'get_replay_timestamp', return_value=replayed_at):
+            self.assertEqual(self.exporter.export(VOTE_DATASET), 0)
+
+        self.assertEqual(
+            Checkpoint.objects.get_cursor(self.exporter.get_checkpoint_key(VOTE_DATASET)), replayed_at.isoformat(),
+        )
+        self.assertEqual(self.exporter.export(VOTE_DATASET), 1)
+
+    def test_partition_is_reopened(self):
+        now = timezone.now()
+        for days in [0, 1, 1, 0, 2, 0]:
+            VotingSnapshotFactory(timestamp=now - timezone.timedelta(days=days))
+
+        self.assertEqual(self.exporter.export(VOTING_SNAPSHOT_DATASET), 6)
+
+        snapshots = self.read('voting_snapshot')
+        self.assertEqual(snapshots.num_rows, 6)
+        self.assertEqual(len(glob.glob(f'{self.path}/voting_snapshot/*/*.parquet')), 5)
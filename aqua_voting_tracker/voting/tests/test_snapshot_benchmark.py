@@ -0,0 +1,53 @@
+from django.test import SimpleTestCase
+
+from aqua_voting_tracker.voting.services.metrics import SnapshotStage, record_stages
+from aqua_voting_tracker.voting.tests.bench_snapshot_creation import find_regressions
+
+
+class SnapshotCreationBenchmarkHarnessTests(SimpleTestCase):
+    def setUp(self):
+        self.baseline = {
+            'votes-10': {
+                'total': 1.0,
+                'peak_memory': 1000,
+                'stages': {'aggregation': {'min': 0.5, 'queries': 1}},
+            },
+        }
+
+    def get_result(self, total=1.0, peak_memory=1000, min_duration=0.5, queries=1):
+        return {
+            'votes-10': {
+                'total': total,
+                'peak_memory': peak_memory,
+                'stages': {
+                    'aggregation': {'min': min_duration, 'queries': queries},
+                    'saving': {'min': 9, 'queries': 9},
+                },
+            },
+        }
+
+    def test_within_tolerance(self):
+        self.assertEqual(find_regressions(self.baseline, self.get_result(total=1.2, min_duration=0.6), 0.25), [])
+
+    def test_regressions(self):
+        regressions = find_regressions(
+            self.baseline, self.get_result(total=1.3, peak_memory=2000, min_duration=0.7, queries=2), 0.25,
+        )
+
+        self.assertEqual(len(regressions), 4)
+
+    def test_unknown_case(self):
+        self.assertEqual(find_regressions({}, self.get_result(total=100), 0.25), [])
+
+
+class RecordStagesTests(SimpleTestCase):
+    def test_record_stages(self):
+        with record_stages() as stages:
+            with SnapshotStage('ranking', rows_in=2) as stage:
+                stage.rows_out = 2
+
+        with SnapshotStage('saving'):
+            pass
+
+        self.assertEqual([stage.name for stage in stages], ['ranking'])
+        self.assertIsNotNone(stages[0].duration)
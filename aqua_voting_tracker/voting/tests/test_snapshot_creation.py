@@ -1,5 +1,6 @@
 from decimal import Decimal
 from typing import Iterable, List
+from unittest import mock
 
 from django.test import TestCase
 from django.utils import timezone
@@ -8,6 +9,7 @@ from dateutil.parser import parse as date_parse
 
 from aqua_voting_tracker.utils.tests import fake
 from aqua_voting_tracker.voting.marketkeys.base import BaseMarketKeysProvider
+from aqua_voting_tracker.voting.models import VotingSnapshot
 from aqua_voting_tracker.voting.services.snapshot_creation import (
     SnapshotAssetRecord,
     SnapshotCreationUseCase,
@@ -473,3 +475,104 @@ class SnapshotCreationSetRankTestCase(TestCase):
         self.assertEqual(snapshot[2].market_key, snapshot_record1.market_key)
         self.assertEqual(snapshot[3].rank, 4)
         self.assertEqual(snapshot[3].market_key, snapshot_record3.market_key)
+
+
+class SnapshotCreationCatchUpTestCase(TestCase):
+    def setUp(self):
+        self.market_keys = [fake.stellar_public_key() for _ in range(3)]
+        self.use_case = SnapshotCreationUseCase(TestMarketKeysProvider([
+            {'upvote': market_key, 'downvote': fake.stellar_public_key()} for market_key in self.market_keys
+        ]))
+
+    def sort_aggregation(self, votes_aggregation: dict) -> dict:
+        return {
+            market_key: sorted(stats, key=lambda stat: stat['asset'])
+            for market_key, stats in votes_aggregation.items()
+        }
+
+    def test_get_votes_aggregations(self):
+        voting_accounts = [fake.stellar_public_key() for _ in range(4)]
+        start = date_parse('2024-12-01T00:00:00Z')
+        for index in range(40):
+            locked_at = start + timezone.timedelta(hours=index * 7 % 100)
+            VoteFactory(
+                market_key=self.market_keys[index % 3],
+                voting_account=voting_accounts[index % 4],
+                asset='VOTE1:GAT3XHMN2WXG62BDC3JGNANIA2Y53BCUAHO6B5UFZM2EITZRRYKEBGQ6' if index % 5 else
+                      'VOTE2:GAT3XHMN2WXG62BDC3JGNANIA2Y53BCUAHO6B5UFZM2EITZRRYKEBGQ6',
+                locked_at=locked_at,
+                claimed_back_at=locked_at + timezone.timedelta(hours=index % 30) if index % 2 else None,
+            )
+        timestamps = [start + timezone.timedelta(hours=hour) for hour in range(0, 120, 3)]
+
+        votes_aggregations = list(self.use_case.get_votes_aggregations(timestamps))
+
+        self.assertEqual([timestamp for timestamp, _ in votes_aggregations], timestamps)
+        for timestamp, votes_aggregation in votes_aggregations:
+            self.assertDictEqual(
+                self.sort_aggregation(votes_aggregation),
+                self.sort_aggregation(self.use_case.get_votes_aggregation(timestamp)),
+            )
+
+    def test_get_missing_timestamps(self):
+        timestamp = date_parse('2024-12-06T13:00:00Z')
+        self.assertEqual(self.use_case.get_missing_timestamps(timestamp), [timestamp])
+
+        VoteFactory(market_key=self.market_keys[0], locked_at=timestamp - timezone.timedelta(days=1))
+        self.use_case.create_snapshot(timestamp - timezone.timedelta(minutes=15))
+
+        self.assertEqual(self.use_case.get_missing_timestamps(timestamp), [
+            timestamp - timezone.timedelta(minutes=10),
+            timestamp - timezone.timedelta(minutes=5),
+            timestamp,
+        ])
+
+    def test_create_missing_snapshots(self):
+        timestamp = date_parse('2024-12-06T13:00:00Z')
+        VoteFactory(market_key=self.market_keys[0], locked_at=timestamp - timezone.timedelta(days=1))
+        self.use_case.create_snapshot(timestamp - timezone.timedelta(minutes=15))
+        VoteFactory(market_key=self.market_keys[1], locked_at=timestamp - timezone.timedelta(minutes=7))
+
+        self.use_case.create_missing_snapshots(timestamp)
+        self.use_case.create_missing_snapshots(timestamp)
+
+        self.assertCountEqual(
+            VotingSnapshot.objects.values_list('timestamp', 'market_key'),
+            [
+                (timestamp - timezone.timedelta(minutes=15), self.market_keys[0]),
+                (timestamp - timezone.timedelta(minutes=10), self.market_keys[0]),
+                (timestamp - timezone.timedelta(minutes=5), self.market_keys[0]),
+                (timestamp - timezone.timedelta(minutes=5), self.market_keys[1]),
+                (timestamp, self.market_keys[0]),
+                (timestamp, self.market_keys[1]),
+            ],
+        )
+
+    def test_get_finished_slot(self):
+        self.assertEqual(
+            SnapshotCreationUseCase.get_finished_slot(date_parse('2024-12-06T13:07:31Z')),
+            date_parse('2024-12-06T13:00:00Z'),
+        )
+        self.assertEqual(
+            SnapshotCreationUseCase.get_finished_slot(date_parse('2024-12-06T13:05:00Z')),
+            date_parse('2024-12-06T13:00:00Z'),
+        )
+
+        with mock.patch.object(SnapshotCreationUseCase, 'SNAPSHOT_INTERVAL', timezone.timedelta(minutes=15)):
+            self.assertEqual(
+                SnapshotCreationUseCase.get_finished_slot(date_parse('2024-12-06T13:07:31Z')),
+                date_parse('2024-12-06T12:45:00Z'),
+            )
+
+    def test_concurrent_snapshot_is_not_duplicated(self):
+        timestamp = date_parse('2024-12-06T13:00:00Z')
+        VoteFactory(market_key=self.market_keys[0], locked_at=timestamp - timezone.timedelta(days=1))
+        self.use_case.create_snapshot(timestamp)
+
+        # Existence check passes as if another run has not committed yet.
+        with mock.patch.object(VotingSnapshot.objects, 'filter') as filter_mock:
+            filter_mock.return_value.exists.return_value = False
+            with self.assertLogs('aqua_voting_tracker.voting.services.snapshot_creation', 'WARNING'):
+                self.use_case.create_snapshot(timestamp)
+
+        self.assertEqual(VotingSnapshot.objects.filter(timestamp=timestamp).count(), 1)
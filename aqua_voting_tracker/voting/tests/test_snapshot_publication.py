@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from aqua_voting_tracker.voting.constants import PUBLISHED_SNAPSHOT_CACHE_KEY, PUBLISHED_SNAPSHOT_FALLBACK
+from aqua_voting_tracker.voting.models import VotingSnapshot
+from aqua_voting_tracker.voting.services import snapshot_publication
+from aqua_voting_tracker.voting.services.snapshot_publication import publish_snapshot
+from aqua_voting_tracker.voting.tests.factories import VotingSnapshotFactory
+
+
+class SnapshotPublicationTestCase(TestCase):
+    def setUp(self):
+        cache.delete(PUBLISHED_SNAPSHOT_CACHE_KEY)
+        self.addCleanup(cache.delete, PUBLISHED_SNAPSHOT_CACHE_KEY)
+
+        self.timestamp = timezone.now().replace(second=0, microsecond=0)
+        self.previous_timestamp = self.timestamp - timezone.timedelta(minutes=5)
+        VotingSnapshotFactory(timestamp=self.previous_timestamp)
+        VotingSnapshotFactory(timestamp=self.timestamp)
+
+    def test_old_snapshot_without_publication(self):
+        self.assertFalse(VotingSnapshot.objects.filter_published_snapshot().exists())
+        self.assertIsNone(cache.get(PUBLISHED_SNAPSHOT_CACHE_KEY))
+
+        old_timestamp = self.timestamp - PUBLISHED_SNAPSHOT_FALLBACK - timezone.timedelta(minutes=5)
+        VotingSnapshotFactory(timestamp=old_timestamp)
+
+        self.assertEqual(
+            list(VotingSnapshot.objects.filter_published_snapshot().values_list('timestamp', flat=True)),
+            [old_timestamp],
+        )
+        self.assertEqual(cache.get(PUBLISHED_SNAPSHOT_CACHE_KEY), old_timestamp)
+
+        self.assertTrue(publish_snapshot(self.timestamp))
+        self.assertEqual(
+            list(VotingSnapshot.objects.filter_published_snapshot().values_list('timestamp', flat=True)),
+            [self.timestamp],
+        )
+
+    def test_unpublished_snapshot_is_hidden(self):
+        self.assertTrue(publish_snapshot(self.previous_timestamp))
+
+        with mock.patch.object(snapshot_publication, 'is_snapshot_replicated', return_value=False):
+            self.assertFalse(publish_snapshot(self.timestamp))
+
+        self.assertEqual(
+            list(VotingSnapshot.objects.filter_published_snapshot().values_list('timestamp', flat=True)),
+            [self.previous_timestamp],
+        )
+
+    def test_publication_never_moves_backwards(self):
+        self.assertTrue(publish_snapshot(self.timestamp))
+        self.assertTrue(publish_snapshot(self.previous_timestamp))
+
+        self.assertEqual(cache.get(PUBLISHED_SNAPSHOT_CACHE_KEY), self.timestamp)
@@ -0,0 +1,55 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from aqua_voting_tracker.voting.models import Vote
+from aqua_voting_tracker.voting.tests.factories import VoteFactory
+
+
+class VoteBulkUpsertTestCase(TestCase):
+    def test_insert(self):
+        votes = VoteFactory.build_batch(5)
+
+        inserted = Vote.objects.bulk_upsert(votes, batch_size=2)
+
+        self.assertEqual(sorted(inserted), sorted(vote.balance_id for vote in votes))
+        self.assertEqual(Vote.objects.count(), 5)
+        self.assertTrue(all(vote.created_at for vote in Vote.objects.all()))
+
+    def test_existing_votes_are_not_duplicated(self):
+        existing_vote = VoteFactory()
+        duplicate = VoteFactory.build(balance_id=existing_vote.balance_id, amount=existing_vote.amount + 1)
+        new_vote = VoteFactory.build()
+
+        inserted = Vote.objects.bulk_upsert([duplicate, new_vote, duplicate])
+
+        self.assertEqual(inserted, [new_vote.balance_id])
+        self.assertEqual(Vote.objects.count(), 2)
+        self.assertEqual(Vote.objects.get(balance_id=existing_vote.balance_id).amount, existing_vote.amount)
+
+    def test_unknown_claim_back_time_is_filled(self):
+        claimed_back_at = timezone.now().replace(microsecond=0)
+        existing_vote = VoteFactory()
+        duplicate = VoteFactory.build(balance_id=existing_vote.balance_id, claimed_back_at=claimed_back_at)
+
+        self.assertEqual(Vote.objects.bulk_upsert([duplicate]), [])
+        self.assertEqual(Vote.objects.get(balance_id=existing_vote.balance_id).claimed_back_at, claimed_back_at)
+
+
+class VoteBulkCloseTestCase(TestCase):
+    def test_bulk_close(self):
+        claimed_back_at = timezone.now().replace(microsecond=0)
+        votes = VoteFactory.create_batch(3)
+        VoteFactory()
+
+        updated = Vote.objects.bulk_close([(vote.balance_id, claimed_back_at) for vote in votes], batch_size=2)
+
+        self.assertEqual(sorted(updated), sorted((vote.balance_id, claimed_back_at) for vote in votes))
+        self.assertEqual(Vote.objects.filter(claimed_back_at=claimed_back_at).count(), 3)
+        self.assertEqual(Vote.objects.filter(claimed_back_at__isnull=True).count(), 1)
+
+    def test_bulk_close_is_idempotent(self):
+        claimed_back_at = timezone.now().replace(microsecond=0)
+        vote = VoteFactory(claimed_back_at=claimed_back_at)
+
+        self.assertEqual(Vote.objects.bulk_close([(vote.balance_id, claimed_back_at)]), [])
+        self.assertEqual(Vote.objects.bulk_close([('unknown', claimed_back_at)]), [])
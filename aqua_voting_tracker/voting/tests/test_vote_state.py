@@ -0,0 +1,187 @@
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from multiprocessing.connection import Client
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from aqua_voting_tracker.voting.constants import VOTE_STATE_PUBLISH_FAILED_CACHE_KEY
+from aqua_voting_tracker.voting.exceptions import VoteStateError
+from aqua_voting_tracker.voting.models import Vote
+from aqua_voting_tracker.voting.services.snapshot_creation import SnapshotCreationUseCase
+from aqua_voting_tracker.voting.state.client import VoteStateClient, get_authkey, parse_address, publish_vote_events
+from aqua_voting_tracker.voting.state.engine import VoteStateEngine
+from aqua_voting_tracker.voting.state.protocol import load_message
+from aqua_voting_tracker.voting.state.server import VoteStateServer, load_engine
+from aqua_voting_tracker.voting.tests.factories import VoteFactory
+
+
+def normalize_aggregation(votes_aggregation: dict) -> dict:
+    return {
+        market_key: sorted((stat['asset'], stat['votes_value'], stat['voting_amount']) for stat in stats)
+        for market_key, stats in votes_aggregation.items()
+    }
+
+
+def get_vote_record(vote: Vote) -> tuple:
+    return (vote.balance_id, vote.voting_account, vote.market_key, vote.asset, vote.amount,
+            vote.locked_at, vote.claimed_back_at)
+
+
+class VoteStateEngineTestCase(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        market_keys = [VoteFactory.build().market_key for _ in range(3)]
+        voting_accounts = [VoteFactory.build().voting_account for _ in range(4)]
+        for index in range(40):
+            VoteFactory(
+                market_key=market_keys[index % 3],
+                voting_account=voting_accounts[index % 4],
+                asset='VOTE:ISSUER' if index % 5 else 'AQUA:ISSUER',
+                locked_at=self.now - timezone.timedelta(hours=index),
+                claimed_back_at=self.now - timezone.timedelta(hours=index // 2) if index % 3 == 0 else None,
+            )
+        self.use_case = SnapshotCreationUseCase(None)
+
+    def test_aggregation_matches_database(self):
+        engine = load_engine()
+
+        self.assertEqual(len(engine), 40)
+        for hours in [0, 3, 10, 20, 45]:
+            timestamp = self.now - timezone.timedelta(hours=hours)
+            self.assertEqual(
+                normalize_aggregation(engine.get_votes_aggregation(timestamp)),
+                normalize_aggregation(self.use_case.get_votes_aggregation(timestamp)),
+            )
+
+    def test_voting_account_stats_match_database(self):
+        engine = load_engine()
+        vote = Vote.objects.first()
+
+        self.assertEqual(
+            engine.get_voting_account_stats(vote.market_key, self.now),
+            [
+                (stat['voting_account'], stat['votes_value'])
+                for stat in Vote.objects.filter(market_key=vote.market_key).filter_exist_at(
+                    self.now,
+                ).annotate_by_voting_account().order_by('voting_account')
+            ],
+        )
+
+    def test_apply_events(self):
+        engine = VoteStateEngine(capacity=1)
+        votes = VoteFactory.build_batch(3, amount=Decimal('1.0000001'), locked_at=self.now - timezone.timedelta(days=1))
+
+        self.assertEqual(engine.add_votes([get_vote_record(vote) for vote in votes]), 3)
+        self.assertEqual(engine.add_votes([get_vote_record(votes[0])]), 0)
+        self.assertEqual(engine.close_votes([(votes[0].balance_id, self.now), ('unknown', self.now)]), 1)
+        self.assertEqual(engine.close_votes([(votes[0].balance_id, self.now)]), 0)
+
+        self.assertEqual(
+            sum(stat['votes_value'] for stats in engine.get_votes_aggregation(self.now).values() for stat in stats),
+            Decimal('2.0000002'),
+        )
+
+
+@override_settings(VOTE_STATE_AUTHKEY='vote-state-test-key')
+class VoteStateServerTestCase(TestCase):
+    def setUp(self):
+        self.address = os.path.join(tempfile.mkdtemp(), 'vote-state.sock')
+        self.server = VoteStateServer(self.address, get_authkey(), timezone.timedelta(hours=1))
+        self.server.engine = VoteStateEngine()
+        self.server.loaded_at = timezone.now()
+        cache.delete(VOTE_STATE_PUBLISH_FAILED_CACHE_KEY)
+
+        threading.Thread(target=self.server.listen, daemon=True).start()
+        while not os.path.exists(self.address):
+            time.sleep(0.01)
+
+        self.client = VoteStateClient(self.address, get_authkey(), timeout=5)
+
+    def test_snapshot_aggregation(self):
+        now = timezone.now()
+        votes = VoteFactory.create_batch(5, locked_at=now - timezone.timedelta(days=1))
+        Vote.objects.filter(id=votes[0].id).update(claimed_back_at=now)
+        self.client.apply_events([get_vote_record(vote) for vote in votes], [(votes[0].balance_id, now)])
+
+        use_case = SnapshotCreationUseCase(None)
+        with override_settings(VOTE_STATE_ADDRESS=None):
+            expected = normalize_aggregation(use_case.get_votes_aggregation(now))
+
+        with override_settings(VOTE_STATE_ADDRESS=self.address):
+            with self.assertNumQueries(0):
+                self.assertEqual(normalize_aggregation(use_case.get_votes_aggregation(now)), expected)
+                self.assertEqual(len(dict(use_case.get_votes_aggregations([now]))[now]), 4)
+
+    def test_unknown_method(self):
+        with self.assertRaises(VoteStateError):
+            self.client.call('reload')
+
+    def test_wrong_authkey(self):
+        with self.assertRaises(VoteStateError):
+            VoteStateClient(self.address, b'wrong', timeout=5).get_votes_aggregation(timezone.now())
+
+    def test_pickled_request_is_not_loaded(self):
+        with Client(self.address, authkey=get_authkey()) as connection:
+            connection.send(('get_loaded_at', (), {}))
+            is_success, error = load_message(connection.recv_bytes())
+
+        self.assertFalse(is_success)
+        self.assertIn('JSONDecodeError', error)
+
+    def test_publish_failure_marks_engine_stale(self):
+        now = timezone.now()
+        VoteFactory.create_batch(3, locked_at=now - timezone.timedelta(days=1))
+        use_case = SnapshotCreationUseCase(None)
+
+        with override_settings(VOTE_STATE_ADDRESS=self.address + '.missing'):
+            with self.assertLogs('aqua_voting_tracker.voting.state.client', 'WARNING'):
+                publish_vote_events(Vote.objects.all(), [])
+
+        with override_settings(VOTE_STATE_ADDRESS=self.address):
+            self.assertIsNone(use_case.get_vote_state())
+            self.assertEqual(len(use_case.get_votes_aggregation(now)), 3)
+
+            with patch('aqua_voting_tracker.voting.state.server.close_old_connections'):
+                self.server.reload()
+            self.assertIsNotNone(use_case.get_vote_state())
+            with self.assertNumQueries(0):
+                self.assertEqual(len(use_case.get_votes_aggregation(now)), 3)
+
+    def test_voting_account_stats_view(self):
+        now = timezone.now()
+        market_key = VoteFactory.build().market_key
+        votes = VoteFactory.create_batch(4, market_key=market_key, locked_at=now - timezone.timedelta(days=1))
+        self.client.apply_events([get_vote_record(vote) for vote in votes], [])
+        url = f'/api/market-keys/{market_key}/votes/?timestamp={int(now.timestamp())}'
+
+        with override_settings(VOTE_STATE_ADDRESS=None):
+            expected = self.client_class().get(url).json()
+
+        with override_settings(VOTE_STATE_ADDRESS=self.address):
+            with self.assertNumQueries(0):
+                response = self.client_class().get(url)
+
+        self.assertEqual(response.json(), expected)
+        self.assertEqual(response.json()['count'], 4)
+
+
+class VoteStateAddressTestCase(TestCase):
+    def test_tcp_requires_opt_in(self):
+        self.assertEqual(parse_address('/tmp/vote-state.sock'), '/tmp/vote-state.sock')
+
+        with override_settings(VOTE_STATE_ALLOW_TCP=False), self.assertRaises(ImproperlyConfigured):
+            parse_address('127.0.0.1:9000')
+
+        with override_settings(VOTE_STATE_ALLOW_TCP=True):
+            self.assertEqual(parse_address('127.0.0.1:9000'), ('127.0.0.1', 9000))
+
+    def test_authkey_is_required(self):
+        with override_settings(VOTE_STATE_AUTHKEY=None), self.assertRaises(ImproperlyConfigured):
+            get_authkey()
@@ -1,10 +1,14 @@
 from django.urls import path
 
 from aqua_voting_tracker.voting.api import (
+    MultiGetVotingSnapshotAtView,
     MultiGetVotingSnapshotView,
+    TopVolumeSnapshotAtView,
     TopVolumeSnapshotView,
+    TopVotedSnapshotAtView,
     TopVotedSnapshotView,
     VotingAccountStatsView,
+    VotingSnapshotExportView,
     VotingSnapshotStatsView,
 )
 
@@ -15,4 +19,8 @@ urlpatterns = [
     path('voting-snapshot/top-volume/', TopVolumeSnapshotView.as_view()),
     path('voting-snapshot/top-voted/', TopVotedSnapshotView.as_view()),
     path('voting-snapshot/stats/', VotingSnapshotStatsView.as_view()),
+    path('voting-snapshot/export/', VotingSnapshotExportView.as_view()),
+    path('voting-snapshot/at/<int:timestamp>/', MultiGetVotingSnapshotAtView.as_view()),
+    path('voting-snapshot/at/<int:timestamp>/top-volume/', TopVolumeSnapshotAtView.as_view()),
+    path('voting-snapshot/at/<int:timestamp>/top-voted/', TopVotedSnapshotAtView.as_view()),
 ]
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from aqua_voting_tracker.voting_rewards.models import MarketRewardRun
+
+
+@admin.register(MarketRewardRun)
+class MarketRewardRunAdmin(admin.ModelAdmin):
+    list_display = ['market_key', 'asset1', 'asset2', 'reward_value', 'timestamp']
+    readonly_fields = ['market_key', 'asset1', 'asset2', 'votes_value', 'share', 'reward_value',
+                       'sdex_share', 'amm_share', 'sdex_reward_value', 'amm_reward_value', 'timestamp']
+    ordering = ['-timestamp', '-votes_value']
@@ -1,12 +1,58 @@
-from django.core.cache import cache
-
+from rest_framework.generics import GenericAPIView
+from rest_framework.mixins import ListModelMixin
+from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from aqua_voting_tracker.voting_rewards.constants import REWARD_CACHE_KEY
+from aqua_voting_tracker.utils.drf.filters import MultiGetFilterBackend
+from aqua_voting_tracker.utils.drf.mixins import ReplicaReadMixin
+from aqua_voting_tracker.voting_rewards.data import get_last_rewards
+from aqua_voting_tracker.voting_rewards.models import MarketRewardRun
+from aqua_voting_tracker.voting_rewards.pagination import OptionalVotingRewardsPagination
+from aqua_voting_tracker.voting_rewards.serializers import (
+    MarketRewardRunSerializer,
+    RankingSimulationRequestSerializer,
+    RankingSimulationSerializer,
+)
+from aqua_voting_tracker.voting_rewards.services.simulation import get_ranking_simulator
+
+
+class VotingRewardsView(ReplicaReadMixin, ListModelMixin, GenericAPIView):
+    serializer_class = MarketRewardRunSerializer
+    queryset = MarketRewardRun.objects.filter_last_run().order_by('-votes_value', 'id')
+    permission_classes = (AllowAny, )
+    pagination_class = OptionalVotingRewardsPagination
+    filter_backends = [MultiGetFilterBackend]
+    multiget_filter_fields = ['market_key']
 
+    def get_queryset(self):
+        queryset = super(VotingRewardsView, self).get_queryset()
+
+        asset1 = self.request.query_params.get('asset1')
+        asset2 = self.request.query_params.get('asset2')
+        if asset1 and asset2:
+            queryset = queryset.filter_asset_pair(asset1, asset2)
+        elif asset1 or asset2:
+            queryset = queryset.filter_asset(asset1 or asset2)
+
+        return queryset
 
-class VotingRewardsView(APIView):
     def get(self, request, *args, **kwargs):
-        rewards = cache.get(REWARD_CACHE_KEY, [])
-        return Response(rewards)
+        if not request.query_params:
+            return Response(get_last_rewards())
+
+        return self.list(request, *args, **kwargs)
+
+
+class RankingSimulationView(ReplicaReadMixin, APIView):
+    """
+    Rank and reward zone share of a market after hypothetical votes.
+    """
+    permission_classes = (AllowAny, )
+
+    def get(self, request, *args, **kwargs):
+        request_serializer = RankingSimulationRequestSerializer(data=request.query_params)
+        request_serializer.is_valid(raise_exception=True)
+
+        simulation = get_ranking_simulator().simulate(**request_serializer.validated_data)
+        return Response(RankingSimulationSerializer(instance=simulation).data)
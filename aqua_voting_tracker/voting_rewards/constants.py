@@ -1 +1,2 @@
 REWARD_CACHE_KEY = 'aqua_voting_tracker.voting_rewards.REWARD_CACHE_KEY'
+SDEX_AMM_DISTRIBUTION_CACHE_KEY = 'aqua_voting_tracker.voting_rewards.SDEX_AMM_DISTRIBUTION_CACHE_KEY'
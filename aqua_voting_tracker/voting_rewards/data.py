@@ -1,12 +1,16 @@
 from decimal import Decimal
-from typing import Iterable, Mapping
+from typing import Iterable, List, Mapping
 
 from django.conf import settings
+from django.core.cache import cache
 
 import requests
 
 from aqua_voting_tracker.voting.models import VotingSnapshot
 from aqua_voting_tracker.voting.serializers import VotingSnapshotSerializer, VotingSnapshotStatsSerializer
+from aqua_voting_tracker.voting_rewards.constants import REWARD_CACHE_KEY
+from aqua_voting_tracker.voting_rewards.models import MarketRewardRun
+from aqua_voting_tracker.voting_rewards.serializers import MarketRewardRunSerializer
 
 
 def get_voting_rewards_candidate(reward_zone_min_share: Decimal) -> Iterable[Mapping]:
@@ -25,3 +29,18 @@ def get_market_pairs(market_keys: Iterable[str]) -> Iterable[Mapping]:
     resp = requests.get(f'{market_keys_tracker_url}/api/market-keys/',
                         params=[('account_id', market_key) for market_key in market_keys])
     return resp.json()['results']
+
+
+def load_last_rewards() -> List[Mapping]:
+    queryset = MarketRewardRun.objects.filter_last_run().order_by('-votes_value', 'id')
+    return [dict(reward) for reward in MarketRewardRunSerializer(instance=queryset, many=True).data]
+
+
+def get_last_rewards() -> List[Mapping]:
+    rewards = cache.get(REWARD_CACHE_KEY)
+    if rewards is None:
+        rewards = load_last_rewards()
+        # Rewards may be loaded from a lagging replica, so never overwrite ones set by the rewards task.
+        cache.add(REWARD_CACHE_KEY, rewards, None)
+
+    return rewards
@@ -1,11 +1,17 @@
+import heapq
+import itertools
 import math
 
+import numpy as np
 from scipy.integrate import quad
 
 
 ERROR_CAP = 1. / 10 ** 6
 SPLIT_LIMIT = 1000
 
+GAUSS_LOW_ORDER = 7
+GAUSS_HIGH_ORDER = 15
+
 
 class SplitOverLimitError(Exception):
     message = 'The partitioning process has reached its limit.'
@@ -75,3 +81,245 @@ def integrate_piecewise(f, segments, args=()):
 
 def integrate(f, a, b, args=()):
     return _integrate(f, a, b, args=args)
+
+
+def integrate_power(scale, a, b, power):
+    """
+    Closed-form integral of (scale / x) ** power over [a, b] for power > 1.
+    Upper border can be infinite.
+    """
+    assert 0. < a <= b, 'The closed-form flow cannot work with negative borders.'
+    assert power > 1, 'The closed-form flow requires convergent power.'
+
+    if a == b:
+        return 0.
+
+    upper_term = 0. if b == math.inf else (scale / b) ** (power - 1)
+    return scale / (power - 1) * ((scale / a) ** (power - 1) - upper_term)
+
+
+def integrate_power_piecewise(scale, prices, depth, power):
+    """
+    Closed-form analogue of integrate_piecewise for (scale / x) ** power integrand.
+    Segments are described by order book arrays: depth[i] is held over [prices[i], prices[i + 1]],
+    the last depth is held up to infinity.
+    """
+    prices = np.asarray(prices, dtype=float)
+    depth = np.asarray(depth, dtype=float)
+    assert prices.size and prices[0] > 0., 'The closed-form flow cannot work with negative borders.'
+    assert power > 1, 'The closed-form flow requires convergent power.'
+
+    lower_terms = (scale / prices) ** (power - 1)
+    upper_terms = np.append(lower_terms[1:], 0.)
+    return float(scale / (power - 1) * np.dot(depth, lower_terms - upper_terms))
+
+
+def _gauss_legendre(f, lower, upper, base, tail, order, args=()):
+    """
+    Batched fixed-order quadrature. Tail partitions are given in t-space where x = base / t,
+    so infinite segments are mapped onto (0, 1].
+    """
+    nodes, weights = np.polynomial.legendre.leggauss(order)
+    half_width = (upper - lower) / 2
+    t = (lower + upper)[:, None] / 2 + half_width[:, None] * nodes[None, :]
+
+    x = np.where(tail[:, None], base[:, None] / t, t)
+    jacobian = np.where(tail[:, None], base[:, None] / t ** 2, 1.)
+
+    return half_width * np.dot(f(x, *args) * jacobian, weights)
+
+
+def integrate_piecewise_vectorized(f, prices, depth, args=()):
+    """
+    Batched version of integrate_piecewise. Accepts order book arrays instead of segments iterator
+    and requires f to support numpy arrays. All partitions are evaluated together and only
+    partitions exceeding the error cap are split on the next pass.
+    """
+    prices = np.asarray(prices, dtype=float)
+    depth = np.asarray(depth, dtype=float)
+    assert prices.size and prices[0] > 0., 'The partitioning flow cannot work with negative borders.'
+
+    segments_count = prices.size
+    segment = np.arange(segments_count)
+    lower = prices.copy()
+    upper = np.append(prices[1:], 1.)
+    base = prices.copy()
+    tail = segment == segments_count - 1
+    lower[tail] = 0.
+
+    while True:
+        result = _gauss_legendre(f, lower, upper, base, tail, GAUSS_HIGH_ORDER, args=args)
+        error = np.abs(result - _gauss_legendre(f, lower, upper, base, tail, GAUSS_LOW_ORDER, args=args))
+
+        result_sum = np.bincount(segment, weights=result, minlength=segments_count)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            to_split = error / np.abs(result_sum[segment]) > ERROR_CAP
+        to_split &= upper > lower
+
+        if not to_split.any():
+            return float(np.dot(depth, result_sum)), float(error.sum())
+
+        split_point = (lower[to_split] + upper[to_split]) / 2
+        segment = np.concatenate([segment[~to_split], segment[to_split], segment[to_split]])
+        base = np.concatenate([base[~to_split], base[to_split], base[to_split]])
+        tail = np.concatenate([tail[~to_split], tail[to_split], tail[to_split]])
+        lower, upper = (
+            np.concatenate([lower[~to_split], lower[to_split], split_point]),
+            np.concatenate([upper[~to_split], split_point, upper[to_split]]),
+        )
+
+        if segment.size > SPLIT_LIMIT * segments_count:
+            raise SplitOverLimitError()
+
+
+class EvaluationCache:
+    """
+    Memoized integrand wrapper. Counts real evaluations to expose integration cost.
+    """
+    __slots__ = ('f', 'args', 'values', 'evaluations')
+
+    def __init__(self, f, args=()):
+        self.f = f
+        self.args = args
+        self.values = {}
+        self.evaluations = 0
+
+    def __call__(self, x):
+        try:
+            return self.values[x]
+        except KeyError:
+            value = self.f(x, *self.args)
+            self.values[x] = value
+            self.evaluations += 1
+            return value
+
+    def evaluate(self, t, base=None):
+        """
+        Evaluate integrand at point t. For tail partitions (base is set) t-space is used: x = base / t,
+        so the integrand must decay faster than 1 / x ** 2.
+        """
+        if base is None:
+            return self(t)
+
+        if t == 0.:
+            return 0.
+
+        return self(base / t) * base / t ** 2
+
+
+class SimpsonPartition:
+    """
+    Two-level Simpson partition. Keeps its five evaluations, so each split costs four new evaluations only.
+    """
+    __slots__ = ('a', 'b', 'values', 'weight', 'base', 'result', 'error')
+
+    def __init__(self, a, b, values, weight=1., base=None):
+        self.a = a
+        self.b = b
+        self.values = values
+        self.weight = weight
+        self.base = base
+
+        fa, fq1, fm, fq3, fb = values
+        coarse = (b - a) / 6 * (fa + 4 * fm + fb)
+        fine = (b - a) / 12 * (fa + 4 * fq1 + 2 * fm + 4 * fq3 + fb)
+        self.result = weight * (fine + (fine - coarse) / 15)
+        self.error = abs(weight * (fine - coarse) / 15)
+
+    def __repr__(self):
+        return f'{self.a}-{self.b}: {self.result}, {self.error}'
+
+    def __lt__(self, other):
+        return self.error > other.error
+
+    @classmethod
+    def create(cls, cache: EvaluationCache, a, b, weight=1.):
+        base = None
+        if b == math.inf:
+            base, a, b = a, 0., 1.
+
+        points = (a, (3 * a + b) / 4, (a + b) / 2, (a + 3 * b) / 4, b)
+        return cls(a, b, tuple(cache.evaluate(point, base) for point in points), weight=weight, base=base)
+
+    def split(self, cache: EvaluationCache):
+        fa, fq1, fm, fq3, fb = self.values
+        q1 = (3 * self.a + self.b) / 4
+        m = (self.a + self.b) / 2
+        q3 = (self.a + 3 * self.b) / 4
+        if not self.a < (self.a + q1) / 2 < q1 < m < q3 < (q3 + self.b) / 2 < self.b:
+            return None
+
+        left_values = (fa, cache.evaluate((self.a + q1) / 2, self.base), fq1,
+                       cache.evaluate((q1 + m) / 2, self.base), fm)
+        right_values = (fm, cache.evaluate((m + q3) / 2, self.base), fq3,
+                        cache.evaluate((q3 + self.b) / 2, self.base), fb)
+        return (
+            SimpsonPartition(self.a, m, left_values, weight=self.weight, base=self.base),
+            SimpsonPartition(m, self.b, right_values, weight=self.weight, base=self.base),
+        )
+
+
+def _integrate_adaptive(cache: EvaluationCache, segments):
+    """
+    Global adaptive flow: partitions are kept in a heap by error and only the worst one is refined
+    until the whole error budget is met.
+    """
+    partitions = []
+    for x, a, b in segments:
+        assert 0. < a <= b, 'The partitioning flow cannot work with negative borders.'
+        if a < b:
+            partitions.append(SimpsonPartition.create(cache, a, b, weight=x))
+
+    if not partitions:
+        return 0., 0., 0
+
+    split_limit = SPLIT_LIMIT * len(partitions)
+    heapq.heapify(partitions)
+    accepted = []
+
+    result_sum = sum(part.result for part in partitions)
+    error_sum = sum(part.error for part in partitions)
+    while partitions and error_sum > ERROR_CAP * abs(result_sum):
+        if len(partitions) + len(accepted) > split_limit:
+            raise SplitOverLimitError()
+
+        part = heapq.heappop(partitions)
+        children = part.split(cache)
+        if children is None:
+            # Interval cannot be split within float precision.
+            accepted.append(part)
+            continue
+
+        for child in children:
+            heapq.heappush(partitions, child)
+
+        result_sum += sum(child.result for child in children) - part.result
+        error_sum += sum(child.error for child in children) - part.error
+
+    partitions = list(itertools.chain(partitions, accepted))
+    return sum(part.result for part in partitions), sum(part.error for part in partitions), len(partitions)
+
+
+def integrate_adaptive(f, a, b, args=(), full_output=False):
+    """
+    Drop-in replacement for integrate. With full_output info dict with evaluations count is returned as well.
+    """
+    cache = EvaluationCache(f, args=args)
+    result, error, partitions = _integrate_adaptive(cache, [(1., a, b)])
+    if full_output:
+        return result, error, {'evaluations': cache.evaluations, 'partitions': partitions}
+
+    return result, error
+
+
+def integrate_piecewise_adaptive(f, segments, args=(), full_output=False):
+    """
+    Drop-in replacement for integrate_piecewise. Error budget is shared between all segments
+    and the returned error is weighted by segment values.
+    """
+    cache = EvaluationCache(f, args=args)
+    result, error, partitions = _integrate_adaptive(cache, segments)
+    if full_output:
+        return result, error, {'evaluations': cache.evaluations, 'partitions': partitions}
+
+    return result, error
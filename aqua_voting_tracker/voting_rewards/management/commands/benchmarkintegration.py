@@ -0,0 +1,65 @@
+import time
+
+from django.core.management import BaseCommand
+
+import numpy as np
+
+from aqua_voting_tracker.voting_rewards.integrate import (
+    integrate_piecewise,
+    integrate_piecewise_adaptive,
+    integrate_piecewise_vectorized,
+    integrate_power_piecewise,
+)
+from aqua_voting_tracker.voting_rewards.services.sdex_amm_distribution.exponent import ExponentDistributor
+from aqua_voting_tracker.voting_rewards.stellar import SDEX
+
+
+class Command(BaseCommand):
+    help = 'Compare piecewise integration engines on large synthetic order books.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[100, 1000, 10000],
+                            help='Order book sizes (price levels) to benchmark.')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed for synthetic order books.')
+
+    def generate_sdex(self, size: int, rng: np.random.Generator) -> SDEX:
+        prices = 1 + np.cumsum(rng.uniform(0.00001, 0.001, size))
+        depth = np.cumsum(rng.uniform(1, 1000, size))
+        return SDEX(prices.tolist(), depth.tolist())
+
+    def measure(self, func, *args, **kwargs):
+        started_at = time.perf_counter()
+        result = func(*args, **kwargs)
+        return result, time.perf_counter() - started_at
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        distributor = ExponentDistributor(None)
+
+        for size in options['sizes']:
+            sdex = self.generate_sdex(size, rng)
+            min_price = sdex.min_price
+            prices, depth = sdex.get_depth_arrays()
+
+            (loop_result, _), loop_time = self.measure(
+                integrate_piecewise, distributor.exponent, sdex.get_depth_segments(), args=(min_price, ),
+            )
+            (vectorized_result, vectorized_error), vectorized_time = self.measure(
+                integrate_piecewise_vectorized, distributor.exponent, prices, depth, args=(min_price, ),
+            )
+            (adaptive_result, adaptive_error, adaptive_info), adaptive_time = self.measure(
+                integrate_piecewise_adaptive, distributor.exponent, sdex.get_depth_segments(), args=(min_price, ),
+                full_output=True,
+            )
+            closed_form_result, closed_form_time = self.measure(
+                integrate_power_piecewise, min_price, prices, depth, distributor.power,
+            )
+
+            self.stdout.write(f'Order book size: {size}')
+            self.stdout.write(f'  loop:        {loop_time:.6f}s result={loop_result!r}')
+            self.stdout.write(f'  vectorized:  {vectorized_time:.6f}s result={vectorized_result!r} '
+                              f'error={vectorized_error:.3e}')
+            self.stdout.write(f'  adaptive:    {adaptive_time:.6f}s result={adaptive_result!r} '
+                              f'error={adaptive_error:.3e} evaluations={adaptive_info["evaluations"]}')
+            self.stdout.write(f'  closed form: {closed_form_time:.6f}s result={closed_form_result!r}')
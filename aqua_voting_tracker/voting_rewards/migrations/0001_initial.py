@@ -0,0 +1,39 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketRewardRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('market_key', models.CharField(max_length=56)),
+                ('asset1', models.CharField(max_length=69)),
+                ('asset2', models.CharField(max_length=69)),
+                ('votes_value', models.DecimalField(decimal_places=7, max_digits=20)),
+                ('share', models.DecimalField(decimal_places=7, max_digits=20)),
+                ('reward_value', models.PositiveBigIntegerField()),
+                ('sdex_share', models.DecimalField(decimal_places=7, max_digits=20)),
+                ('amm_share', models.DecimalField(decimal_places=7, max_digits=20)),
+                ('sdex_reward_value', models.PositiveBigIntegerField()),
+                ('amm_reward_value', models.PositiveBigIntegerField()),
+                ('timestamp', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='marketrewardrun',
+            index=models.Index(fields=['market_key', '-timestamp'], name='voting_rewa_market__d5051e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='marketrewardrun',
+            index=models.Index(fields=['asset1', 'asset2', '-timestamp'], name='voting_rewa_asset1_1ee32f_idx'),
+        ),
+    ]
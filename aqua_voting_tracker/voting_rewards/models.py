@@ -0,0 +1,45 @@
+from django.db import models
+
+
+class MarketRewardRunQuerySet(models.QuerySet):
+    def filter_last_run(self):
+        last_run_timestamp = self.order_by('-timestamp').values('timestamp')[:1]
+        return self.filter(timestamp=models.Subquery(last_run_timestamp))
+
+    def filter_asset(self, asset):
+        return self.filter(models.Q(asset1=asset) | models.Q(asset2=asset))
+
+    def filter_asset_pair(self, asset1, asset2):
+        return self.filter(
+            models.Q(asset1=asset1, asset2=asset2)
+            | models.Q(asset1=asset2, asset2=asset1),
+        )
+
+
+class MarketRewardRun(models.Model):
+    market_key = models.CharField(max_length=56)
+
+    asset1 = models.CharField(max_length=69)
+    asset2 = models.CharField(max_length=69)
+
+    votes_value = models.DecimalField(max_digits=20, decimal_places=7)
+    share = models.DecimalField(max_digits=20, decimal_places=7)
+
+    reward_value = models.PositiveBigIntegerField()
+    sdex_share = models.DecimalField(max_digits=20, decimal_places=7)
+    amm_share = models.DecimalField(max_digits=20, decimal_places=7)
+    sdex_reward_value = models.PositiveBigIntegerField()
+    amm_reward_value = models.PositiveBigIntegerField()
+
+    timestamp = models.DateTimeField(db_index=True)
+
+    objects = MarketRewardRunQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['market_key', '-timestamp']),
+            models.Index(fields=['asset1', 'asset2', '-timestamp']),
+        ]
+
+    def __str__(self):
+        return f'{self.market_key} - {self.timestamp}'
@@ -0,0 +1,13 @@
+from aqua_voting_tracker.voting.pagination import BaseVotingPagination
+
+
+class OptionalVotingRewardsPagination(BaseVotingPagination):
+    """
+    Paginate only if client asked for it, otherwise full list is returned as is.
+    """
+    def paginate_queryset(self, queryset, request, view=None):
+        query_params = request.query_params
+        if self.page_query_param not in query_params and self.page_size_query_param not in query_params:
+            return None
+
+        return super(OptionalVotingRewardsPagination, self).paginate_queryset(queryset, request, view=view)
@@ -0,0 +1,30 @@
+from rest_framework import serializers
+
+from aqua_voting_tracker.voting_rewards.models import MarketRewardRun
+
+
+class MarketRewardRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MarketRewardRun
+        fields = ['market_key', 'asset1', 'asset2', 'reward_value', 'sdex_reward_value', 'amm_reward_value',
+                  'timestamp']
+
+
+class RankingSimulationRequestSerializer(serializers.Serializer):
+    market_key = serializers.CharField(max_length=56)
+    upvote_value = serializers.DecimalField(max_digits=20, decimal_places=7, min_value=0, default=0)
+    downvote_value = serializers.DecimalField(max_digits=20, decimal_places=7, min_value=0, default=0)
+    target_rank = serializers.IntegerField(min_value=1, required=False)
+
+
+class RankingSimulationSerializer(serializers.Serializer):
+    market_key = serializers.CharField()
+    votes_value = serializers.DecimalField(max_digits=20, decimal_places=7)
+    adjusted_votes_value = serializers.DecimalField(max_digits=20, decimal_places=7)
+    rank = serializers.IntegerField()
+    in_reward_zone = serializers.BooleanField()
+    share = serializers.DecimalField(max_digits=5, decimal_places=4)
+    reward_value = serializers.DecimalField(max_digits=20, decimal_places=7)
+    reward_zone_upvote_value = serializers.DecimalField(max_digits=20, decimal_places=7)
+    target_rank = serializers.IntegerField()
+    target_rank_upvote_value = serializers.DecimalField(max_digits=20, decimal_places=7)
@@ -1,17 +1,24 @@
 import asyncio
+import logging
 from decimal import Decimal
-from typing import Iterable, List, Tuple
+from typing import Dict, Iterable, List, Tuple
 
 from django.conf import settings
+from django.core.cache import cache
 
-from stellar_sdk import Asset, ServerAsync
+from stellar_sdk import Asset
 
 from aqua_voting_tracker.utils.stellar.asset import get_asset_string, parse_asset_string
+from aqua_voting_tracker.utils.stellar.horizon import get_horizon_server_async
+from aqua_voting_tracker.voting_rewards.constants import SDEX_AMM_DISTRIBUTION_CACHE_KEY
 from aqua_voting_tracker.voting_rewards.services.rewards.base import MarketReward, RewardsCalculator
 from aqua_voting_tracker.voting_rewards.services.sdex_amm_distribution.exponent import ExponentDistributor
 from aqua_voting_tracker.voting_rewards.stellar import MarketData
 
 
+logger = logging.getLogger(__name__)
+
+
 class RewardsV2Calculator(RewardsCalculator):
     def __init__(self):
         super(RewardsV2Calculator, self).__init__()
@@ -22,6 +29,7 @@ class RewardsV2Calculator(RewardsCalculator):
         self.DEFAULT_AMM_SHARE = Decimal(settings.AMM_SHARE)
 
         self.SDEX_AMM_MIN_SHARE = Decimal(settings.SDEX_AMM_MIN_SHARE)
+        self.DISTRIBUTION_CACHE_TIMEOUT = settings.SDEX_AMM_DISTRIBUTION_CACHE_TIMEOUT
 
         self.distributor_class = ExponentDistributor
 
@@ -30,20 +38,49 @@ class RewardsV2Calculator(RewardsCalculator):
         return self.DEFAULT_SDEX_SHARE / shares_sum, self.DEFAULT_AMM_SHARE / shares_sum
 
     async def load_markets_data(self, asset_pairs: List[Tuple[Asset, Asset]]) -> List[MarketData]:
-        server = ServerAsync(self.HORIZON_URL)
-
         market_data_list = [
             MarketData(asset1, asset2) for asset1, asset2 in asset_pairs
         ]
 
-        await asyncio.gather(*[
-            data.load_data(server) for data in market_data_list
-        ])
-
-        await server.close()
+        async with get_horizon_server_async(self.HORIZON_URL) as server:
+            await asyncio.gather(*[
+                data.load_data(server) for data in market_data_list
+            ])
 
         return market_data_list
 
+    def get_distribution_cache_key(self, market_data: MarketData) -> str:
+        return f'{SDEX_AMM_DISTRIBUTION_CACHE_KEY}.{self.distributor_class.__name__}.{market_data.get_fingerprint()}'
+
+    def get_distributions(self, market_data_list: Iterable[MarketData]) -> Dict[Tuple[str, str], Tuple[float, float]]:
+        """
+        Calculate sdex/amm weights for loaded markets. Weights of markets with unchanged
+        order books and pool reserves are taken from cache.
+        """
+        cache_keys = {
+            (get_asset_string(market_data.asset1), get_asset_string(market_data.asset2)): (
+                self.get_distribution_cache_key(market_data), market_data,
+            )
+            for market_data in market_data_list if market_data.is_loaded()
+        }
+        cached_distributions = cache.get_many([cache_key for cache_key, _ in cache_keys.values()])
+
+        distributions = {}
+        new_distributions = {}
+        for market_pair, (cache_key, market_data) in cache_keys.items():
+            if cache_key in cached_distributions:
+                distributions[market_pair] = cached_distributions[cache_key]
+                continue
+
+            distributions[market_pair] = self.distributor_class(market_data).get_weights()
+            new_distributions[cache_key] = distributions[market_pair]
+
+        logger.info('SDEX/AMM distribution: %s cached, %s calculated.',
+                    len(cached_distributions), len(new_distributions))
+        cache.set_many(new_distributions, self.DISTRIBUTION_CACHE_TIMEOUT)
+
+        return distributions
+
     def distribute_sdex_amm(self, reward_zone: Iterable[MarketReward]) -> Iterable[MarketReward]:
         reward_zone = list(reward_zone)
 
@@ -51,16 +88,12 @@ class RewardsV2Calculator(RewardsCalculator):
             (parse_asset_string(market.asset1), parse_asset_string(market.asset2))
             for market in reward_zone
         ]))
-        market_data_dict = {
-            (get_asset_string(market_data.asset1), get_asset_string(market_data.asset2)): market_data
-            for market_data in market_data_list
-        }
+        distributions = self.get_distributions(market_data_list)
 
         for market_reward in reward_zone:
-            market_data = market_data_dict[(market_reward.asset1, market_reward.asset2)]
-            if market_data.is_loaded():
-                distributor = self.distributor_class(market_data)
-                sdex_share, amm_share = distributor.get_weights()
+            market_pair = (market_reward.asset1, market_reward.asset2)
+            if market_pair in distributions:
+                sdex_share, amm_share = distributions[market_pair]
             else:
                 sdex_share, amm_share = self.get_default_distribution()
 
@@ -1,47 +1,91 @@
 import logging
 import math
 
-from aqua_voting_tracker.voting_rewards.integrate import integrate, integrate_piecewise
+from aqua_voting_tracker.voting_rewards.integrate import (
+    ERROR_CAP,
+    integrate_adaptive,
+    integrate_piecewise_vectorized,
+    integrate_power,
+    integrate_power_piecewise,
+)
 from aqua_voting_tracker.voting_rewards.services.sdex_amm_distribution.base import Distributor
+from aqua_voting_tracker.voting_rewards.stellar import AMM, SDEX
 
 
 logger = logging.getLogger(__name__)
 
 
 class ExponentDistributor(Distributor):
+    power = 8
+
+    # Compare closed-form weights with the numeric partitioner. Useful for debugging only.
+    verify_weights = False
+
     def exponent(self, price: float, min_price: float) -> float:
-        return (min_price / price) ** 8
+        return (min_price / price) ** self.power
+
+    def get_sdex_weight_numeric(self, sdex: SDEX, min_price: float) -> float:
+        prices, depth = sdex.get_depth_arrays()
+        result, error = integrate_piecewise_vectorized(self.exponent, prices, depth, args=(min_price, ))
+        logger.debug('SDEX numeric error: %s', error)
+        return result
+
+    def get_sdex_weight_analytic(self, sdex: SDEX, min_price: float) -> float:
+        prices, depth = sdex.get_depth_arrays()
+        return integrate_power_piecewise(min_price, prices, depth, self.power)
+
+    def get_amm_weight_numeric(self, amm: AMM, min_price: float) -> float:
+        result, error, info = integrate_adaptive(lambda price: self.exponent(price, min_price) * amm.depth(price),
+                                                 amm.min_price, math.inf, full_output=True)
+        logger.debug('AMM numeric error: %s, evaluations: %s', error, info['evaluations'])
+        return result
+
+    def get_amm_weight_analytic(self, amm: AMM, min_price: float) -> float:
+        # depth(price) = reserve2 - reserve1 / (1 - fee) / price, so the integrand splits into two power terms.
+        price_coefficient = amm.reserve1 / (1 - amm.fee)
+        return (
+            amm.reserve2 * integrate_power(min_price, amm.min_price, math.inf, self.power)
+            - price_coefficient / min_price * integrate_power(min_price, amm.min_price, math.inf, self.power + 1)
+        )
+
+    def get_weight(self, analytic_method, numeric_method, *args) -> float:
+        try:
+            result = analytic_method(*args)
+        except (ArithmeticError, AssertionError):
+            logger.warning('Closed-form integration failed.', exc_info=True)
+            result = math.nan
+
+        if not math.isfinite(result) or result < 0:
+            logger.warning('Closed-form integration is not applicable, fallback to numeric integration.')
+            return numeric_method(*args)
+
+        if self.verify_weights:
+            numeric_result = numeric_method(*args)
+            if abs(result - numeric_result) > ERROR_CAP * abs(result):
+                logger.warning('Closed-form and numeric weights mismatch: %s, %s', result, numeric_result)
+
+        return result
 
     def get_sdex_buying_weight(self) -> float:
         sdex = self.market_data.buying_sdex
         min_price = self.market_data.buying_min_price
 
-        result, error = integrate_piecewise(self.exponent, sdex.get_depth_segments(), args=(min_price, ))
-        logger.debug('SDEX buying error: %s', error)
-        return result
+        return self.get_weight(self.get_sdex_weight_analytic, self.get_sdex_weight_numeric, sdex, min_price)
 
     def get_sdex_selling_weight(self) -> float:
         sdex = self.market_data.selling_sdex
         min_price = self.market_data.selling_min_price
 
-        result, error = integrate_piecewise(self.exponent, sdex.get_depth_segments(), args=(min_price, ))
-        logger.debug('SDEX selling error: %s', error)
-        return result
+        return self.get_weight(self.get_sdex_weight_analytic, self.get_sdex_weight_numeric, sdex, min_price)
 
     def get_amm_buying_weight(self) -> float:
         amm = self.market_data.amm
         min_price = self.market_data.buying_min_price
 
-        result, error = integrate(lambda price: self.exponent(price, min_price) * amm.depth(price),
-                                  amm.min_price, math.inf)
-        logger.debug('AMM buying error: %s', error)
-        return result
+        return self.get_weight(self.get_amm_weight_analytic, self.get_amm_weight_numeric, amm, min_price)
 
     def get_amm_selling_weight(self) -> float:
         amm = self.market_data.amm.reverse()
         min_price = self.market_data.selling_min_price
 
-        result, error = integrate(lambda price: self.exponent(price, min_price) * amm.depth(price),
-                                  amm.min_price, math.inf)
-        logger.debug('AMM selling error: %s', error)
-        return result
+        return self.get_weight(self.get_amm_weight_analytic, self.get_amm_weight_numeric, amm, min_price)
@@ -0,0 +1,239 @@
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple
+
+from aqua_voting_tracker.voting.models import VotingSnapshot
+from aqua_voting_tracker.voting_rewards.services.rewards.base import MarketReward, RewardsCalculator
+
+
+@dataclass
+class MarketSimulation:
+    market_key: str
+    votes_value: Decimal
+    adjusted_votes_value: Decimal
+    rank: int
+
+    share: Decimal = None
+    reward_value: Decimal = None
+
+    reward_zone_upvote_value: Decimal = None
+    target_rank: int = None
+    target_rank_upvote_value: Decimal = None
+
+    @property
+    def in_reward_zone(self) -> bool:
+        return self.share is not None
+
+
+class RankingState:
+    """
+    Snapshot values sorted by (adjusted_votes_value, votes_value) ascending, as columns.
+    State is immutable, new snapshot produces new state.
+    """
+
+    def __init__(self, timestamp: Optional[datetime], markets: Iterable[Tuple[str, Decimal, Decimal]]):
+        self.timestamp = timestamp
+        self.loaded_at = time.monotonic()
+
+        markets = sorted(markets, key=lambda market: (market[2], market[1]))
+        self.market_keys = [market_key for market_key, _, _ in markets]
+        self.sort_keys = [(adjusted_votes_value, votes_value) for _, votes_value, adjusted_votes_value in markets]
+        self.positions = {market_key: index for index, market_key in enumerate(self.market_keys)}
+        self.total_adjusted_votes_value = sum(adjusted_votes_value for _, _, adjusted_votes_value in markets)
+
+    @classmethod
+    def load(cls, timestamp: Optional[datetime]) -> 'RankingState':
+        queryset = VotingSnapshot.objects.all()
+        if timestamp is None:
+            queryset = queryset.filter_last_snapshot()
+        else:
+            queryset = queryset.filter(timestamp=timestamp)
+
+        return cls(timestamp, queryset.values_list('market_key', 'votes_value', 'adjusted_votes_value').iterator())
+
+    def __len__(self):
+        return len(self.market_keys)
+
+    def get_market(self, market_key: str) -> Tuple[Decimal, Decimal]:
+        position = self.positions.get(market_key)
+        if position is None:
+            return Decimal(0), Decimal(0)
+
+        adjusted_votes_value, votes_value = self.sort_keys[position]
+        return votes_value, adjusted_votes_value
+
+    def get_boost_multiplier(self, market_key: str) -> Decimal:
+        votes_value, adjusted_votes_value = self.get_market(market_key)
+        if votes_value > 0 and adjusted_votes_value > votes_value:
+            return adjusted_votes_value / votes_value
+        return Decimal(1)
+
+    def count_ahead(self, sort_key: Tuple[Decimal, Decimal], exclude: str = None) -> int:
+        ahead = len(self.sort_keys) - bisect_right(self.sort_keys, sort_key)
+        position = self.positions.get(exclude)
+        if position is not None and self.sort_keys[position] > sort_key:
+            ahead -= 1
+        return ahead
+
+    def iter_top(self, exclude: str = None) -> Iterable[Tuple[str, Decimal, Decimal]]:
+        for position in range(len(self.market_keys) - 1, -1, -1):
+            market_key = self.market_keys[position]
+            if market_key == exclude:
+                continue
+
+            adjusted_votes_value, votes_value = self.sort_keys[position]
+            yield market_key, votes_value, adjusted_votes_value
+
+
+class RankingSimulator(RewardsCalculator):
+    """
+    Answer what-if questions on top of the last published snapshot: rank and reward zone share
+    of a market after hypothetical votes. Reward zone follows RewardsCalculator rules.
+    """
+
+    def __init__(self, state: RankingState):
+        super(RankingSimulator, self).__init__()
+
+        self.state = state
+        self.reward_zone_limit = int(1 / self.MIN_SHARE_FOR_REWARD_ZONE)
+
+    def get_simulated_reward_zone(self, market_key: str, votes_value: Decimal,
+                                  adjusted_votes_value: Decimal) -> List[MarketReward]:
+        total_votes_value = (
+            self.state.total_adjusted_votes_value
+            - self.state.get_market(market_key)[1]
+            + adjusted_votes_value
+        )
+        if total_votes_value <= 0:
+            return []
+
+        sort_key = (adjusted_votes_value, votes_value)
+        candidates = []
+        is_inserted = False
+        for candidate_key, candidate_votes_value, candidate_adjusted_votes_value in self.state.iter_top(market_key):
+            if len(candidates) >= self.reward_zone_limit:
+                break
+
+            if not is_inserted and (candidate_adjusted_votes_value, candidate_votes_value) <= sort_key:
+                candidates.append((market_key, adjusted_votes_value))
+                is_inserted = True
+                if len(candidates) >= self.reward_zone_limit:
+                    break
+
+            candidates.append((candidate_key, candidate_adjusted_votes_value))
+
+        if not is_inserted and len(candidates) < self.reward_zone_limit:
+            candidates.append((market_key, adjusted_votes_value))
+
+        reward_zone = []
+        for candidate_key, candidate_adjusted_votes_value in candidates:
+            if candidate_adjusted_votes_value / total_votes_value < self.MIN_SHARE_FOR_REWARD_ZONE:
+                break
+
+            reward_zone.append(MarketReward(market_key=candidate_key, votes_value=candidate_adjusted_votes_value))
+
+        return reward_zone
+
+    def get_required_adjusted_value(self, market_key: str, target_rank: int) -> Decimal:
+        """
+        Adjusted votes value to get ahead of the market currently holding target rank.
+        """
+        for index, (_, _, adjusted_votes_value) in enumerate(self.state.iter_top(market_key)):
+            if index == target_rank - 1:
+                return adjusted_votes_value
+        return Decimal(0)
+
+    def get_reward_zone_adjusted_value(self, market_key: str) -> Decimal:
+        """
+        Adjusted votes value to pass both reward zone share threshold and reward zone size limit.
+        """
+        others_votes_value = self.state.total_adjusted_votes_value - self.state.get_market(market_key)[1]
+        min_share = self.MIN_SHARE_FOR_REWARD_ZONE
+        required_value = min_share * others_votes_value / (1 - min_share)
+
+        limit_value = self.get_required_adjusted_value(market_key, self.reward_zone_limit)
+        return max(required_value, limit_value)
+
+    def get_required_upvote_value(self, market_key: str, adjusted_votes_value: Decimal) -> Decimal:
+        votes_value, current_adjusted_votes_value = self.state.get_market(market_key)
+        if adjusted_votes_value < current_adjusted_votes_value:
+            return Decimal(0)
+
+        required_votes_value = adjusted_votes_value / self.state.get_boost_multiplier(market_key)
+        return max(required_votes_value - votes_value, Decimal(0))
+
+    def simulate(self, market_key: str, upvote_value: Decimal = 0, downvote_value: Decimal = 0,
+                 target_rank: int = None) -> MarketSimulation:
+        votes_value, _ = self.state.get_market(market_key)
+        votes_value = votes_value + upvote_value - downvote_value
+
+        boost_multiplier = self.state.get_boost_multiplier(market_key)
+        adjusted_votes_value = votes_value * boost_multiplier
+
+        simulation = MarketSimulation(
+            market_key=market_key,
+            votes_value=votes_value,
+            adjusted_votes_value=adjusted_votes_value,
+            rank=self.state.count_ahead((adjusted_votes_value, votes_value), exclude=market_key) + 1,
+        )
+
+        reward_zone = self.get_simulated_reward_zone(market_key, votes_value, adjusted_votes_value)
+        reward_zone = list(self.set_reward_value(self.calculate_shares(reward_zone)))
+        market_reward = next((reward for reward in reward_zone if reward.market_key == market_key), None)
+        if market_reward:
+            simulation.share = market_reward.share
+            simulation.reward_value = market_reward.reward_value
+
+        simulation.reward_zone_upvote_value = self.get_required_upvote_value(
+            market_key, self.get_reward_zone_adjusted_value(market_key),
+        )
+
+        if target_rank is not None:
+            simulation.target_rank = target_rank
+            simulation.target_rank_upvote_value = self.get_required_upvote_value(
+                market_key, self.get_required_adjusted_value(market_key, target_rank),
+            )
+
+        return simulation
+
+
+# Reload period of the state while no snapshot is published yet.
+UNPUBLISHED_STATE_TTL = 60
+
+_state: Optional[RankingState] = None
+_state_lock = threading.Lock()
+
+
+def is_state_actual(state: Optional[RankingState], published_timestamp: Optional[datetime]) -> bool:
+    if state is None or state.timestamp != published_timestamp:
+        return False
+
+    if published_timestamp is None:
+        return time.monotonic() - state.loaded_at < UNPUBLISHED_STATE_TTL
+
+    return True
+
+
+def get_ranking_state() -> RankingState:
+    """
+    Process-wide ranking state. It is rebuilt once after a new snapshot is published,
+    so the database is queried only once per snapshot.
+    """
+    global _state
+
+    published_timestamp = VotingSnapshot.objects.get_published_timestamp()
+    if is_state_actual(_state, published_timestamp):
+        return _state
+
+    with _state_lock:
+        if not is_state_actual(_state, published_timestamp):
+            _state = RankingState.load(published_timestamp)
+        return _state
+
+
+def get_ranking_simulator() -> RankingSimulator:
+    return RankingSimulator(get_ranking_state())
@@ -1,7 +1,9 @@
 import asyncio
+import hashlib
 import math
 from typing import Iterable, List, Optional, Tuple
 
+import numpy as np
 from stellar_sdk import Asset, ServerAsync
 
 from aqua_voting_tracker.utils.stellar.asset import get_asset_string
@@ -62,6 +64,9 @@ class SDEX:
 
         yield self.depth[-1], self.prices[-1], math.inf
 
+    def get_depth_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        return np.asarray(self.prices, dtype=float), np.asarray(self.depth, dtype=float)
+
     @classmethod
     async def load_from_horizon(cls, buy_asset: Asset, sell_asset: Asset, server: ServerAsync) -> Optional['SDEX']:
         prices_amount_dict = {}
@@ -140,3 +145,16 @@ class MarketData:
 
     def is_loaded(self) -> bool:
         return all(component is not None for component in [self.amm, self.buying_sdex, self.selling_sdex])
+
+    def get_fingerprint(self) -> str:
+        """
+        Hash of aggregated order books and pool state. Equal fingerprints give equal distribution.
+        """
+        fingerprint = hashlib.sha256()
+        for sdex in [self.buying_sdex, self.selling_sdex]:
+            for array in sdex.get_depth_arrays():
+                fingerprint.update(array.size.to_bytes(8, 'little'))
+                fingerprint.update(array.tobytes())
+
+        fingerprint.update(np.array([self.amm.reserve1, self.amm.reserve2, self.amm.fee], dtype=float).tobytes())
+        return fingerprint.hexdigest()
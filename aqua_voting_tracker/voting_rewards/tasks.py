@@ -1,20 +1,35 @@
 from django.core.cache import cache
+from django.db.transaction import atomic
+from django.utils import timezone
 
 from aqua_voting_tracker.taskapp import app as celery_app
 from aqua_voting_tracker.voting_rewards.constants import REWARD_CACHE_KEY
+from aqua_voting_tracker.voting_rewards.data import load_last_rewards
+from aqua_voting_tracker.voting_rewards.models import MarketRewardRun
 from aqua_voting_tracker.voting_rewards.services.rewards.v1 import RewardsV1Calculator
 
 
 @celery_app.task(ignore_result=True)
 def task_update_rewards():
     rewards = RewardsV1Calculator().run()
-    cleaned_rewards = [
-        {
-            'asset1': reward.asset1,
-            'asset2': reward.asset2,
-            'sdex_reward_value': reward.sdex_reward_value,
-            'amm_reward_value': reward.amm_reward_value,
-        }
-        for reward in rewards
-    ]
-    cache.set(REWARD_CACHE_KEY, cleaned_rewards, None)
+    timestamp = timezone.now()
+
+    with atomic():
+        MarketRewardRun.objects.bulk_create([
+            MarketRewardRun(
+                market_key=reward.market_key,
+                asset1=reward.asset1,
+                asset2=reward.asset2,
+                votes_value=reward.votes_value,
+                share=reward.share,
+                reward_value=reward.reward_value,
+                sdex_share=reward.sdex_share,
+                amm_share=reward.amm_share,
+                sdex_reward_value=reward.sdex_reward_value,
+                amm_reward_value=reward.amm_reward_value,
+                timestamp=timestamp,
+            )
+            for reward in rewards
+        ])
+
+    cache.set(REWARD_CACHE_KEY, load_last_rewards(), None)
@@ -0,0 +1,30 @@
+from decimal import Decimal
+
+from django.utils import timezone
+
+import factory
+import factory.fuzzy
+
+import aqua_voting_tracker.utils.tests  # NoQA: F401
+from aqua_voting_tracker.voting_rewards.models import MarketRewardRun
+
+
+class MarketRewardRunFactory(factory.django.DjangoModelFactory):
+    market_key = factory.Faker('stellar_public_key')
+
+    asset1 = factory.Faker('stellar_asset_string')
+    asset2 = factory.Faker('stellar_asset_string')
+
+    votes_value = factory.fuzzy.FuzzyDecimal(1000)
+    share = factory.fuzzy.FuzzyDecimal(0.005, 0.1, precision=7)
+
+    reward_value = factory.fuzzy.FuzzyInteger(1, 700000)
+    sdex_share = Decimal('0.5')
+    amm_share = Decimal('0.5')
+    sdex_reward_value = factory.LazyAttribute(lambda run: run.reward_value // 2)
+    amm_reward_value = factory.LazyAttribute(lambda run: run.reward_value - run.sdex_reward_value)
+
+    timestamp = factory.LazyFunction(lambda: timezone.now().replace(second=0, microsecond=0))
+
+    class Meta:
+        model = MarketRewardRun
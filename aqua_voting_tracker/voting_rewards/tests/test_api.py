@@ -0,0 +1,122 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from aqua_voting_tracker.voting_rewards.constants import REWARD_CACHE_KEY
+from aqua_voting_tracker.voting_rewards.models import MarketRewardRun
+from aqua_voting_tracker.voting_rewards.services.rewards.base import MarketReward
+from aqua_voting_tracker.voting_rewards.tasks import task_update_rewards
+from aqua_voting_tracker.voting_rewards.tests.factories import MarketRewardRunFactory
+
+
+class VotingRewardsApiTestCase(TestCase):
+    url = '/api/voting-rewards/'
+
+    def setUp(self):
+        cache.delete(REWARD_CACHE_KEY)
+        self.addCleanup(cache.delete, REWARD_CACHE_KEY)
+
+        self.client = APIClient()
+        self.timestamp = timezone.now().replace(second=0, microsecond=0)
+
+        MarketRewardRunFactory.create_batch(3, timestamp=self.timestamp - timezone.timedelta(days=1))
+        self.runs = [
+            MarketRewardRunFactory(votes_value=Decimal(1000 - index), timestamp=self.timestamp)
+            for index in range(5)
+        ]
+
+    def test_without_params_returns_last_run(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([reward['market_key'] for reward in response.data], [run.market_key for run in self.runs])
+        self.assertEqual(cache.get(REWARD_CACHE_KEY), response.data)
+
+    def test_without_params_is_served_from_cache(self):
+        cache.set(REWARD_CACHE_KEY, [{'market_key': 'cached'}], None)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.data, [{'market_key': 'cached'}])
+
+    def test_market_key_filter(self):
+        response = self.client.get(self.url, {'market_key': [self.runs[3].market_key, self.runs[1].market_key]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [reward['market_key'] for reward in response.data],
+            [self.runs[1].market_key, self.runs[3].market_key],
+        )
+
+    def test_asset_filter(self):
+        run = self.runs[2]
+
+        response = self.client.get(self.url, {'asset1': run.asset2})
+        self.assertEqual([reward['market_key'] for reward in response.data], [run.market_key])
+
+        response = self.client.get(self.url, {'asset1': run.asset2, 'asset2': run.asset1})
+        self.assertEqual([reward['market_key'] for reward in response.data], [run.market_key])
+
+        response = self.client.get(self.url, {'asset1': run.asset1, 'asset2': self.runs[0].asset1})
+        self.assertEqual(response.data, [])
+
+    def test_pagination(self):
+        response = self.client.get(self.url, {'limit': 2, 'page': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(
+            [reward['market_key'] for reward in response.data['results']],
+            [self.runs[2].market_key, self.runs[3].market_key],
+        )
+        self.assertIsNotNone(response.data['next'])
+
+    def test_filter_with_pagination(self):
+        market_keys = [run.market_key for run in self.runs[1:4]]
+
+        response = self.client.get(self.url, {'market_key': market_keys, 'limit': 2})
+
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual([reward['market_key'] for reward in response.data['results']], market_keys[:2])
+
+
+class UpdateRewardsTaskTestCase(TestCase):
+    def setUp(self):
+        cache.set(REWARD_CACHE_KEY, [{'market_key': 'stale'}], None)
+        self.addCleanup(cache.delete, REWARD_CACHE_KEY)
+
+    def get_reward(self, market_key: str, votes_value: int) -> MarketReward:
+        return MarketReward(
+            market_key=market_key,
+            votes_value=Decimal(votes_value),
+            asset1='AQUA:ISSUER',
+            asset2='native',
+            share=Decimal('0.5'),
+            reward_value=Decimal(1000),
+            sdex_share=Decimal('0.5'),
+            amm_share=Decimal('0.5'),
+            sdex_reward_value=Decimal(500),
+            amm_reward_value=Decimal(500),
+        )
+
+    @patch('aqua_voting_tracker.voting_rewards.tasks.RewardsV1Calculator')
+    def test_run_is_persisted_and_cached(self, calculator_mock):
+        MarketRewardRunFactory(timestamp=timezone.now() - timezone.timedelta(days=1))
+        calculator_mock.return_value.run.return_value = [self.get_reward('market1', 20), self.get_reward('market2', 30)]
+
+        task_update_rewards()
+
+        last_run = MarketRewardRun.objects.filter_last_run()
+        self.assertEqual(MarketRewardRun.objects.count(), 3)
+        self.assertEqual(len({run.timestamp for run in last_run}), 1)
+        self.assertEqual(
+            [reward['market_key'] for reward in cache.get(REWARD_CACHE_KEY)],
+            ['market2', 'market1'],
+        )
+        self.assertEqual(cache.get(REWARD_CACHE_KEY)[0]['reward_value'], 1000)
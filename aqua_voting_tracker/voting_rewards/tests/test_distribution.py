@@ -0,0 +1,79 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from django.core.cache import cache
+
+from stellar_sdk import Asset
+
+from aqua_voting_tracker.voting_rewards.services.rewards.v2 import RewardsV2Calculator
+from aqua_voting_tracker.voting_rewards.services.sdex_amm_distribution.exponent import ExponentDistributor
+from aqua_voting_tracker.voting_rewards.stellar import AMM, SDEX, MarketData
+
+
+def get_market_data():
+    market_data = MarketData(Asset.native(), Asset('AQUA', 'GBNZILSTVQZ4R7IKQDGHYGY2QXL5QOFJYQMXPKWRRM5PAV7Y4M67AQUA'))
+    market_data.amm = AMM(1000., 2500., 0.003)
+    market_data.buying_sdex = SDEX([0.41, 0.42, 0.45, 0.5], [100., 250., 400., 1000.])
+    market_data.selling_sdex = SDEX([2.45, 2.5, 2.7, 3.1], [50., 120., 300., 310.])
+    return market_data
+
+
+class ExponentDistributorTestCase(TestCase):
+    def setUp(self):
+        self.market_data = get_market_data()
+        self.distributor = ExponentDistributor(self.market_data)
+
+    def test_sdex_weight_matches_numeric(self):
+        sdex = self.market_data.buying_sdex
+        min_price = self.market_data.buying_min_price
+
+        self.assertAlmostEqual(
+            self.distributor.get_sdex_weight_analytic(sdex, min_price),
+            self.distributor.get_sdex_weight_numeric(sdex, min_price),
+            delta=self.distributor.get_sdex_weight_analytic(sdex, min_price) * 1e-6,
+        )
+
+    def test_amm_weight_matches_numeric(self):
+        for amm, min_price in [
+            (self.market_data.amm, self.market_data.buying_min_price),
+            (self.market_data.amm.reverse(), self.market_data.selling_min_price),
+        ]:
+            analytic_weight = self.distributor.get_amm_weight_analytic(amm, min_price)
+            self.assertAlmostEqual(
+                analytic_weight,
+                self.distributor.get_amm_weight_numeric(amm, min_price),
+                delta=analytic_weight * 1e-6,
+            )
+
+    def test_weights_sum(self):
+        sdex_weight, amm_weight = self.distributor.get_weights()
+
+        self.assertAlmostEqual(sdex_weight + amm_weight, 1)
+        self.assertTrue(0 < amm_weight < 1)
+
+
+class DistributionCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calculator = RewardsV2Calculator()
+
+    def test_unchanged_market_is_cached(self):
+        market_data = get_market_data()
+        market_pair = ('native', 'AQUA:GBNZILSTVQZ4R7IKQDGHYGY2QXL5QOFJYQMXPKWRRM5PAV7Y4M67AQUA')
+
+        distributions = self.calculator.get_distributions([market_data])
+        with patch.object(ExponentDistributor, 'get_weights') as get_weights:
+            cached_distributions = self.calculator.get_distributions([get_market_data()])
+
+        get_weights.assert_not_called()
+        self.assertEqual(cached_distributions[market_pair], distributions[market_pair])
+
+    def test_changed_market_is_recalculated(self):
+        self.calculator.get_distributions([get_market_data()])
+
+        market_data = get_market_data()
+        market_data.amm.reserve2 += 1
+        with patch.object(ExponentDistributor, 'get_weights', return_value=(0.5, 0.5)) as get_weights:
+            self.calculator.get_distributions([market_data])
+
+        get_weights.assert_called_once()
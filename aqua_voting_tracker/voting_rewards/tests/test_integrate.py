@@ -0,0 +1,59 @@
+import math
+from unittest import TestCase
+
+import numpy as np
+
+from aqua_voting_tracker.voting_rewards.integrate import (
+    integrate,
+    integrate_adaptive,
+    integrate_piecewise,
+    integrate_piecewise_adaptive,
+    integrate_piecewise_vectorized,
+    integrate_power,
+    integrate_power_piecewise,
+)
+from aqua_voting_tracker.voting_rewards.stellar import SDEX
+
+
+def exponent(price, min_price):
+    return (min_price / price) ** 8
+
+
+class IntegrateTestCase(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        prices = 1 + np.cumsum(rng.uniform(0.0001, 0.01, 500))
+        depth = np.cumsum(rng.uniform(1, 100, 500))
+        self.sdex = SDEX(prices.tolist(), depth.tolist())
+
+    def test_integrate_power(self):
+        for a, b in [(1., 1.5), (1.2, math.inf), (2., 2.)]:
+            expected, _ = integrate(exponent, a, b, args=(0.9, ))
+            self.assertAlmostEqual(integrate_power(0.9, a, b, 8), expected, delta=expected * 1e-6)
+
+    def test_piecewise_vectorized(self):
+        expected, _ = integrate_piecewise(exponent, self.sdex.get_depth_segments(), args=(0.95, ))
+        result, error = integrate_piecewise_vectorized(exponent, *self.sdex.get_depth_arrays(), args=(0.95, ))
+
+        self.assertAlmostEqual(result, expected, delta=expected * 1e-6)
+        self.assertLess(error, expected * 1e-6)
+
+    def test_power_piecewise(self):
+        expected, _ = integrate_piecewise(exponent, self.sdex.get_depth_segments(), args=(0.95, ))
+        result = integrate_power_piecewise(0.95, *self.sdex.get_depth_arrays(), 8)
+
+        self.assertAlmostEqual(result, expected, delta=expected * 1e-6)
+
+    def test_integrate_adaptive(self):
+        expected = integrate_power(0.9, 1.2, math.inf, 8)
+        result, error, info = integrate_adaptive(exponent, 1.2, math.inf, args=(0.9, ), full_output=True)
+
+        self.assertAlmostEqual(result, expected, delta=expected * 1e-6)
+        self.assertLessEqual(error, expected * 1e-6)
+        self.assertLessEqual(info['evaluations'], 4 * info['partitions'] + 1)
+
+    def test_piecewise_adaptive(self):
+        expected = integrate_power_piecewise(0.95, *self.sdex.get_depth_arrays(), 8)
+        result, error = integrate_piecewise_adaptive(exponent, self.sdex.get_depth_segments(), args=(0.95, ))
+
+        self.assertAlmostEqual(result, expected, delta=expected * 1e-6)
@@ -0,0 +1,124 @@
+from decimal import Decimal
+from unittest import TestCase
+
+from django.core.cache import cache
+from django.test import TestCase as DjangoTestCase
+from django.utils import timezone
+
+from aqua_voting_tracker.voting.constants import PUBLISHED_SNAPSHOT_CACHE_KEY
+from aqua_voting_tracker.voting.tests.factories import VotingSnapshotFactory
+from aqua_voting_tracker.voting_rewards.services.rewards.base import MarketReward, RewardsCalculator
+from aqua_voting_tracker.voting_rewards.services.simulation import RankingSimulator, RankingState, get_ranking_state
+
+
+VOTES_VALUES = [95, 90, 85, 80, 75, 70, 65, 60, 55, 55, 50, 45, 40, 35, 30, 25, 20, 15, 10]
+
+
+def get_state(votes_values, boosts=None):
+    boosts = boosts or {}
+    return RankingState(None, [
+        (f'market{i + 1}', Decimal(value), Decimal(value) * boosts.get(f'market{i + 1}', 1))
+        for i, value in enumerate(votes_values)
+    ])
+
+
+def get_expected_shares(votes_values):
+    calculator = RewardsCalculator()
+    reward_zone = [
+        MarketReward(market_key=f'market{i + 1}', votes_value=Decimal(value))
+        for i, value in sorted(enumerate(votes_values), key=lambda item: item[1], reverse=True)
+    ]
+    return {
+        reward.market_key: reward.share
+        for reward in calculator.set_reward_value(calculator.calculate_shares(reward_zone))
+    }
+
+
+class RankingSimulatorTestCase(TestCase):
+    def setUp(self):
+        self.simulator = RankingSimulator(get_state(VOTES_VALUES))
+
+    def test_current_state(self):
+        simulation = self.simulator.simulate('market3')
+
+        self.assertEqual(simulation.rank, 3)
+        self.assertEqual(simulation.share, get_expected_shares(VOTES_VALUES)['market3'])
+
+    def test_upvote(self):
+        simulation = self.simulator.simulate('market19', upvote_value=Decimal(52))
+
+        votes_values = VOTES_VALUES[:-1] + [62]
+        self.assertEqual(simulation.votes_value, 62)
+        self.assertEqual(simulation.rank, 8)
+        self.assertEqual(simulation.share, get_expected_shares(votes_values)['market19'])
+
+    def test_downvote_out_of_reward_zone(self):
+        simulation = self.simulator.simulate('market19', downvote_value=Decimal(6))
+
+        self.assertEqual(simulation.rank, 19)
+        self.assertFalse(simulation.in_reward_zone)
+        self.assertIsNone(simulation.share)
+
+    def test_required_upvote_value(self):
+        simulation = self.simulator.simulate('market19', target_rank=1)
+
+        self.assertEqual(simulation.target_rank_upvote_value, 85)
+        self.assertEqual(simulation.reward_zone_upvote_value, 0)
+        self.assertEqual(self.simulator.simulate('market19', upvote_value=Decimal(85)).rank, 1)
+
+    def test_new_market(self):
+        simulation = self.simulator.simulate('new_market')
+
+        self.assertEqual(simulation.rank, 20)
+        self.assertFalse(simulation.in_reward_zone)
+
+        upvote_value = simulation.reward_zone_upvote_value
+        self.assertGreater(upvote_value, 0)
+        self.assertTrue(self.simulator.simulate('new_market', upvote_value=upvote_value * Decimal('1.001')).share)
+        self.assertIsNone(self.simulator.simulate('new_market', upvote_value=upvote_value * Decimal('0.99')).share)
+
+    def test_boost(self):
+        simulator = RankingSimulator(get_state(VOTES_VALUES, boosts={'market19': Decimal(2)}))
+
+        simulation = simulator.simulate('market19', upvote_value=Decimal(10), target_rank=1)
+
+        self.assertEqual(simulation.adjusted_votes_value, 40)
+        self.assertEqual(simulation.target_rank_upvote_value, Decimal('37.5'))
+
+
+class RankingSimulationApiTestCase(DjangoTestCase):
+    def setUp(self):
+        cache.delete(PUBLISHED_SNAPSHOT_CACHE_KEY)
+        self.addCleanup(cache.delete, PUBLISHED_SNAPSHOT_CACHE_KEY)
+
+        self.timestamp = timezone.now().replace(second=0, microsecond=0)
+        self.snapshots = [
+            VotingSnapshotFactory(timestamp=self.timestamp, upvote_value=Decimal(value))
+            for value in VOTES_VALUES
+        ]
+
+    def test_simulate(self):
+        cache.set(PUBLISHED_SNAPSHOT_CACHE_KEY, self.timestamp)
+
+        response = self.client.get('/api/voting-rewards/simulate/', {
+            'market_key': self.snapshots[-1].market_key,
+            'upvote_value': '52',
+            'target_rank': 1,
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['rank'], 8)
+        self.assertTrue(response.data['in_reward_zone'])
+        self.assertEqual(Decimal(response.data['target_rank_upvote_value']), 85)
+
+    def test_state_is_reused_for_published_snapshot(self):
+        cache.set(PUBLISHED_SNAPSHOT_CACHE_KEY, self.timestamp)
+        state = get_ranking_state()
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_ranking_state(), state)
+
+    def test_validation(self):
+        response = self.client.get('/api/voting-rewards/simulate/', {'market_key': 'market', 'target_rank': 0})
+
+        self.assertEqual(response.status_code, 400)
@@ -1,8 +1,9 @@
 from django.urls import path
 
-from aqua_voting_tracker.voting_rewards.api import VotingRewardsView
+from aqua_voting_tracker.voting_rewards.api import RankingSimulationView, VotingRewardsView
 
 
 urlpatterns = [
     path('voting-rewards/', VotingRewardsView.as_view()),
+    path('voting-rewards/simulate/', RankingSimulationView.as_view()),
 ]
@@ -21,6 +21,10 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+DATABASE_ROUTERS = ['aqua_voting_tracker.utils.db_routers.ReplicaRouter']
+# Aliases of read-only replicas of default database, used by read-only api views.
+DATABASE_REPLICAS = []
+
 
 # Application definition
 # --------------------------------------------------------------------------
@@ -37,6 +41,7 @@ DJANGO_APPS = [
 ]
 
 THIRD_PARTY_APPS = [
+    'rest_framework.authtoken',
 ]
 
 LOCAL_APPS = [
@@ -162,6 +167,9 @@ if CELERY_ENABLED:
     CELERY_TASK_SERIALIZER = 'json'
     CELERY_TASK_IGNORE_RESULT = True
 
+    # Port of prometheus exporter started by celery worker. Disabled if not set.
+    CELERY_METRICS_PORT = env.int('CELERY_METRICS_PORT', default=None)
+
 
 # Rest framework configuration
 # http://www.django-rest-framework.org/api-guide/settings/
@@ -182,6 +190,23 @@ REST_FRAMEWORK = {
 STELLAR_PASSPHRASE = NotImplemented
 HORIZON_URL = NotImplemented
 
+HORIZON_POOL_SIZE = env.int('HORIZON_POOL_SIZE', default=30)
+HORIZON_REQUEST_TIMEOUT = env.float('HORIZON_REQUEST_TIMEOUT', default=30)
+HORIZON_NUM_RETRIES = env.int('HORIZON_NUM_RETRIES', default=3)
+HORIZON_BACKOFF_FACTOR = env.float('HORIZON_BACKOFF_FACTOR', default=0.5)
+HORIZON_BACKOFF_JITTER = env.float('HORIZON_BACKOFF_JITTER', default=0.5)
+
+# Cluster-wide token bucket. Disabled if redis url is not set.
+HORIZON_RATE_LIMIT_REDIS_URL = env('HORIZON_RATE_LIMIT_REDIS_URL', default=None)
+HORIZON_RATE_LIMIT = env.float('HORIZON_RATE_LIMIT', default=20)
+HORIZON_RATE_LIMIT_BURST = env.float('HORIZON_RATE_LIMIT_BURST', default=100)
+# Share of bucket capacity which can't be consumed by caller of given priority.
+HORIZON_RATE_LIMIT_RESERVES = {
+    'HIGH': 0,
+    'NORMAL': 0.2,
+    'LOW': 0.5,
+}
+
 
 # Voting configuration
 # --------------------------------------------------------------------------
@@ -193,6 +218,32 @@ MARKETKEYS_TRACKER_URL = NotImplemented
 
 VOTING_MIN_TERM = timedelta(hours=1)
 
+VOTING_SNAPSHOT_INTERVAL = timedelta(minutes=5)
+# Should be less than snapshot interval to be alerted before snapshots start overlapping.
+VOTING_SNAPSHOT_LATENESS_THRESHOLD = timedelta(minutes=3)
+# Snapshots missed while workers were down are created on the next run, if not older than the limit.
+VOTING_SNAPSHOT_CATCH_UP_LIMIT = timedelta(days=1)
+VOTING_SNAPSHOT_LOCK_TIMEOUT = timedelta(hours=1)
+
+# In-memory vote state served by runvotestate command: unix socket path, or host:port if tcp is allowed.
+# Snapshots are aggregated by the database if not set or unavailable.
+VOTE_STATE_ADDRESS = env('VOTE_STATE_ADDRESS', default=None)
+VOTE_STATE_ALLOW_TCP = env.bool('VOTE_STATE_ALLOW_TCP', default=False)
+# Shared secret of vote state clients and server, required if address is set.
+VOTE_STATE_AUTHKEY = env('VOTE_STATE_AUTHKEY', default=None)
+VOTE_STATE_TIMEOUT = env.float('VOTE_STATE_TIMEOUT', default=30)
+# Events are published right after commit, slow vote state must not hold the stream.
+VOTE_STATE_PUBLISH_TIMEOUT = env.float('VOTE_STATE_PUBLISH_TIMEOUT', default=2)
+# Vote state is rebuilt from the database, so events lost by the stream can't drift it for longer.
+VOTE_STATE_RELOAD_INTERVAL = timedelta(minutes=30)
+
+# Analytics export to parquet: local path or pyarrow filesystem uri (s3://bucket/path). Disabled if not set.
+PARQUET_EXPORT_URI = env('PARQUET_EXPORT_URI', default=None)
+PARQUET_EXPORT_CHUNK_SIZE = env.int('PARQUET_EXPORT_CHUNK_SIZE', default=10000)
+# Rows updated more recently may be not committed yet, they are exported by the next run.
+PARQUET_EXPORT_LAG = timedelta(minutes=5)
+PARQUET_EXPORT_LOCK_TIMEOUT = timedelta(hours=1)
+
 
 # Voting reward configuration
 # --------------------------------------------------------------------------
@@ -206,6 +257,9 @@ AMM_SHARE = 5
 
 SDEX_AMM_MIN_SHARE = Decimal('0.1')
 
+# Distribution of unchanged markets is reused from cache, stale records are evicted by timeout.
+SDEX_AMM_DISTRIBUTION_CACHE_TIMEOUT = 60 * 60 * 24
+
 
 # Prometheus configuration
 # --------------------------------------------------------------------------
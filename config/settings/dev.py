@@ -22,6 +22,9 @@ MANAGERS = ADMINS
 DATABASES = {
     'default': env.db(default='postgres://localhost/aqua_voting_tracker'),
 }
+for index, replica_url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[])):
+    DATABASES[f'replica_{index}'] = {**env.db_url_config(replica_url), 'TEST': {'MIRROR': 'default'}}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
 
 
 # Email settings
@@ -25,6 +25,9 @@ SECRET_KEY = env('SECRET_KEY')
 DATABASES = {
     'default': env.db(),
 }
+for index, replica_url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[])):
+    DATABASES[f'replica_{index}'] = {**env.db_url_config(replica_url), 'TEST': {'MIRROR': 'default'}}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
 
 
 # Cache
@@ -102,6 +105,8 @@ if SENTRY_ENABLED:
 STELLAR_PASSPHRASE = 'Public Global Stellar Network ; September 2015'
 HORIZON_URL = env('HORIZON_URL', default='https://horizon.stellar.org')
 
+HORIZON_RATE_LIMIT_REDIS_URL = env('HORIZON_RATE_LIMIT_REDIS_URL', default='redis://127.0.0.1:6379/1')
+
 
 # Voting configuration
 # --------------------------------------------------------------------------